@@ -0,0 +1,3 @@
+from .device import Device
+from .network_manager import NetworkManager
+from .packet import Packet
@@ -0,0 +1,31 @@
+import ipaddress
+from functools import lru_cache
+
+DEFAULT_NETMASK = "255.255.255.0"
+
+
+@lru_cache(maxsize=None)
+def prefix_length(netmask):
+    # Aceita máscara pontuada ("255.255.255.0"), "/24", "24" ou o inteiro 24.
+    # Poucas máscaras distintas existem numa rede, então o parse fica em cache.
+    if isinstance(netmask, int):
+        prefix = netmask
+    else:
+        prefix = ipaddress.IPv4Network(f"0.0.0.0/{str(netmask).lstrip('/')}").prefixlen
+    if not 0 <= prefix <= 32:
+        raise ValueError(f"Máscara inválida: {netmask}")
+    return prefix
+
+
+def prefix_mask(prefix):
+    return (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF
+
+
+def parse_subnet(subnet):
+    # "192.168.0.0/24" -> (endereço de rede inteiro, prefixo)
+    network = ipaddress.IPv4Network(subnet, strict=False)
+    return int(network.network_address), network.prefixlen
+
+
+def format_subnet(network_int, prefix):
+    return f"{ipaddress.IPv4Address(network_int)}/{prefix}"
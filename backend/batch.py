@@ -0,0 +1,105 @@
+# Execução de vários cenários (ou de muitos pares) em paralelo, com a rede
+# carregada uma única vez e compartilhada entre os processos.
+#
+# Exemplos:
+#   python -m backend.batch rede cenario1.json cenario2.json --workers 8
+#   python -m backend.batch rede --pairs pares.json --routing ecmp
+#   python -m backend.batch rede.pnet --random-pairs 100000 --seed 1
+#
+# Com cenários, cada um é simulado inteiro num worker (como em backend.run).
+# Com pares, só as rotas são calculadas: caminhos encontrados, saltos e pares sem rota.
+import argparse
+import json
+import random
+import sys
+import time
+
+from .network_manager import NetworkManager
+from .parallel import ParallelRunner
+from .run import load_scenario, resolve_network
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m backend.batch",
+                                     description="Executa cenários ou pares em paralelo sobre uma rede salva.")
+    parser.add_argument("network", help="arquivo da rede ou nome em saved_networks/")
+    parser.add_argument("scenarios", nargs="*", help="arquivos de cenário (um por simulação)")
+    parser.add_argument("--pairs", help="arquivo JSON com pares para calcular só as rotas")
+    parser.add_argument("--random-pairs", type=int, default=0, metavar="N",
+                        help="calcula as rotas de N pares aleatórios")
+    parser.add_argument("--seed", type=int, default=0, help="semente dos pares aleatórios")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    parser.add_argument("--routing", choices=("table", "cost", "ecmp", "fib"), default=None,
+                        help="padrão: table nos cenários, cost nos pares")
+    parser.add_argument("--count", type=int, default=1, help="pacotes por par (padrão: 1)")
+    parser.add_argument("--interval", type=float, default=0.001, help="intervalo entre pacotes, em segundos")
+    parser.add_argument("--size", type=int, default=1500, help="tamanho do pacote em bytes")
+    parser.add_argument("--latency", type=float, default=0.001, help="latência dos enlaces, em segundos")
+    parser.add_argument("--bandwidth", type=float, default=100e6, help="banda dos enlaces, em bits/s")
+    parser.add_argument("--queue-limit", type=int, default=64, help="tamanho da fila dos roteadores")
+    parser.add_argument("--output", help="arquivo de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+    if not args.scenarios and not args.pairs and not args.random_pairs:
+        parser.error("informe cenários, --pairs ou --random-pairs")
+    if args.routing == "fib" and (args.pairs or args.random_pairs):
+        parser.error("--routing fib só vale para cenários (os pares usam o retrato CSR)")
+    return args
+
+
+def load_pairs(filename):
+    # Mesmo formato dos cenários; só origem e destino são usados
+    return [(pair["source"], pair["destination"]) for pair in load_scenario(filename)]
+
+
+def random_pairs(manager, count, seed):
+    rng = random.Random(seed)
+    names = [device.name for device in manager.devices]
+    return [(rng.choice(names), rng.choice(names)) for _ in range(count)]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    filename = resolve_network(args.network)
+    manager = NetworkManager()
+    try:
+        report = manager.load_from_file(filename)
+    except (OSError, ValueError) as e:
+        print(f"Falha ao carregar {filename}: {e}", file=sys.stderr)
+        return 1
+    if report.total_skipped:
+        print(f"{filename}: {report.summary()}", file=sys.stderr)
+
+    result = {"network": filename}
+    with ParallelRunner(manager, workers=args.workers) as runner:
+        result["workers"] = runner.workers
+        if args.scenarios:
+            start = time.perf_counter()
+            rows, stats, totals = runner.run_scenarios(
+                [load_scenario(scenario) for scenario in args.scenarios],
+                latency=args.latency, bandwidth=args.bandwidth, queue_limit=args.queue_limit,
+                routing=args.routing or "table", count=args.count, interval=args.interval,
+                size=args.size)
+            result["scenarios"] = [{"scenario": scenario, "pairs": scenario_rows, "totals": scenario_stats.as_dict()}
+                                   for scenario, scenario_rows, scenario_stats in zip(args.scenarios, rows, stats)]
+            result["totals"] = totals.as_dict()
+            result["seconds"] = time.perf_counter() - start
+        if args.pairs or args.random_pairs:
+            pairs = load_pairs(args.pairs) if args.pairs else []
+            pairs += random_pairs(manager, args.random_pairs, args.seed)
+            start = time.perf_counter()
+            summary = runner.route_pairs(pairs, routing=args.routing or "cost")
+            result["routes"] = summary.as_dict()
+            result["routes"]["seconds"] = time.perf_counter() - start
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        json.dump(result, out, indent=2)
+        out.write("\n")
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
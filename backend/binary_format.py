@@ -0,0 +1,216 @@
+# Formato binário compacto para redes (.pnet), lido via mmap.
+#
+# Layout (little-endian), seções de 4 bytes primeiro para ficarem alinhadas:
+#   cabeçalho      magic "PNET", versão u16, nº de tipos u16,
+#                  nº de dispositivos u32, nº de conexões u32, tamanho dos nomes u32
+#   ips            u32 por dispositivo
+#   coordenadas    f64 x, f64 y por dispositivo
+#   conexões       i32, i32 (índices dos dispositivos) por conexão
+#   offsets        u32 por dispositivo + 1, posições dos nomes na tabela de strings
+#   custos         f64 por conexão
+#   capacidades    f64 por conexão, 0 quando não definida
+#   prefixos       u8 por dispositivo
+#   tipos          u8 por dispositivo (índice na tabela de tipos)
+#   tabela de tipos  u8 tamanho + bytes, para cada tipo
+#   nomes          nomes em UTF-8 concatenados
+#
+# Conversão entre os formatos: python -m backend.convert
+import mmap
+import struct
+import sys
+from array import array
+
+BINARY_EXTENSION = ".pnet"
+MAGIC = b"PNET"
+VERSION = 3
+HEADER = struct.Struct("<4sHHIII")
+LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _to_little_endian(values):
+    if not LITTLE_ENDIAN:
+        values.byteswap()
+    return values
+
+
+def save_binary(manager, filename):
+    index = {}
+    types = {}
+    ips = array("I")
+    coords = array("d")
+    offsets = array("I", [0])
+    prefixes = bytearray()
+    type_ids = bytearray()
+    names = bytearray()
+    for i, device in enumerate(manager.devices):
+        index[device.name] = i
+        ips.append(device.ip_int)
+        coords.append(device.x)
+        coords.append(device.y)
+        names += device.name.encode("utf-8")
+        offsets.append(len(names))
+        prefixes.append(device.prefix)
+        type_ids.append(types.setdefault(device.device_type, len(types)))
+    edges = array("i")
+    costs = array("d")
+    capacities = array("d")
+    for (name1, name2), attributes in manager.links.items():
+        edges.append(index[name1])
+        edges.append(index[name2])
+        costs.append(attributes.cost)
+        capacities.append(attributes.capacity or 0.0)
+    if len(types) > 255:
+        raise ValueError("Tipos de dispositivo demais para o formato binário")
+
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(types), len(ips), len(edges) // 2, len(names)))
+        for values in (ips, coords, edges, offsets, costs, capacities):
+            _to_little_endian(values).tofile(f)
+        f.write(prefixes)
+        f.write(type_ids)
+        for device_type in types:
+            encoded = device_type.encode("utf-8")
+            f.write(bytes([len(encoded)]) + encoded)
+        f.write(names)
+
+
+class BinaryTopology:
+    # Rede aberta via mmap: os arrays são lidos direto do arquivo, sem
+    # materializar dispositivos até que alguém peça.
+
+    def __init__(self, filename):
+        self._file = open(filename, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # arquivo vazio
+            self._file.close()
+            raise ValueError(f"{filename} não é uma rede binária válida: arquivo vazio") from None
+        # O cabeçalho e os tamanhos das seções são conferidos antes de criar
+        # qualquer view, para que o mmap possa ser fechado em caso de erro
+        try:
+            layout, pos, names_size, self.types = self._layout()
+        except ValueError as e:
+            self.close()
+            raise ValueError(f"{filename} não é uma rede binária válida: {e}") from None
+        devices = self.device_count
+
+        view = memoryview(self._mmap)
+        sections = {}
+        for name, code, start, size in layout:
+            sections[name] = self._values(view[start:start + size], code)
+        self.ips = sections["ips"]
+        self.coords = sections["coords"]
+        self.edges = sections["edges"]
+        self._offsets = sections["offsets"]
+        self.costs = sections["costs"]
+        self.capacities = sections["capacities"]
+        self.prefixes = view[pos:pos + devices]
+        self._type_ids = view[pos + devices:pos + 2 * devices]
+        self._names = view[len(self._mmap) - names_size:]
+        self._view = view
+
+    def _layout(self):
+        # Posições das seções: arrays como (nome, tipo, início, tamanho), início
+        # dos prefixos, tamanho dos nomes e os tipos. ValueError se o tamanho do
+        # arquivo não fecha com o cabeçalho.
+        data = self._mmap
+        if len(data) < HEADER.size:
+            raise ValueError("cabeçalho incompleto")
+        magic, version, type_count, devices, edges, names_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("assinatura ou versão desconhecida")
+        self.device_count = devices
+        self.edge_count = edges
+        sizes = [("ips", "I", 4 * devices), ("coords", "d", 16 * devices),
+                 ("edges", "i", 8 * edges), ("offsets", "I", 4 * (devices + 1)),
+                 ("costs", "d", 8 * edges), ("capacities", "d", 8 * edges)]
+        layout = []
+        pos = HEADER.size
+        for name, code, size in sizes:
+            layout.append((name, code, pos, size))
+            pos += size
+        prefixes = pos
+        pos += 2 * devices
+        types = []
+        for _ in range(type_count):
+            if pos >= len(data):
+                raise ValueError("tabela de tipos truncada")
+            length = data[pos]
+            if pos + 1 + length > len(data):
+                raise ValueError("tabela de tipos truncada")
+            try:
+                types.append(data[pos + 1:pos + 1 + length].decode("utf-8"))
+            except UnicodeDecodeError:
+                raise ValueError("nome de tipo inválido") from None
+            pos += 1 + length
+        if pos + names_size != len(data):
+            raise ValueError(f"tamanho {len(data)} não confere com o cabeçalho ({pos + names_size})")
+        return layout, prefixes, names_size, types
+
+    @staticmethod
+    def _values(view, code):
+        if LITTLE_ENDIAN:
+            return view.cast(code)
+        values = array(code, bytes(view))
+        values.byteswap()
+        return values
+
+    def name(self, i):
+        return bytes(self._names[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def device_type(self, i):
+        return self.types[self._type_ids[i]]
+
+    def device(self, i):
+        return {
+            "name": self.name(i),
+            "ip": self.ips[i],
+            "prefix": self.prefixes[i],
+            "type": self.device_type(i),
+            "x": self.coords[2 * i],
+            "y": self.coords[2 * i + 1],
+        }
+
+    def iter_edges(self):
+        edges = self.edges
+        for k in range(0, 2 * self.edge_count, 2):
+            yield edges[k], edges[k + 1]
+
+    def to_manager(self, manager):
+        manager.clear()
+        try:
+            names = [self.name(i) for i in range(self.device_count)]
+            coords = self.coords
+            for i, name in enumerate(names):
+                manager.add_device(name, self.ips[i], self.device_type(i),
+                                   coords[2 * i], coords[2 * i + 1], self.prefixes[i])
+        except (IndexError, UnicodeDecodeError) as e:
+            raise ValueError(f"dispositivo inválido no arquivo binário: {e}") from None
+        count = self.device_count
+        costs, capacities = self.costs, self.capacities
+        for k, (a, b) in enumerate(self.iter_edges()):
+            if not (0 <= a < count and 0 <= b < count):
+                raise ValueError(f"conexão #{k} aponta para dispositivo inexistente")
+            manager.create_connection(names[a], names[b], costs[k], capacities[k] or None)
+        return manager
+
+    def close(self):
+        # As views precisam ser liberadas antes de fechar o mmap
+        for attr in ("ips", "coords", "edges", "_offsets", "costs", "capacities",
+                     "prefixes", "_type_ids", "_names", "_view"):
+            view = self.__dict__.pop(attr, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_binary(filename, manager):
+    with BinaryTopology(filename) as topology:
+        return topology.to_manager(manager)
@@ -0,0 +1,241 @@
+# Índice de alcançabilidade sobre o grafo de trânsito (só roteadores
+# encaminham pacotes).
+#
+# Os roteadores ficam num union-find: criar um enlace entre roteadores é uma
+# união. Remoções (enlace entre roteadores ou o próprio roteador) não dão para
+# desfazer num union-find, então só marcam o índice como sujo e ele é refeito
+# na próxima consulta; uma sequência de remoções custa uma reconstrução só.
+#
+# A origem alcança o destino se forem vizinhos diretos ou se algum componente
+# de roteadores for comum aos dois. O componente de um roteador é o dele; o de
+# outro dispositivo, os dos roteadores ligados a ele. A consulta não percorre o
+# grafo: custa o grau das duas pontas (em geral um ou dois enlaces num PC).
+from . import metrics
+from .addressing import format_subnet
+
+_REBUILDS = metrics.counter("connectivity_rebuilds_total", "Reconstruções do índice de alcançabilidade")
+
+
+def _is_router(device):
+    return device.device_type == "roteador"
+
+
+def _router_neighbors(device):
+    return [neighbor for neighbor in device.connections if neighbor.device_type == "roteador"]
+
+
+class ReachabilityIndex:
+    def __init__(self):
+        self.routers = {}  # id -> roteador
+        self.parent = {}  # id -> id do pai no union-find
+        self.size = {}  # id da raiz -> roteadores no conjunto
+        self.dirty = False  # houve remoções desde a última reconstrução
+        self.rebuilds = 0
+        self.version = 0  # muda a cada alteração; invalida os resultados em cache
+        self._cache = {}  # nome do resultado -> (versão, valor)
+
+    def _changed(self):
+        self.version += 1
+
+    # --- union-find ---
+
+    def _find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # compressão por divisão do caminho
+            i = parent[i]
+        return i
+
+    def _union(self, i, j):
+        i = self._find(i)
+        j = self._find(j)
+        if i == j:
+            return
+        if self.size[i] < self.size[j]:
+            i, j = j, i
+        self.parent[j] = i
+        self.size[i] += self.size.pop(j)
+
+    def _rebuild(self):
+        self.parent = {i: i for i in self.routers}
+        self.size = dict.fromkeys(self.routers, 1)
+        for i, router in self.routers.items():
+            for neighbor in router.connections:
+                if neighbor.device_type == "roteador" and neighbor.id < i:
+                    self._union(i, neighbor.id)
+        self.dirty = False
+        self.rebuilds += 1
+        if metrics.enabled:
+            _REBUILDS.inc()
+
+    # --- consultas ---
+
+    def component(self, router):
+        if self.dirty:
+            self._rebuild()
+        return self._find(router.id)
+
+    def components_of(self, device):
+        # Componentes de roteadores que o dispositivo usa (vazio se não há roteador)
+        if _is_router(device):
+            return {self.component(device)}
+        return {self.component(neighbor) for neighbor in device.connections if _is_router(neighbor)}
+
+    def connected(self, source, dest):
+        if source is dest or dest in source.connections:
+            return True
+        if _is_router(source) and _is_router(dest):
+            return self.component(source) == self.component(dest)
+        return not self.components_of(source).isdisjoint(self.components_of(dest))
+
+    def _cached(self, key, compute):
+        cached = self._cache.get(key)
+        if cached is None or cached[0] != self.version:
+            cached = self._cache[key] = (self.version, compute())
+        return cached[1]
+
+    def components(self, devices):
+        # Listas de dispositivos que se comunicam: cada componente de roteadores
+        # com os dispositivos ligados a ele (um dispositivo ligado a dois
+        # componentes aparece nos dois, porque não encaminha entre eles) e,
+        # à parte, os grupos de dispositivos sem nenhum roteador
+        return self._cached("components", lambda: self._components(devices))
+
+    def _components(self, devices):
+        groups = {}
+        loose = []
+        for device in devices:
+            roots = self.components_of(device)
+            for root in roots:
+                groups.setdefault(root, []).append(device)
+            if not roots:
+                loose.append(device)
+        result = list(groups.values())
+        # Dispositivos sem roteador se agrupam pelos enlaces diretos entre eles
+        pending = dict.fromkeys(loose)
+        for device in loose:
+            if device not in pending:
+                continue
+            del pending[device]
+            group = [device]
+            for member in group:  # a lista cresce durante o laço (busca em largura)
+                for neighbor in member.connections:
+                    if neighbor in pending:
+                        del pending[neighbor]
+                        group.append(neighbor)
+            result.append(group)
+        return result
+
+    def isolated_subnets(self, subnets):
+        # Sub-redes cujos dispositivos não alcançam nenhum dispositivo de fora
+        # delas. subnets: (rede, prefixo) -> dispositivos (NetworkManager.subnets)
+        return self._cached("isolated", lambda: self._isolated_subnets(subnets))
+
+    def _isolated_subnets(self, subnets):
+        touched = {}  # raiz -> sub-redes com dispositivos no componente
+        for subnet, members in subnets.items():
+            for device in members:
+                for root in self.components_of(device):
+                    touched.setdefault(root, set()).add(subnet)
+        isolated = []
+        for subnet, members in subnets.items():
+            if all(touched[root] == {subnet}
+                   for device in members for root in self.components_of(device)) and \
+                    all(neighbor.subnet == subnet for device in members for neighbor in device.connections):
+                isolated.append(format_subnet(*subnet))
+        return isolated
+
+    def articulation_routers(self):
+        # Roteadores cuja falha separa dispositivos que hoje se comunicam:
+        # pontos de articulação entre roteadores (Tarjan iterativo) e roteadores
+        # que são a única porta de algum dispositivo para o seu componente
+        return self._cached("articulation", self._articulation_routers)
+
+    def _articulation_routers(self):
+        discovered = {}
+        low = {}
+        points = set()
+        order = 0
+        for root in self.routers.values():
+            if root in discovered:
+                continue
+            discovered[root] = low[root] = order
+            order += 1
+            children = 0
+            stack = [(root, None, iter(_router_neighbors(root)))]
+            while stack:
+                node, parent, neighbors = stack[-1]
+                for neighbor in neighbors:
+                    if neighbor is parent:
+                        continue
+                    if neighbor in discovered:
+                        low[node] = min(low[node], discovered[neighbor])
+                    else:
+                        discovered[neighbor] = low[neighbor] = order
+                        order += 1
+                        stack.append((neighbor, node, iter(_router_neighbors(neighbor))))
+                        break
+                else:
+                    stack.pop()
+                    if parent is root:
+                        children += 1
+                    elif parent is not None:
+                        low[parent] = min(low[parent], low[node])
+                        if low[node] >= discovered[parent]:
+                            points.add(parent)
+            if children > 1:
+                points.add(root)
+        for router in self.routers.values():
+            if router not in points and len(router.connections) > 1 and self._cuts_hosts(router):
+                points.add(router)
+        return points
+
+    def _cuts_hosts(self, router):
+        # Roteador que não separa outros roteadores, mas pode ser a única porta
+        # de algum dispositivo para o componente
+        root = self.component(router)
+        hosts = [neighbor for neighbor in router.connections if not _is_router(neighbor)]
+        if self.size[root] > 1:
+            # Um dispositivo cujo único roteador do componente é este perde os demais
+            return any(all(self.component(other) != root or other is router for other in _router_neighbors(host))
+                       for host in hosts)
+        # Roteador sozinho: separa dois dispositivos ligados a ele que não são
+        # vizinhos diretos nem têm outro componente em comum
+        others = [self.components_of(host) - {root} for host in hosts]
+        for i, host in enumerate(hosts):
+            for j in range(i + 1, len(hosts)):
+                if hosts[j] not in host.connections and others[i].isdisjoint(others[j]):
+                    return True
+        return False
+
+    # --- atualização incremental ---
+
+    def clear(self):
+        self.routers.clear()
+        self.parent.clear()
+        self.size.clear()
+        self.dirty = False
+        self._changed()
+
+    def device_added(self, device):
+        if _is_router(device):
+            self.routers[device.id] = device
+            self.parent[device.id] = device.id
+            self.size[device.id] = 1
+        self._changed()
+
+    def device_removed(self, device):
+        if _is_router(device):
+            del self.routers[device.id]
+            self.dirty = True
+        self._changed()
+
+    def link_added(self, d1, d2):
+        if _is_router(d1) and _is_router(d2) and not self.dirty:
+            self._union(d1.id, d2.id)
+        self._changed()
+
+    def link_removed(self, d1, d2):
+        if _is_router(d1) and _is_router(d2):
+            self.dirty = True
+        self._changed()
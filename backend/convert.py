@@ -0,0 +1,58 @@
+# Conversão de redes salvas entre JSON e o formato binário (.pnet).
+#
+#   python -m backend.convert to-binary saved_networks/rede.json [saída.pnet]
+#   python -m backend.convert to-json rede.pnet [saída.json]
+#   python -m backend.convert to-json rede.pnet -o /tmp/saída.json
+#   python -m backend.convert to-binary saved_networks/*.json
+import os
+import sys
+
+from .binary_format import BINARY_EXTENSION
+from .network_manager import NetworkManager
+
+USAGE = ("uso: python -m backend.convert (to-binary|to-json) ENTRADA... | "
+         "(to-binary|to-json) ENTRADA [-o] SAÍDA")
+
+
+def convert(source, target):
+    manager = NetworkManager()
+    report = manager.load_from_file(source)
+    manager.save_to_file(target)
+    if report.total_skipped:
+        print(f"{source}: {report.summary()}", file=sys.stderr)
+    return os.path.getsize(target)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2 or argv[0] not in ("to-binary", "to-json"):
+        print(USAGE, file=sys.stderr)
+        return 2
+    extension = BINARY_EXTENSION if argv[0] == "to-binary" else ".json"
+    sources = argv[1:]
+    targets = None
+    if "-o" in sources:
+        i = sources.index("-o")
+        if i != 1 or len(sources) != 3:
+            print(USAGE, file=sys.stderr)
+            return 2
+        sources, targets = sources[:1], sources[2:]
+    elif len(sources) == 2 and sources[1].lower().endswith(extension):
+        # ENTRADA SAÍDA: o segundo caminho já tem a extensão do formato de destino
+        sources, targets = sources[:1], sources[1:]
+    targets = targets or [os.path.splitext(source)[0] + extension for source in sources]
+
+    status = 0
+    for source, target in zip(sources, targets):
+        try:
+            size = convert(source, target)
+        except (OSError, ValueError) as e:
+            print(f"Falha ao converter {source}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"{source} -> {target} ({os.path.getsize(source)} -> {size} bytes)")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,57 @@
+import ipaddress
+
+from .addressing import DEFAULT_NETMASK, prefix_length, prefix_mask
+
+
 class Device:
-    def __init__(self, name, ip, device_type, x, y):
+    # __slots__ evita um __dict__ por dispositivo em topologias grandes
+    __slots__ = ("name", "ip_int", "prefix", "mask_int", "network_int", "device_type",
+                 "x", "y", "id", "connections")
+
+    def __init__(self, name, ip_str, device_type, x, y, netmask=DEFAULT_NETMASK):
         self.name = name
-        self.ip = ip
-        self.device_type = device_type
+        # Endereço e máscara como inteiros, calculados uma única vez
+        self.ip_int = int(ipaddress.IPv4Address(ip_str))
+        self.prefix = prefix_length(netmask)
+        self.mask_int = prefix_mask(self.prefix)
+        self.network_int = self.ip_int & self.mask_int
+        self.device_type = device_type  # "pc", "roteador", etc
         self.x = x
         self.y = y
+        self.id = None  # id inteiro atribuído pelo NetworkManager
+        # dispositivos conectados diretamente (dict usado como conjunto ordenado)
+        self.connections = {}
+
+    @property
+    def ip(self):
+        return ipaddress.IPv4Address(self.ip_int)
+
+    def add_connection(self, other_device):
+        self.connections[other_device] = None
+
+    def remove_connection(self, other_device):
+        self.connections.pop(other_device, None)
+
+    @property
+    def subnet(self):
+        return (self.network_int, self.prefix)
+
+    @property
+    def netmask(self):
+        return str(ipaddress.IPv4Address(self.mask_int))
+
+    def in_same_network(self, other, netmask=None):
+        # Por padrão compara pela mais restritiva das duas máscaras, para que a
+        # relação seja simétrica quando os prefixos diferem
+        mask = self.mask_int | other.mask_int if netmask is None else prefix_mask(prefix_length(netmask))
+        return (self.ip_int ^ other.ip_int) & mask == 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "ip": str(self.ip),
+            "prefix": self.prefix,
+            "type": self.device_type,
+            "x": self.x,
+            "y": self.y
+        }
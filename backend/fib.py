@@ -0,0 +1,55 @@
+# Tabela de encaminhamento de um roteador, pela linha de comando.
+#
+#   python -m backend.fib rede r1
+#   python -m backend.fib rede r1 --lookup 10.0.3.7
+import argparse
+import ipaddress
+import sys
+
+from .addressing import format_subnet
+from .network_manager import NetworkManager
+from .run import resolve_network
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.fib",
+                                     description="Mostra a tabela de encaminhamento de um roteador.")
+    parser.add_argument("network", help="arquivo da rede ou nome em saved_networks/")
+    parser.add_argument("router", help="nome do roteador")
+    parser.add_argument("--lookup", nargs="+", metavar="IP", help="só consulta estes endereços")
+    args = parser.parse_args(argv)
+
+    filename = resolve_network(args.network)
+    manager = NetworkManager()
+    try:
+        manager.load_from_file(filename)
+    except (OSError, ValueError) as e:
+        print(f"Falha ao carregar {filename}: {e}", file=sys.stderr)
+        return 1
+    router = manager.get_device(args.router)
+    if not router or router.device_type != "roteador":
+        print(f"{args.router}: roteador não encontrado", file=sys.stderr)
+        return 1
+
+    tables = manager.fib
+    if args.lookup:
+        for address in args.lookup:
+            try:
+                found = tables.route(router, int(ipaddress.IPv4Address(address)))
+            except ValueError:
+                print(f"{address}: endereço inválido", file=sys.stderr)
+                return 2
+            if found is None:
+                print(f"{address}: sem rota")
+            else:
+                key, distance, hop = found
+                print(f"{address}: {format_subnet(*key)} via {hop.name if hop else 'entrega direta'}"
+                      f" ({distance} saltos)")
+        return 0
+    for prefix, hop, distance in manager.forwarding_table(args.router):
+        print(f"{prefix:<20} {hop or 'direto':<16} {distance}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
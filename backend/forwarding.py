@@ -0,0 +1,459 @@
+# Tabelas de encaminhamento (FIB) dos roteadores, com casamento pelo prefixo
+# mais longo.
+#
+# Anúncios: cada roteador anuncia as sub-redes ligadas a ele (a dele e as dos
+# dispositivos pendurados nele). Um prefixo que o roteador não consegue
+# entregar sozinho não é anunciado: uma sub-rede espalhada por vários
+# roteadores, ou que contém o endereço de um dispositivo ligado a outro
+# roteador (com máscaras diferentes, 10.0.0.0/16 num roteador e 10.0.5.0/24 em
+# outro). No lugar dele, o roteador anuncia rotas /32 para os seus dispositivos
+# dessa sub-rede. Assim todo prefixo que contém o endereço de um dispositivo
+# leva a um roteador ligado a ele.
+#
+# Protocolo simulado: cada prefixo anunciado é inundado a partir dos roteadores
+# de origem, como num vetor de distâncias já convergido; cada roteador guarda a
+# distância (em saltos) até o prefixo e encaminha para um vizinho que está um
+# salto mais perto. Só roteadores propagam rotas, então só roteadores são
+# trânsito, como nas demais estratégias.
+#
+# Memória: os prefixos ficam num único trie binário em arrays, compartilhado
+# por todos os roteadores (a FIB de cada um tem os mesmos prefixos; muda só o
+# próximo salto). Cada prefixo usado tem uma coluna com a distância de cada
+# roteador (2 bytes por roteador), calculada na primeira consulta; as colunas
+# menos usadas são descartadas acima de max_columns. Com 10 mil roteadores e
+# 2048 colunas, são uns 40 MB no pior caso.
+#
+# Consulta: descer o trie pelo endereço (no máximo 32 níveis) dá os prefixos
+# que o contêm; vale o mais longo para o qual o roteador tem rota. O próximo
+# salto é o vizinho com distância um a menos, então o custo não depende do
+# tamanho da rede. Como nenhum prefixo anunciado leva a uma origem que não
+# entrega, todos os roteadores do caminho escolhem o mesmo prefixo e não há laços.
+#
+# Alterações: um enlace novo entre roteadores só diminui distâncias, e a busca
+# parte da ponta que melhorou. Um enlace removido só afeta os roteadores que
+# perderam todos os vizinhos mais próximos da origem; só eles são recalculados.
+# Mudanças em enlaces de PCs e em dispositivos refazem os anúncios, e só as
+# colunas dos prefixos cuja origem mudou são descartadas.
+from array import array
+from bisect import bisect_left
+from heapq import heapify, heappop, heappush
+
+from . import metrics
+from .addressing import format_subnet, prefix_mask
+
+MAX_COLUMNS = 2048  # prefixos com distâncias em memória
+
+_COLUMNS = metrics.counter("forwarding_columns_computed_total", "Prefixos inundados (colunas de distância calculadas)")
+_REPAIRED = metrics.counter("forwarding_routers_repaired_total",
+                            "Roteadores recalculados após a remoção de enlaces")
+
+
+def _is_router(device):
+    return device.device_type == "roteador"
+
+
+def _attached(router):
+    # O roteador e os dispositivos (não roteadores) ligados a ele
+    return [router] + [neighbor for neighbor in router.connections if not _is_router(neighbor)]
+
+
+def _infinity(column):
+    return (1 << 8 * column.itemsize) - 1
+
+
+class PrefixTrie:
+    # Trie binário de prefixos IPv4. Cada nó ocupa duas posições em `children`
+    # (filho do bit 0 e do bit 1; 0 = nenhum, a raiz é o nó 0) e um byte em
+    # `marked`. O prefixo de um nó é o caminho até ele, então não é guardado.
+
+    def __init__(self):
+        self.children = array("i", [0, 0])
+        self.marked = bytearray(1)
+        self.free = []  # nós podados, reaproveitados
+        self.count = 0  # prefixos no trie
+
+    def _node(self):
+        if self.free:
+            return self.free.pop()
+        self.marked.append(0)
+        self.children.extend((0, 0))
+        return len(self.marked) - 1
+
+    def add(self, network, length):
+        node = 0
+        for depth in range(length):
+            slot = 2 * node + ((network >> (31 - depth)) & 1)
+            child = self.children[slot]
+            if not child:
+                child = self.children[slot] = self._node()
+            node = child
+        if not self.marked[node]:
+            self.marked[node] = 1
+            self.count += 1
+
+    def discard(self, network, length):
+        slots = []
+        node = 0
+        for depth in range(length):
+            slot = 2 * node + ((network >> (31 - depth)) & 1)
+            node = self.children[slot]
+            if not node:
+                return
+            slots.append(slot)
+        if not self.marked[node]:
+            return
+        self.marked[node] = 0
+        self.count -= 1
+        # Poda os nós que ficaram sem prefixo e sem filhos
+        children = self.children
+        while slots and not self.marked[node] and not children[2 * node] and not children[2 * node + 1]:
+            slot = slots.pop()
+            children[slot] = 0
+            self.free.append(node)
+            node = slot // 2
+
+    def matches(self, address):
+        # Comprimentos dos prefixos que contêm o endereço, do mais longo ao mais curto
+        children = self.children
+        marked = self.marked
+        found = []
+        node = 0
+        depth = 0
+        while True:
+            if marked[node]:
+                found.append(depth)
+            if depth == 32:
+                break
+            node = children[2 * node + ((address >> (31 - depth)) & 1)]
+            if not node:
+                break
+            depth += 1
+        found.reverse()
+        return found
+
+    def memory(self):
+        return self.children.itemsize * len(self.children) + len(self.marked)
+
+
+class ForwardingTables:
+    def __init__(self, max_columns=MAX_COLUMNS):
+        self.slot = {}  # roteador -> posição nas colunas (não é reaproveitada)
+        self.routers = []  # posição -> roteador (None depois de removido)
+        self.trie = PrefixTrie()
+        self.origins = {}  # (rede, prefixo) anunciado -> posições dos roteadores de origem
+        self.columns = {}  # (rede, prefixo) -> distâncias por posição, da menos à mais usada
+        self.max_columns = max_columns
+        self.stale = False  # anúncios precisam ser refeitos
+        self.computations = 0  # colunas calculadas (útil em benchmarks)
+
+    # --- anúncios ---
+
+    def _refresh(self):
+        if not self.stale:
+            return
+        groups = [(i, _attached(router)) for router, i in self.slot.items()]
+        owners = {}  # sub-rede -> roteadores ligados a ela
+        attached = {}  # dispositivos ligados a algum roteador (e os roteadores)
+        for i, group in groups:
+            for member in group:
+                owners.setdefault(member.subnet, set()).add(i)
+                attached[member] = None
+        members = sorted(attached, key=lambda device: device.ip_int)
+        addresses = [device.ip_int for device in members]
+
+        def delivers(subnet, router):
+            # Todo dispositivo com endereço dentro da sub-rede é o roteador ou está
+            # pendurado nele? (outro roteador não conta: enlaces entre roteadores
+            # não refazem os anúncios)
+            network, length = subnet
+            start = bisect_left(addresses, network)
+            end = bisect_left(addresses, network + (1 << 32 - length), start)
+            return all(members[k] is router or (not _is_router(members[k]) and members[k] in router.connections)
+                       for k in range(start, end))
+
+        announced = {}  # sub-rede -> a origem consegue entregar?
+        for subnet, routers in owners.items():
+            announced[subnet] = len(routers) == 1 and delivers(subnet, self.routers[next(iter(routers))])
+        origins = {}
+        for i, group in groups:
+            for member in group:
+                subnet = member.subnet
+                key = subnet if announced[subnet] else (member.ip_int, 32)
+                origins.setdefault(key, set()).add(i)
+        for key, old in self.origins.items():
+            new = origins.get(key)
+            if new != old:
+                self.columns.pop(key, None)
+            if new is None:
+                self.trie.discard(*key)
+        for key in origins:
+            if key not in self.origins:
+                self.trie.add(*key)
+        self.origins = {key: frozenset(value) for key, value in origins.items()}
+        self.stale = False
+
+    # --- colunas de distância ---
+
+    def _fit(self, column):
+        # Roteadores incluídos depois do cálculo da coluna ainda não têm rota
+        missing = len(self.routers) - len(column)
+        if missing > 0:
+            if column.typecode == "H" and len(self.routers) >= 0xFFFF:
+                column = array("I", (0xFFFFFFFF if value == 0xFFFF else value for value in column))
+            column.extend([_infinity(column)] * missing)
+        return column
+
+    def _column(self, key):
+        column = self.columns.pop(key, None)
+        if column is None:
+            column = self._flood(self.origins[key])
+            if len(self.columns) >= self.max_columns:
+                del self.columns[next(iter(self.columns))]
+        else:
+            column = self._fit(column)
+        self.columns[key] = column  # volta para o fim: a ordem é a de uso
+        return column
+
+    def _flood(self, origins):
+        # Busca em largura a partir de todas as origens, só por roteadores
+        size = len(self.routers)
+        typecode = "H" if size < 0xFFFF else "I"
+        inf = _infinity(array(typecode))
+        column = array(typecode, [inf]) * size
+        slot = self.slot
+        frontier = []
+        for i in origins:
+            column[i] = 0
+            frontier.append(self.routers[i])
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for router in frontier:
+                for neighbor in router.connections:
+                    j = slot.get(neighbor)
+                    if j is not None and column[j] == inf:
+                        column[j] = distance
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        self.computations += 1
+        if metrics.enabled:
+            _COLUMNS.inc()
+        return column
+
+    def _relax(self, column, router, distance):
+        # Propaga uma distância menor a partir de um roteador (enlace novo)
+        slot = self.slot
+        column[slot[router]] = distance
+        frontier = [router]
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for node in frontier:
+                for neighbor in node.connections:
+                    j = slot.get(neighbor)
+                    if j is not None and distance < column[j]:
+                        column[j] = distance
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+
+    def _repair(self, column, starts):
+        # Recalcula os roteadores que ficaram sem vizinho um salto mais perto da
+        # origem. Primeiro acha quem perdeu o caminho (em ordem de distância, para
+        # que os vizinhos de um nível já estejam decididos), depois reinunda só
+        # esses roteadores a partir da borda que continuou válida.
+        slot = self.slot
+        inf = _infinity(column)
+        heap = [(column[slot[router]], slot[router], router) for router in starts]
+        heapify(heap)
+        lost = {}
+        while heap:
+            distance, i, router = heappop(heap)
+            if i in lost or distance == 0:
+                continue
+            supported = False
+            for neighbor in router.connections:
+                j = slot.get(neighbor)
+                if j is not None and column[j] == distance - 1 and j not in lost:
+                    supported = True
+                    break
+            if supported:
+                continue
+            lost[i] = router
+            for neighbor in router.connections:
+                j = slot.get(neighbor)
+                if j is not None and column[j] == distance + 1 and j not in lost:
+                    heappush(heap, (distance + 1, j, neighbor))
+        if not lost:
+            return
+        for i in lost:
+            column[i] = inf
+        heap = []
+        for i, router in lost.items():
+            best = inf
+            for neighbor in router.connections:
+                j = slot.get(neighbor)
+                if j is not None and column[j] < best:
+                    best = column[j]
+            if best < inf:
+                heap.append((best + 1, i, router))
+        heapify(heap)
+        while heap:
+            distance, i, router = heappop(heap)
+            if distance >= column[i]:
+                continue
+            column[i] = distance
+            for neighbor in router.connections:
+                j = slot.get(neighbor)
+                if j is not None and distance + 1 < column[j]:
+                    heappush(heap, (distance + 1, j, neighbor))
+        if metrics.enabled:
+            _REPAIRED.inc(len(lost))
+
+    # --- consultas ---
+
+    def _entry(self, router, key):
+        # (distância, próximo salto) do roteador para um prefixo anunciado;
+        # próximo salto None = o roteador é origem (entrega direta)
+        column = self._column(key)
+        distance = column[self.slot[router]]
+        if distance == _infinity(column):
+            return None
+        if distance == 0:
+            return 0, None
+        slot = self.slot
+        for neighbor in router.connections:
+            j = slot.get(neighbor)
+            if j is not None and column[j] == distance - 1:
+                return distance, neighbor
+        return None
+
+    def route(self, router, address):
+        # Rota mais específica que o roteador conhece para o endereço:
+        # (prefixo, distância, próximo salto), ou None se não há rota
+        self._refresh()
+        for length in self.trie.matches(address):
+            key = (address & prefix_mask(length), length)
+            entry = self._entry(router, key)
+            if entry is not None:
+                return (key,) + entry
+        return None
+
+    def next_hop(self, device, dest):
+        if dest in device.connections:
+            return dest
+        if device in self.slot:
+            found = self.route(device, dest.ip_int)
+            return found[2] if found else None
+        # Outros dispositivos entregam ao roteador vizinho com a rota mais
+        # específica e, entre essas, ao mais perto do destino
+        best = None
+        for gateway in device.connections:
+            if gateway in self.slot:
+                found = self.route(gateway, dest.ip_int)
+                if found:
+                    rank = (-found[0][1], found[1])
+                    if best is None or rank < best[0]:
+                        best = (rank, gateway)
+        return best[1] if best else None
+
+    def path(self, source, dest):
+        # Caminho salto a salto, consultando a FIB de cada roteador
+        self._refresh()
+        path = [source]
+        node = source
+        while node is not dest:
+            node = self.next_hop(node, dest)
+            if node is None or len(path) > len(self.slot) + 1:
+                return None
+            path.append(node)
+        return tuple(path)
+
+    def table(self, router):
+        # FIB completa do roteador: (prefixo, próximo salto ou None, distância),
+        # em ordem de prefixo. Calcula as colunas que faltarem.
+        self._refresh()
+        rows = []
+        for key in sorted(self.origins):
+            entry = self._entry(router, key)
+            if entry is not None:
+                rows.append((format_subnet(*key), entry[1], entry[0]))
+        return rows
+
+    def memory(self):
+        # Bytes das colunas e do trie
+        return sum(column.itemsize * len(column) for column in self.columns.values()) + self.trie.memory()
+
+    # --- atualização incremental ---
+
+    def clear(self):
+        self.slot.clear()
+        self.routers.clear()
+        self.trie = PrefixTrie()
+        self.origins.clear()
+        self.columns.clear()
+        self.stale = False
+
+    def device_added(self, device):
+        if _is_router(device):
+            self.slot[device] = len(self.routers)
+            self.routers.append(device)
+            self.stale = True
+
+    def device_removed(self, device):
+        # Os vizinhos já não apontam para o dispositivo; device.connections ainda os lista
+        if not _is_router(device):
+            if any(neighbor in self.slot for neighbor in device.connections):
+                self.stale = True
+            return
+        i = self.slot.pop(device)
+        self.routers[i] = None
+        self.stale = True
+        for key, column in list(self.columns.items()):
+            column = self.columns[key] = self._fit(column)
+            distance = column[i]
+            inf = _infinity(column)
+            if distance == inf:
+                continue
+            column[i] = inf
+            if distance == 0:
+                del self.columns[key]  # a origem saiu: os anúncios mudam de todo modo
+                continue
+            starts = [neighbor for neighbor in device.connections
+                      if neighbor in self.slot and column[self.slot[neighbor]] == distance + 1]
+            if starts:
+                self._repair(column, starts)
+
+    def link_added(self, d1, d2):
+        i = self.slot.get(d1)
+        j = self.slot.get(d2)
+        if i is None or j is None:
+            if i is not None or j is not None:
+                self.stale = True
+            return
+        for key, column in self.columns.items():
+            column = self.columns[key] = self._fit(column)
+            a = column[i]
+            b = column[j]
+            if a + 1 < b:
+                self._relax(column, d2, a + 1)
+            elif b + 1 < a:
+                self._relax(column, d1, b + 1)
+
+    def link_removed(self, d1, d2):
+        i = self.slot.get(d1)
+        j = self.slot.get(d2)
+        if i is None or j is None:
+            if i is not None or j is not None:
+                self.stale = True
+            return
+        for key, column in self.columns.items():
+            column = self.columns[key] = self._fit(column)
+            a = column[i]
+            b = column[j]
+            # Só a ponta mais distante pode ter perdido o caminho
+            if b == a + 1:
+                self._repair(column, [d2])
+            elif a == b + 1:
+                self._repair(column, [d1])
+
@@ -0,0 +1,172 @@
+# Geradores de topologias sintéticas (reprodutíveis pela semente).
+#
+# Cada roteador r{i} fica numa sub-rede /24 própria (10.0.0.0/8 em diante,
+# roteador no .1) com `pcs` PCs pendurados nele (pc{i}_{k}, a partir do .2),
+# então todo caminho entre sub-redes passa por roteadores.
+#
+#   python -m backend.generators grid 10000 --pcs 2 --seed 1 -o saved_networks/grade.json
+#   python -m backend.generators fat-tree 8 -o saved_networks/fat.pnet
+import argparse
+import math
+import random
+import sys
+
+from .network_manager import NetworkManager
+
+SPACING = 120  # distância entre roteadores na tela
+BASE_NETWORK = 10 << 24  # 10.0.0.0
+
+
+def line(n, rng):
+    return n, [(i, i + 1) for i in range(n - 1)]
+
+
+def star(n, rng):
+    return n, [(0, i) for i in range(1, n)]
+
+
+def tree(n, rng, branching=2):
+    return n, [((i - 1) // branching, i) for i in range(1, n)]
+
+
+def _side(n):
+    # Lado do menor quadrado com n posições
+    return math.isqrt(n - 1) + 1 if n > 1 else 1
+
+
+def grid(n, rng):
+    side = _side(n)
+    edges = []
+    for i in range(n):
+        if i % side:
+            edges.append((i - 1, i))
+        if i >= side:
+            edges.append((i - side, i))
+    return n, edges
+
+
+def fat_tree(k, rng):
+    # Fat-tree k-ária: (k/2)² roteadores de núcleo e k pods, cada um com k/2
+    # roteadores de agregação e k/2 de borda. Aqui n é o k (par).
+    if k < 2 or k % 2:
+        raise ValueError("fat-tree exige k par (>= 2)")
+    half = k // 2
+    core = half * half
+    edges = []
+    for pod in range(k):
+        aggregation = core + pod * k
+        edge = aggregation + half
+        for a in range(half):
+            # cada agregação liga a k/2 núcleos e a todas as bordas do pod
+            for c in range(half):
+                edges.append((a * half + c, aggregation + a))
+            for e in range(half):
+                edges.append((aggregation + a, edge + e))
+    return core + k * k, edges
+
+
+def erdos_renyi(n, rng, degree=4.0):
+    # G(n, m) com m = n * grau médio / 2 enlaces sorteados sem repetição
+    target = min(int(n * degree / 2), n * (n - 1) // 2)
+    edges = set()
+    while len(edges) < target:
+        a, b = rng.randrange(n), rng.randrange(n)
+        if a != b:
+            edges.add((a, b) if a < b else (b, a))
+    return n, sorted(edges)
+
+
+def barabasi_albert(n, rng, m=2):
+    # Ligação preferencial: cada nó novo se liga a m nós sorteados com
+    # probabilidade proporcional ao grau (lista com cada nó repetido por grau)
+    m = max(1, min(m, n - 1))
+    edges = [(i, j) for i in range(m + 1) for j in range(i + 1, m + 1)]
+    repeated = [node for edge in edges for node in edge]
+    for new in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(repeated[rng.randrange(len(repeated))])
+        for target in targets:
+            edges.append((target, new))
+            repeated += (target, new)
+    return n, edges
+
+
+TOPOLOGIES = {
+    "line": line,
+    "star": star,
+    "tree": tree,
+    "grid": grid,
+    "fat-tree": fat_tree,
+    "erdos-renyi": erdos_renyi,
+    "barabasi-albert": barabasi_albert,
+}
+
+
+def router_ip(i):
+    return BASE_NETWORK + (i << 8) + 1
+
+
+def position(kind, i, count):
+    if kind == "line":
+        return i * SPACING, 0
+    if kind == "star" and i:
+        angle = 2 * math.pi * i / (count - 1)
+        radius = SPACING * max(1.0, (count - 1) / (2 * math.pi))
+        return radius * math.cos(angle), radius * math.sin(angle)
+    side = _side(count)
+    return (i % side) * SPACING, (i // side) * SPACING
+
+
+def generate(kind, n, seed=0, pcs=0, manager=None, **params):
+    # Retorna um NetworkManager com a topologia pedida (n roteadores, ou k no fat-tree)
+    if kind not in TOPOLOGIES:
+        raise ValueError(f"Topologia desconhecida: {kind} (use {', '.join(TOPOLOGIES)})")
+    rng = random.Random(seed)
+    count, edges = TOPOLOGIES[kind](n, rng, **params)
+    if pcs > 253:
+        raise ValueError("No máximo 253 PCs por roteador (uma /24 por roteador)")
+    if count > 1 << 16:
+        # Cada roteador usa uma /24 dentro de 10.0.0.0/8
+        raise ValueError("Roteadores demais para o plano de endereços (máximo 65536)")
+    manager = manager or NetworkManager()
+    manager.clear()
+    for i in range(count):
+        x, y = position(kind, i, count)
+        manager.add_device(f"r{i}", router_ip(i), "roteador", x, y)
+        for k in range(pcs):
+            name = f"pc{i}_{k}"
+            manager.add_device(name, router_ip(i) + 1 + k, "pc",
+                               x + (k - (pcs - 1) / 2) * SPACING / max(pcs, 2), y + SPACING / 2)
+            manager.create_connection(name, f"r{i}")
+    for a, b in edges:
+        manager.create_connection(f"r{a}", f"r{b}")
+    return manager
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.generators",
+                                     description="Gera uma rede sintética e salva em JSON ou .pnet.")
+    parser.add_argument("kind", choices=list(TOPOLOGIES))
+    parser.add_argument("n", type=int, help="número de roteadores (k no fat-tree)")
+    parser.add_argument("--pcs", type=int, default=1, help="PCs por roteador (padrão: 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--degree", type=float, default=4.0, help="grau médio no erdos-renyi")
+    parser.add_argument("--m", type=int, default=2, help="enlaces por nó novo no barabasi-albert")
+    parser.add_argument("--branching", type=int, default=2, help="filhos por nó na árvore")
+    parser.add_argument("-o", "--output", required=True, help="arquivo de saída (.json ou .pnet)")
+    args = parser.parse_args(argv)
+    params = {"erdos-renyi": {"degree": args.degree}, "barabasi-albert": {"m": args.m},
+              "tree": {"branching": args.branching}}.get(args.kind, {})
+    try:
+        manager = generate(args.kind, args.n, seed=args.seed, pcs=args.pcs, **params)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    manager.save_to_file(args.output)
+    print(f"{args.output}: {len(manager.devices)} dispositivos, {len(manager.links)} conexões")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# Atributos dos enlaces e roteamento ponderado sobre um retrato CSR do grafo.
+#
+# CSR (compressed sparse row): os vizinhos do nó i ficam em
+# targets[offsets[i]:offsets[i + 1]], com os custos e capacidades nas mesmas
+# posições de costs e capacities. Os arrays são contíguos, então o Dijkstra
+# não segue objetos Device e o retrato pode ser copiado para outros processos.
+import heapq
+import zlib
+from array import array
+
+from . import metrics
+
+DEFAULT_COST = 1.0
+# Tolerância para considerar dois custos iguais (custos fracionários somam com erro)
+EPSILON = 1e-9
+INFINITY = float("inf")
+
+_SETTLED = metrics.histogram("routing_nodes_visited", "Dispositivos alcançados por busca",
+                             buckets=metrics.COUNT_BUCKETS, algorithm="dijkstra")
+
+
+class LinkAttributes:
+    __slots__ = ("cost", "capacity")
+
+    def __init__(self, cost=DEFAULT_COST, capacity=None):
+        if not cost > 0:
+            raise ValueError("Custo do enlace deve ser positivo")
+        if capacity is not None and not capacity > 0:
+            raise ValueError("Capacidade do enlace deve ser positiva")
+        self.cost = float(cost)
+        self.capacity = capacity  # bits por segundo; None usa a banda padrão da simulação
+
+    def is_default(self):
+        return self.cost == DEFAULT_COST and self.capacity is None
+
+    def to_dict(self):
+        data = {"cost": self.cost}
+        if self.capacity is not None:
+            data["capacity"] = self.capacity
+        return data
+
+
+def flow_hash(source, destination, flow=0):
+    # Hash estável entre execuções (o hash() de str muda a cada processo)
+    return zlib.crc32(f"{source}|{destination}|{flow}".encode("utf-8"))
+
+
+def _mix(value, node):
+    # Cada roteador embaralha o hash com o próprio índice; sem isso todos
+    # escolheriam a mesma posição entre os próximos saltos (polarização).
+    # Os bits baixos de um produto só dependem dos bits baixos dos fatores,
+    # por isso usamos os altos.
+    return (((value ^ node) * 2654435761) & 0xFFFFFFFF) >> 16
+
+
+class CSRGraph:
+    def __init__(self, names, routers, offsets, targets, costs, capacities):
+        self.names = names  # índice -> nome do dispositivo
+        self.index = {name: i for i, name in enumerate(names)}
+        self.routers = routers  # bytearray: 1 se o nó pode ser intermediário
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.capacities = capacities  # 0.0 quando o enlace não define capacidade
+
+    @classmethod
+    def from_manager(cls, manager):
+        names = []
+        index = {}
+        routers = bytearray()
+        for i, device in enumerate(manager.devices):
+            names.append(device.name)
+            index[device] = i
+            routers.append(device.device_type == "roteador")
+        offsets = array("I", [0])
+        targets = array("i")
+        costs = array("d")
+        capacities = array("d")
+        links = manager.links
+        link_key = manager.link_key
+        for device in manager.devices:
+            name = device.name
+            for neighbor in device.connections:
+                attributes = links[link_key(name, neighbor.name)]
+                targets.append(index[neighbor])
+                costs.append(attributes.cost)
+                capacities.append(attributes.capacity or 0.0)
+            offsets.append(len(targets))
+        return cls(names, routers, offsets, targets, costs, capacities)
+
+    def __len__(self):
+        return len(self.names)
+
+    def distances_to(self, dest, stop=None):
+        # Dijkstra a partir do destino (os enlaces são bidirecionais). Só o
+        # destino e os roteadores são expandidos; os demais dispositivos
+        # recebem distância mas são apenas pontas de caminho. Com stop, para
+        # assim que esse nó é fechado (consulta de um único par).
+        offsets, targets, costs, routers = self.offsets, self.targets, self.costs, self.routers
+        dist = [INFINITY] * len(self.names)
+        dist[dest] = 0.0
+        heap = [(0.0, dest)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+        expanded = 0
+        while heap:
+            d, node = heappop(heap)
+            if d > dist[node]:
+                continue
+            if node == stop:
+                break
+            if node != dest and not routers[node]:
+                continue
+            expanded += 1
+            for k in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[k]
+                nd = d + costs[k]
+                if nd < dist[neighbor]:
+                    dist[neighbor] = nd
+                    heappush(heap, (nd, neighbor))
+        if metrics.enabled:
+            _SETTLED.observe(expanded)
+        return dist
+
+    def next_hops(self, node, dest, dist):
+        # Vizinhos de node que continuam um caminho de custo mínimo até dest
+        offsets, targets, costs, routers = self.offsets, self.targets, self.costs, self.routers
+        target = dist[node]
+        tolerance = EPSILON * max(1.0, target)
+        hops = []
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[k]
+            if neighbor != dest and not routers[neighbor]:
+                continue
+            if abs(dist[neighbor] + costs[k] - target) <= tolerance:
+                hops.append(neighbor)
+        return hops
+
+    def path(self, source, dest, hash_value=None, dist=None):
+        # Caminho de custo mínimo em índices. Sem hash_value, sempre o primeiro
+        # próximo salto (determinístico); com ele, ECMP: cada nó escolhe entre
+        # os próximos saltos de mesmo custo pelo hash do fluxo.
+        if source == dest:
+            return (source,)
+        if dist is None:
+            dist = self.distances_to(dest, stop=source)
+        if dist[source] == INFINITY:
+            return None
+        path = [source]
+        node = source
+        while node != dest:
+            hops = self.next_hops(node, dest, dist)
+            if hash_value is None or len(hops) == 1:
+                node = hops[0]
+            else:
+                node = hops[_mix(hash_value, node) % len(hops)]
+            path.append(node)
+        return tuple(path)
+
+    def route_matrix(self, demands):
+        # demands: lista de (origem, destino, hash ou None) em índices.
+        # Agrupa por destino para rodar um único Dijkstra por destino.
+        by_dest = {}
+        for position, (source, dest, hash_value) in enumerate(demands):
+            by_dest.setdefault(dest, []).append((position, source, hash_value))
+        paths = [None] * len(demands)
+        for dest, items in by_dest.items():
+            dist = self.distances_to(dest) if len(items) > 1 else None
+            for position, source, hash_value in items:
+                paths[position] = self.path(source, dest, hash_value, dist)
+        return paths
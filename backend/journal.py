@@ -0,0 +1,344 @@
+# Registro de operações (journal) ao lado do arquivo da rede.
+#
+# rede.json guarda um retrato completo e rede.json.log só as operações feitas
+# depois dele, uma por linha em JSON. Salvar acrescenta ao log apenas as
+# operações pendentes, então o custo é proporcional às edições, não ao tamanho
+# da rede. Quando o log passa de uma fração do retrato, ele é compactado: o
+# retrato é regravado e o log esvaziado.
+#
+# Ao carregar, o log é reaplicado sobre o retrato (recuperação após uma queda).
+# Desfazer/refazer usam o mesmo registro: desfazer grava a operação inversa
+# marcada com "undo" e refazer regrava a original marcada com "redo", então o
+# histórico também é reconstruído na releitura. A compactação recomeça o log
+# com as pilhas de desfazer/refazer marcadas com "history": na releitura elas
+# só reconstroem o histórico, sem alterar a rede.
+#
+# Operações:
+#   {"op": "add_device", "device": {...}, "links": [[a, b, {atributos}], ...]}
+#   {"op": "remove_device", "device": {...}, "links": [...]}
+#   {"op": "connect", "link": [a, b, {atributos}]}
+#   {"op": "disconnect", "link": [a, b, {atributos}]}
+#   {"op": "move", "positions": {nome: [x, y]}, "previous": {nome: [x, y]}}
+#
+# Toda operação leva o estado final completo do que altera, e a aplicação é
+# tolerante (incluir substitui, remover o que não existe é ignorado). Assim
+# reaplicar um log sobre um retrato que já o contém dá o mesmo resultado, o que
+# cobre uma queda entre gravar o retrato compactado e esvaziar o log.
+import json
+import os
+from collections import deque
+
+from .addressing import DEFAULT_NETMASK
+from .graph import DEFAULT_COST
+from .loader import LoadReport
+
+LOG_SUFFIX = ".log"
+COMPACT_MIN_BYTES = 1 << 20  # abaixo disso o log nunca é compactado
+COMPACT_RATIO = 0.5  # compacta quando o log passa dessa fração do retrato
+MAX_HISTORY = 1000  # operações que podem ser desfeitas
+
+_INVERSE = {"add_device": "remove_device", "remove_device": "add_device",
+            "connect": "disconnect", "disconnect": "connect", "move": "move"}
+
+
+def log_path(filename):
+    return filename + LOG_SUFFIX
+
+
+def _link(manager, name1, name2):
+    return [name1, name2, manager.link_attributes(name1, name2).to_dict()]
+
+
+def _incident_links(manager, device):
+    return [_link(manager, device.name, neighbor.name) for neighbor in device.connections]
+
+
+def inverse(entry):
+    op = entry["op"]
+    if op == "move":
+        return {"op": "move", "positions": entry["previous"], "previous": entry["positions"]}
+    return dict(entry, op=_INVERSE[op])
+
+
+def _connect(manager, link):
+    name1, name2, attributes = link
+    if manager.has_connection(name1, name2):
+        manager.set_link_attributes(name1, name2, attributes.get("cost", DEFAULT_COST),
+                                    attributes.get("capacity"))
+    else:
+        manager.create_connection(name1, name2, attributes.get("cost", DEFAULT_COST),
+                                  attributes.get("capacity"))
+
+
+def apply(manager, entry):
+    op = entry["op"]
+    if op == "add_device":
+        device = entry["device"]
+        manager.remove_device(device["name"])
+        manager.add_device(device["name"], device["ip"], device["type"], device["x"], device["y"],
+                           device.get("prefix", DEFAULT_NETMASK))
+        for link in entry["links"]:
+            _connect(manager, link)
+    elif op == "remove_device":
+        manager.remove_device(entry["device"]["name"])
+    elif op == "connect":
+        _connect(manager, entry["link"])
+    elif op == "disconnect":
+        manager.remove_connection(*entry["link"][:2])
+    elif op == "move":
+        for name, (x, y) in entry["positions"].items():
+            device = manager.get_device(name)
+            if device:
+                device.x = x
+                device.y = y
+    else:
+        raise ValueError(f"Operação desconhecida no log: {op!r}")
+
+
+def _lines(entries):
+    return "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+
+
+def read_log(filename):
+    # Entradas do log em ordem. Uma última linha incompleta (queda no meio da
+    # gravação) é descartada; uma linha inválida no meio do arquivo é erro.
+    if not os.path.exists(filename):
+        return
+    with open(filename, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            if number == len(lines) and not line.endswith("\n"):
+                return
+            raise ValueError(f"{filename}, linha {number}: registro inválido")
+
+
+class History:
+    # Pilhas de desfazer/refazer; guardam as operações originais
+    def __init__(self, max_history=MAX_HISTORY):
+        self.undo_stack = deque(maxlen=max_history)
+        self.redo_stack = []
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def entries(self):
+        # Entradas "history" que reconstroem as duas pilhas com track(): as
+        # operações desfeitas entram como normais e são desfeitas em seguida
+        entries = [dict(entry, history=True) for entry in self.undo_stack]
+        entries += [dict(entry, history=True) for entry in reversed(self.redo_stack)]
+        entries += [dict(inverse(entry), undo=True, history=True) for entry in self.redo_stack]
+        return entries
+
+    def track(self, entry):
+        # Atualiza as pilhas com uma entrada gravada (normal, "undo" ou "redo")
+        if entry.get("undo"):
+            if self.undo_stack:
+                self.redo_stack.append(self.undo_stack.pop())
+        elif entry.get("redo"):
+            if self.redo_stack:
+                self.undo_stack.append(self.redo_stack.pop())
+        else:
+            self.undo_stack.append(entry)
+            self.redo_stack.clear()
+
+
+def replay(manager, filename, history=None):
+    # Reaplica o log sobre o estado atual; retorna o número de operações aplicadas
+    count = 0
+    for entry in read_log(filename):
+        if entry.pop("history", False):
+            if history is not None:
+                history.track(entry)
+            continue
+        apply(manager, entry)
+        if history is not None:
+            history.track(entry)
+        count += 1
+    return count
+
+
+class Journal:
+    def __init__(self, manager, filename=None, indent=None, max_history=MAX_HISTORY,
+                 compact_min_bytes=COMPACT_MIN_BYTES, compact_ratio=COMPACT_RATIO):
+        self.manager = manager
+        self.filename = filename
+        self.indent = indent
+        self.history = History(max_history)
+        self.pending = []  # entradas ainda não gravadas no log
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_ratio = compact_ratio
+        self.log_bytes = 0
+        self.snapshot_bytes = 0
+        if filename:
+            self._stat()
+
+    @property
+    def dirty(self):
+        return bool(self.pending)
+
+    def can_undo(self):
+        return bool(self.history.undo_stack)
+
+    def can_redo(self):
+        return bool(self.history.redo_stack)
+
+    def _stat(self):
+        log = log_path(self.filename)
+        self.log_bytes = os.path.getsize(log) if os.path.exists(log) else 0
+        self.snapshot_bytes = os.path.getsize(self.filename) if os.path.exists(self.filename) else 0
+
+    # --- arquivos ---
+
+    def open(self, filename):
+        # Carrega o retrato (se existir) e reaplica o log; o histórico vem do log.
+        # Tudo é montado à parte: se falhar, a rede e o arquivo atuais continuam.
+        staging = type(self.manager)()
+        history = History(self.history.undo_stack.maxlen)
+        if os.path.exists(filename) or not self.recoverable(filename):
+            report = staging.load_from_file(filename, replay_log=False)
+        else:
+            # Sessão que caiu antes do primeiro retrato: só há o log
+            report = LoadReport()
+        report.replayed = replay(staging, log_path(filename), history)
+        self.manager.adopt(staging)
+        self.filename = filename
+        self.pending = []
+        self.history = history
+        self._stat()
+        return report
+
+    def recoverable(self, filename=None):
+        # Há operações no log que ainda não entraram no retrato? (as entradas
+        # "history" deixadas pela compactação não contam)
+        log = log_path(filename or self.filename)
+        if not os.path.exists(log) or os.path.getsize(log) == 0:
+            return False
+        try:
+            return any(not entry.get("history") for entry in read_log(log))
+        except ValueError:
+            return True  # o erro aparece ao abrir
+
+    def save(self):
+        # Acrescenta ao log só as operações pendentes e compacta se ele cresceu demais
+        if not self.pending or not self.filename:
+            return 0
+        lines = _lines(self.pending)
+        with open(log_path(self.filename), "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        count = len(self.pending)
+        self.pending = []
+        self.log_bytes += len(lines.encode("utf-8"))
+        if self.log_bytes > max(self.compact_min_bytes, self.snapshot_bytes * self.compact_ratio):
+            self.compact()
+        return count
+
+    def compact(self):
+        # Grava um retrato completo (num arquivo temporário trocado de uma vez)
+        # e recomeça o log só com o histórico de desfazer/refazer. Uma queda
+        # entre as duas trocas só faz o log antigo ser reaplicado (idempotente).
+        root, extension = os.path.splitext(self.filename)
+        temporary = f"{root}.tmp{extension}"
+        self.manager.save_to_file(temporary, indent=self.indent)
+        os.replace(temporary, self.filename)
+        self.pending = []
+        log = log_path(self.filename)
+        entries = self.history.entries()
+        if entries:
+            with open(log + ".tmp", "w", encoding="utf-8") as f:
+                f.write(_lines(entries))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(log + ".tmp", log)
+        elif os.path.exists(log):
+            os.remove(log)
+        self._stat()
+        self.log_bytes = 0  # o histórico não conta para a próxima compactação
+
+    def save_as(self, filename):
+        # Passa a registrar em outro arquivo, começando por um retrato completo
+        previous = self.filename
+        self.filename = filename
+        self.compact()
+        return previous
+
+    def discard(self):
+        # Descarta o log (ex.: recuperação recusada) e as operações pendentes
+        self.pending = []
+        self.history.clear()
+        log = log_path(self.filename)
+        if os.path.exists(log):
+            os.remove(log)
+        self._stat()
+
+    # --- operações ---
+
+    def record(self, entry):
+        self.pending.append(entry)
+        self.history.track(entry)
+        return entry
+
+    def add_device(self, name, ip, device_type, x, y, netmask=DEFAULT_NETMASK):
+        device = self.manager.add_device(name, ip, device_type, x, y, netmask)
+        return self.record({"op": "add_device", "device": device.to_dict(), "links": []})
+
+    def remove_device(self, name):
+        device = self.manager.get_device(name)
+        if not device:
+            return None
+        entry = {"op": "remove_device", "device": device.to_dict(),
+                 "links": _incident_links(self.manager, device)}
+        self.manager.remove_device(name)
+        return self.record(entry)
+
+    def create_connection(self, name1, name2, cost=DEFAULT_COST, capacity=None):
+        if self.manager.has_connection(name1, name2):
+            return None
+        self.manager.create_connection(name1, name2, cost, capacity)
+        if not self.manager.has_connection(name1, name2):
+            return None
+        return self.record({"op": "connect", "link": _link(self.manager, name1, name2)})
+
+    def remove_connection(self, name1, name2):
+        if not self.manager.has_connection(name1, name2):
+            return None
+        entry = {"op": "disconnect", "link": _link(self.manager, name1, name2)}
+        self.manager.remove_connection(name1, name2)
+        return self.record(entry)
+
+    def moved(self, previous):
+        # Registra dispositivos já movidos; previous: nome -> (x, y) antes do movimento
+        positions = {}
+        before = {}
+        for name, (x, y) in previous.items():
+            device = self.manager.get_device(name)
+            if device and (device.x, device.y) != (x, y):
+                positions[name] = [device.x, device.y]
+                before[name] = [x, y]
+        if not positions:
+            return None
+        return self.record({"op": "move", "positions": positions, "previous": before})
+
+    def undo(self):
+        # Retorna a operação aplicada (a inversa), ou None se não há o que desfazer
+        if not self.history.undo_stack:
+            return None
+        entry = inverse(self.history.undo_stack[-1])
+        apply(self.manager, entry)
+        self.record(dict(entry, undo=True))
+        return entry
+
+    def redo(self):
+        if not self.history.redo_stack:
+            return None
+        entry = self.history.redo_stack[-1]
+        apply(self.manager, entry)
+        self.record(dict(entry, redo=True))
+        return entry
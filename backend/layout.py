@@ -0,0 +1,210 @@
+# Layout automático por forças (Fruchterman-Reingold) vetorizado com NumPy.
+#
+# A repulsão entre todos os pares é aproximada no estilo Barnes-Hut por uma
+# quadtree implícita: em cada nível l o plano é dividido em 2^l x 2^l células
+# com massa e centro de massa (np.bincount). Cada nó interage com as células
+# "bem separadas" do nível (filhas das vizinhas da célula-pai, exceto as
+# vizinhas da própria célula) e, no nível mais fino, com as células vizinhas.
+# O custo por iteração é O(N log N) e vira algumas dezenas de operações
+# vetoriais por nível.
+#
+# NumPy é opcional para o restante do projeto; só este módulo depende dele.
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+# Células bem separadas de um nó, relativas à sua própria célula: filhas das
+# 3x3 vizinhas da célula-pai, menos as 3x3 vizinhas da célula do nó. O
+# conjunto depende só da paridade (px, py) da célula, então os nós são
+# processados em quatro grupos, cada um com 27 deslocamentos fixos.
+_FAR_OFFSETS = {
+    (px, py): [(bx - px, by - py) for bx in range(-2, 4) for by in range(-2, 4)
+               if abs(bx - px) > 1 or abs(by - py) > 1]
+    for px in (0, 1) for py in (0, 1)
+}
+_NEAR_OFFSETS = [(ox, oy) for ox in (-1, 0, 1) for oy in (-1, 0, 1) if (ox, oy) != (0, 0)]
+# Margem de células vazias em volta da grade: dispensa testes de borda
+_PAD = 3
+RELAX_ITERATIONS = 50  # iterações ao acomodar a vizinhança de uma edição
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("O layout automático precisa do NumPy (pip install numpy)")
+
+
+def neighborhood(manager, names, hops=2):
+    # Nomes a até `hops` saltos dos dispositivos informados
+    seen = {name for name in names if manager.get_device(name)}
+    frontier = list(seen)
+    for _ in range(hops):
+        next_frontier = []
+        for name in frontier:
+            for neighbor in manager.get_device(name).connections:
+                if neighbor.name not in seen:
+                    seen.add(neighbor.name)
+                    next_frontier.append(neighbor.name)
+        frontier = next_frontier
+    return seen
+
+
+class ForceLayout:
+    def __init__(self, names, positions, edges, ideal_length=120.0, gravity=0.02, max_levels=9):
+        _require_numpy()
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        self.k = float(ideal_length)
+        self.gravity = gravity
+        n = len(self.names)
+        # Cerca de um nó por célula no nível mais fino
+        self.levels = max(1, min(max_levels, round(math.log(max(n, 2), 4))))
+
+    @classmethod
+    def from_manager(cls, manager, **kwargs):
+        # Retrato da topologia: pode ser calculado fora da thread do Tk
+        devices = list(manager.devices)
+        index = {device.name: i for i, device in enumerate(devices)}
+        positions = [(device.x, device.y) for device in devices]
+        edges = [(index[a], index[b]) for a, b in manager.links]
+        return cls([device.name for device in devices], positions, edges, **kwargs)
+
+    def scatter(self, seed=0):
+        # Posições iniciais aleatórias num quadrado proporcional ao tamanho da rede
+        side = self.k * math.sqrt(max(len(self.names), 1))
+        rng = np.random.default_rng(seed)
+        self.positions = rng.uniform(0, side, size=(len(self.names), 2))
+
+    def repulsion(self, movable):
+        pos = self.positions
+        k2 = self.k * self.k
+        lo = pos.min(axis=0)
+        size = max(float((pos.max(axis=0) - lo).max()), 1e-6) * (1 + 1e-9)
+        unit = (pos - lo) / size
+        target = pos[movable]
+        target32 = target.astype(np.float32)
+        force = np.zeros_like(target)
+
+        for level in range(1, self.levels + 1):
+            grid = 1 << level
+            width = grid + 2 * _PAD
+            cells = np.minimum((unit * grid).astype(np.int64), grid - 1)
+            flat = ((cells[:, 0] + _PAD) * width + (cells[:, 1] + _PAD)).astype(np.int32)
+            mass = np.bincount(flat, minlength=width * width).astype(np.float64)
+            sum_x = np.bincount(flat, weights=pos[:, 0], minlength=width * width)
+            sum_y = np.bincount(flat, weights=pos[:, 1], minlength=width * width)
+            occupied = np.maximum(mass, 1.0)
+            cell_mass = mass.astype(np.float32)
+            com_x = (sum_x / occupied).astype(np.float32)
+            com_y = (sum_y / occupied).astype(np.float32)
+
+            finest = level == self.levels
+            target_flat = flat[movable]
+            parity = (cells[movable, 0] & 1) * 2 + (cells[movable, 1] & 1)
+            for (px, py), offsets in _FAR_OFFSETS.items():
+                group = np.nonzero(parity == px * 2 + py)[0]
+                if not len(group):
+                    continue
+                if finest:
+                    offsets = offsets + _NEAR_OFFSETS
+                steps = np.array([ox * width + oy for ox, oy in offsets], dtype=np.int32)
+                idx = target_flat[group][:, None] + steps[None, :]
+                # Células vazias têm massa 0 e não contribuem
+                dx = target32[group, 0][:, None] - np.take(com_x, idx)
+                dy = target32[group, 1][:, None] - np.take(com_y, idx)
+                scale = np.take(cell_mass, idx) / (dx * dx + dy * dy + 1e-2)
+                force[group, 0] += (dx * scale).sum(axis=1)
+                force[group, 1] += (dy * scale).sum(axis=1)
+
+            if finest:
+                # Própria célula: centro de massa sem o próprio nó
+                m = mass[target_flat] - 1.0
+                others = np.maximum(m, 1.0)
+                dx = target[:, 0] - (sum_x[target_flat] - target[:, 0]) / others
+                dy = target[:, 1] - (sum_y[target_flat] - target[:, 1]) / others
+                scale = m / (dx * dx + dy * dy + 1e-2)
+                force[:, 0] += dx * scale
+                force[:, 1] += dy * scale
+        return force * k2
+
+    def attraction(self):
+        pos = self.positions
+        n = len(pos)
+        force = np.zeros_like(pos)
+        if len(self.edges):
+            a, b = self.edges[:, 0], self.edges[:, 1]
+            delta = pos[a] - pos[b]
+            dist = np.sqrt((delta * delta).sum(axis=1)) + 1e-9
+            pull = delta * (dist / self.k)[:, None]
+            for axis in (0, 1):
+                force[:, axis] -= np.bincount(a, weights=pull[:, axis], minlength=n)
+                force[:, axis] += np.bincount(b, weights=pull[:, axis], minlength=n)
+        return force
+
+    def step(self, temperature, movable=None):
+        if movable is None:
+            movable = np.arange(len(self.positions))
+        force = self.repulsion(movable) + self.attraction()[movable]
+        # Leve atração ao centro para componentes desconexos não se afastarem
+        center = self.positions.mean(axis=0)
+        force -= (self.positions[movable] - center) * (self.gravity * self.k)
+        length = np.sqrt((force * force).sum(axis=1)) + 1e-9
+        self.positions[movable] += force * (np.minimum(length, temperature) / length)[:, None]
+
+    def run(self, iterations=100, movable=None, temperature=None, callback=None):
+        # movable: nomes que podem se mover (None = todos); os demais ficam fixos
+        if movable is not None:
+            movable = np.array(sorted(self.index[name] for name in movable if name in self.index), dtype=np.int64)
+            if not len(movable):
+                return self.positions
+        if temperature is None:
+            count = len(self.positions) if movable is None else len(movable)
+            temperature = self.k * math.sqrt(count) / 2
+        for i in range(iterations):
+            # Resfriamento linear
+            self.step(temperature * (1 - i / iterations) + 1e-3, movable)
+            if callback:
+                callback(i)
+        return self.positions
+
+    def relax(self, movable, iterations=RELAX_ITERATIONS):
+        # Acomoda só os nós de movable, sem resfriar do zero (a rede já está organizada)
+        return self.run(iterations, movable=movable, temperature=self.k)
+
+    def apply(self, manager, names=None):
+        # Grava as posições nos dispositivos (na interface, deve rodar na thread do Tk).
+        # Com names, só esses dispositivos são atualizados.
+        positions = self.positions.tolist()
+        for name in self.names if names is None else names:
+            device = manager.get_device(name)
+            i = self.index.get(name)
+            if device and i is not None:
+                device.x, device.y = positions[i]
+
+    def normalize(self, margin=40.0):
+        # Translada para que o canto superior esquerdo fique em (margin, margin)
+        self.positions -= self.positions.min(axis=0) - margin
+
+
+def relax(manager, names, hops=2, iterations=RELAX_ITERATIONS, **kwargs):
+    # Relaxa só a vizinhança dos dispositivos informados (após adicionar/conectar).
+    # Versão síncrona; a interface tira o retrato na thread do Tk e chama
+    # ForceLayout.relax numa thread separada.
+    layout = ForceLayout.from_manager(manager, **kwargs)
+    movable = neighborhood(manager, names, hops)
+    layout.relax(movable, iterations)
+    layout.apply(manager, movable)
+    return layout
+
+
+def iterations_for(count):
+    # Menos iterações em redes grandes, onde cada uma custa mais
+    if count < 1000:
+        return 300
+    if count < 5000:
+        return 150
+    return 60
@@ -0,0 +1,249 @@
+# Leitura incremental de redes salvas em JSON.
+# O arquivo é lido em blocos e cada dispositivo/conexão é decodificado
+# individualmente, então a memória extra não depende do tamanho do arquivo.
+# Registros inválidos são ignorados e contabilizados num LoadReport.
+import ipaddress
+import json
+import time
+
+from . import metrics
+from .addressing import DEFAULT_NETMASK
+from .graph import DEFAULT_COST
+
+DEVICE_KEYS = ("devices", "dispositivos")
+CONNECTION_KEYS = ("connections", "conexoes")
+CHUNK_SIZE = 1 << 16
+MAX_VALUE_CHARS = 1 << 24  # maior valor que o leitor aceita ler de uma vez
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_PHASE_SECONDS = {phase: metrics.histogram("persistence_load_phase_seconds",
+                                           "Tempo de leitura do JSON e de montagem do grafo",
+                                           phase=phase)
+                  for phase in ("parse", "devices", "connections")}
+
+
+class LoadReport:
+    MAX_MESSAGES = 100  # mensagens guardadas; as contagens continuam completas
+
+    def __init__(self):
+        self.devices = 0
+        self.connections = 0
+        self.replayed = 0  # operações reaplicadas do log de operações
+        self.skipped = {}  # motivo -> quantidade
+        self.messages = []
+
+    def skip(self, reason, message):
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+        if len(self.messages) < self.MAX_MESSAGES:
+            self.messages.append(message)
+
+    @property
+    def total_skipped(self):
+        return sum(self.skipped.values())
+
+    def summary(self):
+        text = f"{self.devices} dispositivos e {self.connections} conexões carregados"
+        if self.skipped:
+            reasons = ", ".join(f"{reason}: {count}" for reason, count in self.skipped.items())
+            text += f"; {self.total_skipped} registros ignorados ({reasons})"
+        if self.replayed:
+            text += f"; {self.replayed} operações recuperadas do log"
+        return text
+
+
+class JsonStream:
+    # Leitor de JSON por blocos que entrega um valor por vez
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Descarta o que já foi consumido para manter o buffer pequeno
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            buf = self.buf
+            pos = self.pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def next_char(self):
+        ch = self.peek()
+        if ch:
+            self.pos += 1
+        return ch
+
+    def value(self):
+        if not self.peek():
+            raise ValueError("Fim inesperado do arquivo")
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # Números e literais no fim do buffer podem estar incompletos
+                if end < len(self.buf) or self.eof or self.buf[self.pos] in '{["':
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                # Só vale ler mais se o erro pode ser o valor cortado no fim do
+                # buffer; um erro de sintaxe no meio dele é definitivo
+                truncated = e.pos >= len(self.buf) - 8 or e.msg.startswith("Unterminated string")
+                if self.eof or not truncated:
+                    raise
+                if len(self.buf) - self.pos > MAX_VALUE_CHARS:
+                    raise ValueError(f"Valor JSON maior que {MAX_VALUE_CHARS} caracteres") from e
+            self._fill()
+
+    def array(self):
+        if self.next_char() != "[":
+            raise ValueError("Esperada uma lista")
+        if self.peek() == "]":
+            self.next_char()
+            return
+        while True:
+            yield self.value()
+            ch = self.next_char()
+            if ch == "]":
+                return
+            if ch != ",":
+                raise ValueError(f"Esperado ',' ou ']' e encontrado {ch!r}")
+
+
+def _add_device(manager, record, index, report):
+    if not isinstance(record, dict):
+        report.skip("dispositivo_invalido", f"dispositivo #{index}: não é um objeto")
+        return
+    name = record.get("name")
+    device_type = record.get("type", record.get("device_type"))
+    x, y = record.get("x"), record.get("y")
+    if not isinstance(name, str) or not name or not isinstance(device_type, str):
+        report.skip("dispositivo_invalido", f"dispositivo #{index}: nome ou tipo ausente")
+        return
+    if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+        report.skip("dispositivo_invalido", f"dispositivo '{name}': coordenadas inválidas")
+        return
+    if manager.get_device(name):
+        report.skip("nome_duplicado", f"dispositivo '{name}' repetido")
+        return
+    try:
+        manager.add_device(name, record.get("ip"), device_type, x, y,
+                           record.get("prefix", DEFAULT_NETMASK))
+    except (ipaddress.AddressValueError, ValueError, TypeError):
+        report.skip("dispositivo_invalido", f"dispositivo '{name}': IP ou máscara inválidos")
+        return
+    report.devices += 1
+
+
+def _add_connection(manager, record, index, report):
+    if (not isinstance(record, (list, tuple)) or len(record) not in (2, 3)
+            or not all(isinstance(name, str) for name in record[:2])
+            or (len(record) == 3 and not isinstance(record[2], dict))):
+        report.skip("enlace_invalido", f"conexão #{index}: esperado par de nomes")
+        return
+    name1, name2 = record[:2]
+    attributes = record[2] if len(record) == 3 else {}
+    if name1 == name2:
+        report.skip("auto_enlace", f"conexão #{index}: '{name1}' ligado a si mesmo")
+        return
+    if not manager.get_device(name1) or not manager.get_device(name2):
+        report.skip("extremidade_desconhecida", f"conexão #{index}: {name1} - {name2}")
+        return
+    if manager.has_connection(name1, name2):
+        report.skip("enlace_duplicado", f"conexão #{index}: {name1} - {name2} repetida")
+        return
+    try:
+        manager.create_connection(name1, name2, attributes.get("cost", DEFAULT_COST),
+                                  attributes.get("capacity"))
+    except (ValueError, TypeError):
+        report.skip("enlace_invalido", f"conexão #{index}: custo ou capacidade inválidos")
+        return
+    report.connections += 1
+
+
+def _timed_calls(func, totals, phase):
+    def wrapper(*args):
+        start = time.perf_counter()
+        func(*args)
+        totals[phase] += time.perf_counter() - start
+    return wrapper
+
+
+def _expect_end(stream):
+    # Como json.load: depois do objeto só pode haver espaços
+    ch = stream.peek()
+    if ch:
+        raise ValueError(f"Dados extras depois do objeto JSON (começando por {ch!r})")
+
+
+def load_topology(filename, manager, chunk_size=CHUNK_SIZE):
+    # Substitui o conteúdo de manager pela rede do arquivo, numa única passada.
+    # Com as métricas ligadas, separa o tempo de leitura do de montagem.
+    timing = metrics.enabled
+    add_device, add_connection = _add_device, _add_connection
+    if timing:
+        start = time.perf_counter()
+        totals = {"devices": 0.0, "connections": 0.0}
+        add_device = _timed_calls(_add_device, totals, "devices")
+        add_connection = _timed_calls(_add_connection, totals, "connections")
+    report = LoadReport()
+    manager.clear()
+    pending = []  # conexões que aparecem antes dos dispositivos no arquivo
+    devices_loaded = False
+    with open(filename, "r") as f:
+        stream = JsonStream(f, chunk_size)
+        if stream.next_char() != "{":
+            raise ValueError("Esperado um objeto JSON")
+        if stream.peek() == "}":
+            stream.next_char()
+            _expect_end(stream)
+            return report
+        while True:
+            key = stream.value()
+            if stream.next_char() != ":":
+                raise ValueError(f"Esperado ':' após {key!r}")
+            if key in DEVICE_KEYS and stream.peek() == "[":
+                for index, record in enumerate(stream.array()):
+                    add_device(manager, record, index, report)
+                devices_loaded = True
+                for index, record in pending:
+                    add_connection(manager, record, index, report)
+                pending = []
+            elif key in CONNECTION_KEYS and stream.peek() == "[":
+                for index, record in enumerate(stream.array()):
+                    if devices_loaded:
+                        add_connection(manager, record, index, report)
+                    else:
+                        pending.append((index, record))
+            else:
+                stream.value()
+            ch = stream.next_char()
+            if ch == "}":
+                break
+            if ch != ",":
+                raise ValueError(f"Esperado ',' ou '}}' e encontrado {ch!r}")
+        _expect_end(stream)
+    for index, record in pending:
+        add_connection(manager, record, index, report)
+    if timing:
+        elapsed = time.perf_counter() - start
+        for phase, seconds in totals.items():
+            _PHASE_SECONDS[phase].observe(seconds)
+        _PHASE_SECONDS["parse"].observe(elapsed - sum(totals.values()))
+    return report
@@ -0,0 +1,188 @@
+# Instrumentação leve: contadores, histogramas e temporizadores.
+#
+# Tudo fica desligado por padrão. Os pontos instrumentados testam
+# metrics.enabled antes de medir qualquer coisa, então o custo desligado é
+# só essa verificação. Liga/desliga em tempo de execução com enable()/disable().
+#
+#   from backend import metrics
+#   metrics.enable()
+#   ...
+#   print(metrics.to_prometheus())
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+enabled = False
+
+# Limites dos histogramas de tempo, em segundos (de 10 µs a 10 s)
+TIME_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+# Limites dos histogramas de contagem (ex.: nós expandidos por busca)
+COUNT_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def disable():
+    enable(False)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def reset(self):
+        self.value = 0
+
+    def as_dict(self):
+        return self.value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets=TIME_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.reset()
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                return
+        self.bucket_counts[-1] += 1  # acima do último limite (+Inf)
+
+    def reset(self):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {"count": self.count, "sum": self.sum, "mean": self.mean, "max": self.max,
+                "buckets": {str(bound): n for bound, n in zip(self.buckets + ("+Inf",), self.bucket_counts)}}
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}  # (nome, rótulos ordenados) -> métrica
+        self.help = {}  # nome -> descrição
+
+    def _get(self, factory, name, description, labels):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self.metrics.get(key)
+        if metric is None:
+            metric = self.metrics[key] = factory()
+            if description:
+                self.help.setdefault(name, description)
+        return metric
+
+    def counter(self, name, description="", **labels):
+        return self._get(Counter, name, description, labels)
+
+    def histogram(self, name, description="", buckets=TIME_BUCKETS, **labels):
+        return self._get(lambda: Histogram(buckets), name, description, labels)
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def as_dict(self):
+        # {"nome": {"rotulo=valor,...": valor}}; sem rótulos a chave é ""
+        data = {}
+        for (name, labels), metric in sorted(self.metrics.items()):
+            key = ",".join(f"{label}={value}" for label, value in labels)
+            data.setdefault(name, {})[key] = metric.as_dict()
+        return data
+
+    def to_prometheus(self):
+        # Formato de exposição em texto do Prometheus
+        lines = []
+        seen = set()
+        for (name, labels), metric in sorted(self.metrics.items()):
+            if name not in seen:
+                seen.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {metric.kind}")
+            if metric.kind == "counter":
+                lines.append(f"{name}{_labels(labels)} {metric.value}")
+                continue
+            cumulative = 0
+            for bound, n in zip(metric.buckets + ("+Inf",), metric.bucket_counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {metric.sum}")
+            lines.append(f"{name}_count{_labels(labels)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}"
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+histogram = REGISTRY.histogram
+reset = REGISTRY.reset
+as_dict = REGISTRY.as_dict
+to_prometheus = REGISTRY.to_prometheus
+
+
+def timed(name, description="", **labels):
+    # Decorador: registra a duração de cada chamada num histograma de segundos
+    def decorator(func):
+        metric = histogram(name, description, **labels)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timer(name, description="", **labels):
+    # Bloco temporizado; para laços quentes, prefira testar metrics.enabled direto
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram(name, description, **labels).observe(time.perf_counter() - start)
+
+
+def write(filename):
+    # .prom (ou .txt) grava no formato do Prometheus; qualquer outra extensão, JSON
+    with open(filename, "w") as f:
+        if filename.endswith((".prom", ".txt")):
+            f.write(to_prometheus())
+        else:
+            json.dump(as_dict(), f, indent=2)
+            f.write("\n")
@@ -1,42 +1,315 @@
 import json
 import os
+import time
+from . import metrics
+from .addressing import DEFAULT_NETMASK, format_subnet, parse_subnet
+from .binary_format import BINARY_EXTENSION, load_binary, save_binary
+from .connectivity import ReachabilityIndex
 from .device import Device
+from .forwarding import ForwardingTables
+from .graph import DEFAULT_COST, CSRGraph, LinkAttributes, flow_hash
+from .journal import log_path, replay
+from .loader import LoadReport, load_topology
+from .routing import RouteTable, bfs_path, bidirectional_path
+
+STRATEGIES = ("table", "bfs", "bidirectional", "cost", "ecmp", "fib")
+_FIND_PATH_SECONDS = {strategy: metrics.histogram("routing_find_path_seconds", "Duração de find_path",
+                                                  strategy=strategy)
+                      for strategy in STRATEGIES}
 
 class NetworkManager:
     def __init__(self):
-        self.devices = []
-        self.connections = []
+        self.devices_by_name = {}  # nome -> Device
+        self.devices_by_id = {}  # id inteiro -> Device
+        # tupla ordenada de nomes -> LinkAttributes (custo e capacidade)
+        self.links = {}
+        # (rede, prefixo) -> dispositivos da sub-rede (dict usado como conjunto ordenado)
+        self.subnets = {}
+        self._next_id = 0
+        self.routes = RouteTable()
+        self.reach = ReachabilityIndex()  # "A alcança B?" sem percorrer o grafo
+        self.fib = ForwardingTables()  # tabelas de encaminhamento dos roteadores
+        self._snapshot = None  # CSRGraph, refeito após qualquer alteração
 
-    def add_device(self, name, ip, device_type, x, y):
-        device = Device(name, ip, device_type, x, y)
-        self.devices.append(device)
-        return device
+    @property
+    def devices(self):
+        return self.devices_by_name.values()
+
+    @property
+    def connections(self):
+        # Vista dos pares de nomes conectados, sem cópia (use list() para indexar)
+        return self.links.keys()
+
+    @staticmethod
+    def link_key(name1, name2):
+        return (name1, name2) if name1 <= name2 else (name2, name1)
 
-    def create_connection(self, name1, name2):
-        self.connections.append((name1, name2))
+    def add_device(self, name, ip, device_type, x, y, netmask=DEFAULT_NETMASK):
+        device_type = device_type.lower()
+        if name in self.devices_by_name:
+            raise ValueError("Nome já existe")
+        device = Device(name, ip, device_type, x, y, netmask)
+        device.id = self._next_id
+        self._next_id += 1
+        self.devices_by_name[name] = device
+        self.devices_by_id[device.id] = device
+        self.subnets.setdefault(device.subnet, {})[device] = None
+        self.routes.device_added(device)
+        self.reach.device_added(device)
+        self.fib.device_added(device)
+        self._snapshot = None
+        return device
 
     def remove_device(self, name):
-        self.devices = [d for d in self.devices if d.name != name]
-        self.connections = [(a, b) for a, b in self.connections if name not in (a, b)]
-        
-    def save_to_file(self, filename):
+        device = self.devices_by_name.pop(name, None)
+        if device:
+            del self.devices_by_id[device.id]
+            members = self.subnets[device.subnet]
+            del members[device]
+            if not members:
+                del self.subnets[device.subnet]
+            # Remove conexões relacionadas (apenas as incidentes no dispositivo)
+            for neighbor in list(device.connections):
+                self.links.pop(self.link_key(name, neighbor.name), None)
+                neighbor.remove_connection(device)
+            self.routes.device_removed(device)
+            self.reach.device_removed(device)
+            self.fib.device_removed(device)
+            device.connections.clear()
+            self._snapshot = None
+
+    def get_device(self, name):
+        return self.devices_by_name.get(name)
+
+    def get_device_by_id(self, device_id):
+        return self.devices_by_id.get(device_id)
+
+    def hosts_in_subnet(self, subnet):
+        # subnet: "192.168.0.0/24" ou tupla (rede inteira, prefixo)
+        if isinstance(subnet, str):
+            subnet = parse_subnet(subnet)
+        return list(self.subnets.get(subnet, ()))
+
+    def subnet_names(self):
+        return [format_subnet(network, prefix) for network, prefix in self.subnets]
+
+    def has_connection(self, name1, name2):
+        return self.link_key(name1, name2) in self.links
+
+    def create_connection(self, name1, name2, cost=DEFAULT_COST, capacity=None):
+        if name1 == name2:
+            return
+        d1 = self.get_device(name1)
+        d2 = self.get_device(name2)
+        key = self.link_key(name1, name2)
+        if d1 and d2 and key not in self.links:
+            self.links[key] = LinkAttributes(cost, capacity)
+            d1.add_connection(d2)
+            d2.add_connection(d1)
+            self.routes.link_added(d1, d2)
+            self.reach.link_added(d1, d2)
+            self.fib.link_added(d1, d2)
+            self._snapshot = None
+
+    def link_attributes(self, name1, name2):
+        return self.links.get(self.link_key(name1, name2))
+
+    def set_link_attributes(self, name1, name2, cost=None, capacity=None):
+        # Altera custo e/ou capacidade de um enlace existente (a tabela de rotas
+        # conta saltos, então só o retrato ponderado precisa ser refeito)
+        attributes = self.links[self.link_key(name1, name2)]
+        updated = LinkAttributes(attributes.cost if cost is None else cost,
+                                 attributes.capacity if capacity is None else capacity)
+        attributes.cost = updated.cost
+        attributes.capacity = updated.capacity
+        self._snapshot = None
+
+    def remove_connection(self, name1, name2):
+        key = self.link_key(name1, name2)
+        if key not in self.links:
+            return
+        del self.links[key]
+        d1 = self.get_device(name1)
+        d2 = self.get_device(name2)
+        d1.remove_connection(d2)
+        d2.remove_connection(d1)
+        self.routes.link_removed(d1, d2)
+        self.reach.link_removed(d1, d2)
+        self.fib.link_removed(d1, d2)
+        self._snapshot = None
+
+    def clear(self):
+        self.devices_by_name.clear()
+        self.devices_by_id.clear()
+        self.links.clear()
+        self.subnets.clear()
+        self._next_id = 0
+        self.routes.clear()
+        self.reach.clear()
+        self.fib.clear()
+        self._snapshot = None
+
+    def can_reach(self, source_name, destination_name):
+        # Mesma regra de find_path (mesma sub-rede ou caminho só por roteadores),
+        # respondida pelo índice de conectividade, sem busca
+        source = self.get_device(source_name)
+        dest = self.get_device(destination_name)
+        if not source or not dest:
+            return False
+        return source.in_same_network(dest) or self.reach.connected(source, dest)
+
+    def components(self):
+        # Grupos de dispositivos que se comunicam (listas de nomes)
+        return [[device.name for device in group] for group in self.reach.components(self.devices)]
+
+    def isolated_subnets(self):
+        return self.reach.isolated_subnets(self.subnets)
+
+    def articulation_routers(self):
+        # Nomes dos roteadores cuja falha desconecta parte da rede
+        return sorted(device.name for device in self.reach.articulation_routers())
+
+    def forwarding_table(self, router_name):
+        # FIB do roteador: (prefixo, próximo salto ou None = entrega direta, saltos)
+        router = self.get_device(router_name)
+        if not router or router.device_type != "roteador":
+            return None
+        return [(prefix, hop.name if hop else None, distance)
+                for prefix, hop, distance in self.fib.table(router)]
+
+    def snapshot(self):
+        # Retrato CSR do grafo, reaproveitado até a próxima alteração
+        if self._snapshot is None:
+            with metrics.timer("routing_snapshot_seconds", "Montagem do retrato CSR"):
+                self._snapshot = CSRGraph.from_manager(self)
+        return self._snapshot
+
+    def find_path(self, source_name, destination_name, strategy="table", flow=0):
+        # Caminho respeitando conexões e roteadores.
+        # strategy: "table" (tabela de rotas em cache), "bfs" ou "bidirectional",
+        # que contam saltos; "cost" (Dijkstra pelo custo dos enlaces) ou "ecmp"
+        # (custo mínimo, espalhando fluxos diferentes entre caminhos de mesmo custo);
+        # "fib" encaminha salto a salto pelo prefixo mais longo na tabela de cada roteador
+        source = self.get_device(source_name)
+        dest = self.get_device(destination_name)
+        if not source or not dest:
+            return None
+        timing = metrics.enabled
+        if timing:
+            start = time.perf_counter()
+
+        # Se estiverem na mesma rede, caminho direto
+        if source.in_same_network(dest):
+            path = (source, dest)
+        # Sem componente de roteadores em comum: nem adianta buscar
+        elif not self.reach.connected(source, dest):
+            path = None
+        # Se não, deve passar por roteadores
+        elif strategy == "bfs":
+            path = bfs_path(source, dest)
+        elif strategy == "bidirectional":
+            path = bidirectional_path(source, dest)
+        elif strategy in ("cost", "ecmp"):
+            graph = self.snapshot()
+            hash_value = flow_hash(source_name, destination_name, flow) if strategy == "ecmp" else None
+            path = self._devices_for(graph, graph.path(graph.index[source_name],
+                                                       graph.index[destination_name], hash_value))
+        elif strategy == "fib":
+            path = self.fib.path(source, dest)
+        else:
+            path = self.routes.path(source, dest)
+
+        if timing:
+            _FIND_PATH_SECONDS[strategy if strategy in _FIND_PATH_SECONDS else "table"].observe(
+                time.perf_counter() - start)
+        return path
+
+    def route_matrix(self, demands, ecmp=True):
+        # Caminhos de custo mínimo para uma matriz de tráfego inteira, com um
+        # Dijkstra por destino. demands: (origem, destino) ou (origem, destino, fluxo).
+        # Retorna os caminhos na mesma ordem (None quando não há caminho).
+        graph = self.snapshot()
+        index = graph.index
+        paths = [None] * len(demands)
+        positions = []
+        batch = []
+        for position, demand in enumerate(demands):
+            source_name, destination_name = demand[0], demand[1]
+            source = self.get_device(source_name)
+            dest = self.get_device(destination_name)
+            if not source or not dest:
+                continue
+            if source.in_same_network(dest):
+                paths[position] = (source, dest)
+                continue
+            if not self.reach.connected(source, dest):
+                continue
+            flow = demand[2] if len(demand) > 2 else 0
+            hash_value = flow_hash(source_name, destination_name, flow) if ecmp else None
+            positions.append(position)
+            batch.append((index[source_name], index[destination_name], hash_value))
+        for position, path in zip(positions, graph.route_matrix(batch)):
+            paths[position] = self._devices_for(graph, path)
+        return paths
+
+    def _devices_for(self, graph, path):
+        if path is None:
+            return None
+        names = graph.names
+        get = self.devices_by_name.__getitem__
+        return tuple(get(names[i]) for i in path)
+
+    @metrics.timed("persistence_save_seconds", "Duração de save_to_file")
+    def save_to_file(self, filename, indent=None):
+        # Arquivos .pnet usam o formato binário compacto. Um retrato completo
+        # substitui o log de operações que houver ao lado do arquivo.
+        if filename.endswith(BINARY_EXTENSION):
+            save_binary(self, filename)
+        else:
+            self._save_json(filename, indent)
+        if os.path.exists(log_path(filename)):
+            os.remove(log_path(filename))
+
+    def _save_json(self, filename, indent):
         data = {
-            "devices": [device.__dict__ for device in self.devices],
-            "connections": self.connections
+            "devices": [device.to_dict() for device in self.devices],
+            # Enlaces com custo ou capacidade próprios levam um terceiro elemento
+            "connections": [list(key) if attributes.is_default() else [*key, attributes.to_dict()]
+                            for key, attributes in self.links.items()]
         }
         with open(filename, "w") as f:
-            json.dump(data, f)
+            json.dump(data, f, indent=indent)
 
-    def load_from_file(self, filename):
+    @metrics.timed("persistence_load_seconds", "Duração de load_from_file (leitura e montagem)")
+    def load_from_file(self, filename, replay_log=True):
+        # Retorna um LoadReport com os registros carregados e os ignorados.
+        # Com replay_log, reaplica as operações do log salvas depois do retrato.
+        # A rede é montada num NetworkManager novo e só substitui a atual se
+        # tudo der certo; um arquivo com erro deixa a rede aberta intacta.
         if not os.path.exists(filename):
             raise FileNotFoundError(f"Arquivo {filename} não encontrado.")
+        staging = NetworkManager()
+        if filename.endswith(BINARY_EXTENSION):
+            load_binary(filename, staging)
+            report = LoadReport()
+            report.devices = len(staging.devices_by_name)
+            report.connections = len(staging.links)
+        else:
+            # Aceita as chaves antigas ("device_type", "dispositivos", "conexoes")
+            report = load_topology(filename, staging)
+        if replay_log:
+            report.replayed = replay(staging, log_path(filename))
+        self.adopt(staging)
+        return report
+
+    def adopt(self, other):
+        # Passa a ter o conteúdo de outro NetworkManager (troca feita só depois
+        # de uma carga bem-sucedida; quem guarda referência a este objeto a mantém)
+        self.__dict__.update(other.__dict__)
 
-        with open(filename, "r") as f:
-            data = json.load(f)
-            self.devices = [Device(**dev) for dev in data["devices"]]
-            self.connections = data["connections"]
-    
     def delete_network_file(self, filename):
+        if os.path.exists(log_path(filename)):
+            os.remove(log_path(filename))
         if os.path.exists(filename):
             os.remove(filename)
             return True
@@ -0,0 +1,24 @@
+class Packet:
+    __slots__ = ("source", "destination", "size", "path", "current_index", "id", "flow",
+                 "sent_at", "delivered_at")
+
+    def __init__(self, source, destination, size=1500):
+        self.source = source
+        self.destination = destination
+        self.size = size  # bytes
+        self.path = []
+        self.current_index = 0
+        self.id = None
+        self.flow = None
+        self.sent_at = None
+        self.delivered_at = None
+
+    def next_hop(self):
+        if self.current_index < len(self.path) - 1:
+            self.current_index += 1
+            return self.path[self.current_index]
+        return None
+
+    @property
+    def current(self):
+        return self.path[self.current_index]
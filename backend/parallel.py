@@ -0,0 +1,324 @@
+# Execução paralela de cenários sobre uma topologia em memória compartilhada.
+#
+# O processo principal carrega a rede uma vez e publica o retrato CSR, os IPs
+# e os nomes num bloco de multiprocessing.shared_memory. Os workers só se
+# anexam ao bloco (nada de reler o JSON): as rotas são calculadas direto
+# sobre os arrays compartilhados e, para simular cenários inteiros, cada
+# worker monta um NetworkManager próprio a partir deles uma única vez.
+#
+# Layout do bloco (ordem de alinhamento: 8, 4 e 1 byte):
+#   costs, capacities   f64 por entrada de adjacência
+#   offsets             u32 por dispositivo + 1 (CSR)
+#   targets             i32 por entrada de adjacência
+#   ips                 u32 por dispositivo
+#   name_offsets        u32 por dispositivo + 1
+#   prefixes, routers, type_ids   u8 por dispositivo
+#   names               nomes em UTF-8 concatenados
+import argparse
+import multiprocessing
+import os
+from array import array
+from multiprocessing import shared_memory
+
+from .addressing import prefix_mask
+from .graph import CSRGraph, flow_hash
+from .network_manager import NetworkManager
+from .run import simulate
+from .simulation import SimulationStats
+
+_SECTIONS = (("costs", "d", "edges"), ("capacities", "d", "edges"),
+             ("offsets", "I", "devices+1"), ("targets", "i", "edges"),
+             ("ips", "I", "devices"), ("name_offsets", "I", "devices+1"),
+             ("prefixes", "B", "devices"), ("routers", "B", "devices"),
+             ("type_ids", "B", "devices"))
+_ITEM_SIZES = {"d": 8, "I": 4, "i": 4, "B": 1}
+
+
+def _section_length(kind, devices, edges):
+    return {"edges": edges, "devices": devices, "devices+1": devices + 1}[kind]
+
+
+class SharedTopology:
+    # Topologia publicada num bloco de memória compartilhada. O processo que
+    # publica é o dono do bloco e o remove no close(); os demais só se anexam.
+
+    def __init__(self, spec, memory, owner):
+        self.spec = spec  # dict serializável enviado aos workers
+        self._memory = memory
+        self._owner = owner
+        self.device_count = spec["devices"]
+        self.edge_count = spec["edges"]
+        self.types = spec["types"]
+        view = memoryview(memory.buf)
+        self._views = []
+        pos = 0
+        for name, code, kind in _SECTIONS:
+            size = _section_length(kind, self.device_count, self.edge_count) * _ITEM_SIZES[code]
+            section = view[pos:pos + size].cast(code)
+            setattr(self, name, section)
+            self._views.append(section)
+            pos += size
+        self._names = view[pos:pos + spec["names_size"]]
+        self._views.append(self._names)
+        self._views.append(view)
+        self._graph = None
+        self._hop_graph = None
+        self._manager = None
+
+    @classmethod
+    def publish(cls, manager):
+        graph = manager.snapshot()
+        types = {}
+        ips = []
+        prefixes = bytearray()
+        type_ids = bytearray()
+        names = bytearray()
+        name_offsets = [0]
+        for device in manager.devices:
+            ips.append(device.ip_int)
+            prefixes.append(device.prefix)
+            type_ids.append(types.setdefault(device.device_type, len(types)))
+            names += device.name.encode("utf-8")
+            name_offsets.append(len(names))
+        if len(types) > 255:
+            raise ValueError("Tipos de dispositivo demais para a topologia compartilhada")
+        values = {"costs": graph.costs, "capacities": graph.capacities,
+                  "offsets": graph.offsets, "targets": graph.targets, "ips": ips,
+                  "name_offsets": name_offsets, "prefixes": prefixes,
+                  "routers": graph.routers, "type_ids": type_ids}
+        devices, edges = len(graph), len(graph.targets)
+        size = sum(_section_length(kind, devices, edges) * _ITEM_SIZES[code]
+                   for _, code, kind in _SECTIONS) + len(names)
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        spec = {"name": memory.name, "devices": devices, "edges": edges,
+                "names_size": len(names), "types": list(types)}
+        topology = cls(spec, memory, owner=True)
+        for name, _, _ in _SECTIONS:
+            getattr(topology, name)[:] = _as_view(values[name], getattr(topology, name).format)
+        topology._names[:] = names
+        return topology
+
+    @classmethod
+    def attach(cls, spec):
+        # Os workers do pool usam o mesmo resource_tracker do processo
+        # principal, então anexar não altera quem remove o bloco
+        return cls(spec, shared_memory.SharedMemory(name=spec["name"]), owner=False)
+
+    def name(self, i):
+        return bytes(self._names[self.name_offsets[i]:self.name_offsets[i + 1]]).decode("utf-8")
+
+    def names(self):
+        return [self.name(i) for i in range(self.device_count)]
+
+    def graph(self):
+        # CSRGraph sobre as views compartilhadas (sem copiar os arrays)
+        if self._graph is None:
+            self._graph = CSRGraph(self.names(), self.routers, self.offsets, self.targets,
+                                   self.costs, self.capacities)
+        return self._graph
+
+    def hop_graph(self):
+        # Mesmo grafo com custo 1 em todos os enlaces (menor número de saltos);
+        # só os custos são copiados, o resto continua compartilhado
+        if self._hop_graph is None:
+            graph = self.graph()
+            self._hop_graph = CSRGraph(graph.names, self.routers, self.offsets, self.targets,
+                                       array("d", [1.0]) * self.edge_count, self.capacities)
+        return self._hop_graph
+
+    def same_network(self, source, dest):
+        # Mesma regra de Device.in_same_network: a mais restritiva das duas máscaras
+        mask = prefix_mask(max(self.prefixes[source], self.prefixes[dest]))
+        return (self.ips[source] ^ self.ips[dest]) & mask == 0
+
+    def to_manager(self):
+        # NetworkManager local ao processo, montado a partir dos arrays (sem coordenadas)
+        if self._manager is None:
+            manager = NetworkManager()
+            names = self.graph().names
+            for i, name in enumerate(names):
+                manager.add_device(name, self.ips[i], self.types[self.type_ids[i]], 0, 0,
+                                   self.prefixes[i])
+            offsets, targets, costs, capacities = self.offsets, self.targets, self.costs, self.capacities
+            for i, name in enumerate(names):
+                for k in range(offsets[i], offsets[i + 1]):
+                    j = targets[k]
+                    if i < j:
+                        manager.create_connection(name, names[j], costs[k], capacities[k] or None)
+            self._manager = manager
+        return self._manager
+
+    def close(self):
+        self._graph = None
+        self._hop_graph = None
+        self._manager = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _as_view(values, code):
+    # array, bytearray ou lista -> memoryview no formato da seção
+    if isinstance(values, list):
+        values = array(code, values)
+    return memoryview(values).cast("B").cast(code)
+
+
+class RouteSummary:
+    # Estatísticas de roteamento de um conjunto de pares (somáveis entre workers)
+    MAX_UNREACHABLE = 1000  # pares sem rota guardados; a contagem continua completa
+
+    def __init__(self):
+        self.pairs = 0
+        self.found = 0
+        self.total_hops = 0
+        self.max_hops = 0
+        self.hops = {}  # saltos -> quantidade de pares
+        self.unreachable = []  # (origem, destino)
+        self.unreachable_count = 0
+
+    def add(self, source, dest, path):
+        self.pairs += 1
+        if path is None:
+            self.unreachable_count += 1
+            if len(self.unreachable) < self.MAX_UNREACHABLE:
+                self.unreachable.append((source, dest))
+            return
+        hops = len(path) - 1
+        self.found += 1
+        self.total_hops += hops
+        self.hops[hops] = self.hops.get(hops, 0) + 1
+        if hops > self.max_hops:
+            self.max_hops = hops
+
+    def merge(self, other):
+        self.pairs += other.pairs
+        self.found += other.found
+        self.total_hops += other.total_hops
+        self.max_hops = max(self.max_hops, other.max_hops)
+        for hops, count in other.hops.items():
+            self.hops[hops] = self.hops.get(hops, 0) + count
+        room = self.MAX_UNREACHABLE - len(self.unreachable)
+        self.unreachable.extend(other.unreachable[:room])
+        self.unreachable_count += other.unreachable_count
+        return self
+
+    def as_dict(self):
+        return {
+            "pairs": self.pairs,
+            "found": self.found,
+            "unreachable": self.unreachable_count,
+            "avg_hops": self.total_hops / self.found if self.found else None,
+            "max_hops": self.max_hops,
+            "hops": dict(sorted(self.hops.items())),
+            "unreachable_pairs": [list(pair) for pair in self.unreachable],
+        }
+
+
+# --- lado do worker ---
+
+_topology = None
+
+
+def _init_worker(spec):
+    global _topology
+    _topology = SharedTopology.attach(spec)
+
+
+def _route_chunk(demands, routing):
+    # demands: (origem, destino, fluxo) em índices, já agrupados por destino
+    topology = _topology
+    graph = topology.hop_graph() if routing == "table" else topology.graph()
+    names = graph.names
+    summary = RouteSummary()
+    batch = []
+    for source, dest, flow in demands:
+        if source == dest or topology.same_network(source, dest):
+            summary.add(names[source], names[dest], (source, dest))
+            continue
+        hash_value = flow_hash(names[source], names[dest], flow) if routing == "ecmp" else None
+        batch.append((source, dest, hash_value))
+    for (source, dest, _), path in zip(batch, graph.route_matrix(batch)):
+        summary.add(names[source], names[dest], path)
+    return summary
+
+
+def _run_scenario(pairs, options):
+    # Simula um cenário inteiro no worker, como backend.run faria
+    return simulate(_topology.to_manager(), pairs, argparse.Namespace(**options))
+
+
+# --- lado do processo principal ---
+
+class ParallelRunner:
+    # Distribui pares ou cenários entre um pool de processos que compartilham
+    # a mesma topologia. Use como gerenciador de contexto:
+    #
+    #   with ParallelRunner(manager, workers=8) as runner:
+    #       summary = runner.route_pairs(pairs, routing="ecmp")
+
+    def __init__(self, manager, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.topology = SharedTopology.publish(manager)
+        self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                          initargs=(self.topology.spec,))
+
+    def route_pairs(self, pairs, routing="cost", chunks_per_worker=4):
+        # pairs: (origem, destino) ou (origem, destino, fluxo), por nome.
+        # Os pares são ordenados por destino e divididos sem separar um
+        # destino entre blocos, para cada Dijkstra rodar uma única vez.
+        index = self.topology.graph().index
+        summary = RouteSummary()
+        demands = []
+        for flow, pair in enumerate(pairs):
+            source, dest = index.get(pair[0]), index.get(pair[1])
+            if source is None or dest is None:
+                summary.add(pair[0], pair[1], None)
+                continue
+            demands.append((source, dest, pair[2] if len(pair) > 2 else flow))
+        demands.sort(key=lambda demand: demand[1])
+        target = max(1, len(demands) // (self.workers * chunks_per_worker))
+        chunks = []
+        start = 0
+        while start < len(demands):
+            end = min(start + target, len(demands))
+            while end < len(demands) and demands[end][1] == demands[end - 1][1]:
+                end += 1
+            chunks.append(demands[start:end])
+            start = end
+        results = self._pool.starmap(_route_chunk, [(chunk, routing) for chunk in chunks])
+        for result in results:
+            summary.merge(result)
+        return summary
+
+    def run_scenarios(self, scenarios, latency=0.001, bandwidth=100e6, queue_limit=64,
+                      routing="table", count=1, interval=0.001, size=1500):
+        # Cada cenário (lista de pares, como em backend.run) é uma simulação
+        # independente num worker. Retorna as linhas de cada cenário e os totais somados.
+        options = {"latency": latency, "bandwidth": bandwidth, "queue_limit": queue_limit,
+                   "routing": routing, "count": count, "interval": interval, "size": size}
+        results = self._pool.starmap(_run_scenario, [(pairs, options) for pairs in scenarios])
+        totals = SimulationStats()
+        for _, stats in results:
+            totals.merge(stats)
+        return [rows for rows, _ in results], [stats for _, stats in results], totals
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+        self.topology.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,190 @@
+from collections import deque
+
+from . import metrics
+
+_VISITED = {algorithm: metrics.histogram("routing_nodes_visited", "Dispositivos alcançados por busca",
+                                         buckets=metrics.COUNT_BUCKETS, algorithm=algorithm)
+            for algorithm in ("tree", "bfs", "bidirectional")}
+_CACHE_HITS = metrics.counter("routing_cache_hits_total", "Caminhos servidos pelo cache da tabela de rotas")
+_CACHE_MISSES = metrics.counter("routing_cache_misses_total", "Caminhos reconstruídos na tabela de rotas")
+_TREES = metrics.counter("routing_trees_computed_total", "Árvores de caminhos mínimos calculadas")
+_INVALIDATED = metrics.counter("routing_trees_invalidated_total", "Árvores descartadas por alterações na topologia")
+
+
+def shortest_path_tree(source):
+    # BFS a partir da origem: só roteadores (e a própria origem) são expandidos,
+    # os demais dispositivos entram apenas como destinos finais (folhas).
+    parents = {source: None}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in node.connections:
+            if neighbor not in parents:
+                parents[neighbor] = node
+                if neighbor.device_type == "roteador":
+                    queue.append(neighbor)
+    if metrics.enabled:
+        _VISITED["tree"].observe(len(parents))
+    return parents
+
+
+def build_path(parents, dest):
+    path = []
+    node = dest
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    # Tupla: o mesmo caminho é compartilhado por todos os pacotes do par
+    return tuple(path)
+
+
+def bfs_path(source, dest):
+    # BFS de par único com mapa de predecessores (sem copiar listas na fila);
+    # para assim que o destino é alcançado.
+    if source is dest:
+        return (source,)
+    parents = {source: None}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in node.connections:
+            if neighbor in parents:
+                continue
+            if neighbor is dest:
+                parents[neighbor] = node
+                if metrics.enabled:
+                    _VISITED["bfs"].observe(len(parents))
+                return build_path(parents, dest)
+            # Só passa por roteadores
+            if neighbor.device_type == "roteador":
+                parents[neighbor] = node
+                queue.append(neighbor)
+    if metrics.enabled:
+        _VISITED["bfs"].observe(len(parents))
+    return None
+
+
+def _expand_level(frontier, parents, depths, other_parents, target):
+    # Expande um nível inteiro de um dos lados da busca bidirecional.
+    # Retorna a próxima fronteira e os nós onde as duas buscas se encontraram.
+    next_frontier = []
+    meetings = []
+    for node in frontier:
+        depth = depths[node] + 1
+        for neighbor in node.connections:
+            if neighbor in parents:
+                continue
+            if neighbor.device_type != "roteador" and neighbor is not target:
+                continue
+            parents[neighbor] = node
+            depths[neighbor] = depth
+            if neighbor in other_parents:
+                meetings.append(neighbor)
+            else:
+                next_frontier.append(neighbor)
+    return next_frontier, meetings
+
+
+def bidirectional_path(source, dest):
+    # BFS bidirecional: a cada passo expande um nível inteiro do lado com a
+    # menor fronteira. Apenas roteadores podem ser nós intermediários, então
+    # cada lado só aceita roteadores ou a ponta oposta.
+    if source is dest:
+        return (source,)
+    forward, forward_depths = {source: None}, {source: 0}
+    backward, backward_depths = {dest: None}, {dest: 0}
+    forward_frontier = [source]
+    backward_frontier = [dest]
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meetings = _expand_level(
+                forward_frontier, forward, forward_depths, backward, dest)
+        else:
+            backward_frontier, meetings = _expand_level(
+                backward_frontier, backward, backward_depths, forward, source)
+        if meetings:
+            if metrics.enabled:
+                _VISITED["bidirectional"].observe(len(forward) + len(backward))
+            # Entre os encontros do mesmo nível, fica o de menor caminho total
+            meeting = min(meetings, key=lambda n: forward_depths[n] + backward_depths[n])
+            head = build_path(forward, meeting)
+            tail = build_path(backward, meeting)
+            return head + tail[-2::-1]
+    if metrics.enabled:
+        _VISITED["bidirectional"].observe(len(forward) + len(backward))
+    return None
+
+
+class RouteTable:
+    # Tabela de rotas calculada sob demanda: uma árvore de caminhos mínimos por
+    # origem (predecessores) e um cache dos caminhos já reconstruídos.
+    # Alterações de topologia invalidam apenas as origens afetadas.
+
+    def __init__(self):
+        self.trees = {}  # id da origem -> {dispositivo: predecessor}
+        self.paths = {}  # id da origem -> {id do destino: caminho}
+        self.computations = 0  # quantas árvores foram calculadas (útil em benchmarks)
+
+    def tree(self, source):
+        tree = self.trees.get(source.id)
+        if tree is None:
+            tree = shortest_path_tree(source)
+            self.trees[source.id] = tree
+            self.paths[source.id] = {}
+            self.computations += 1
+            if metrics.enabled:
+                _TREES.inc()
+        return tree
+
+    def path(self, source, dest):
+        tree = self.tree(source)
+        cache = self.paths[source.id]
+        if dest.id in cache:
+            if metrics.enabled:
+                _CACHE_HITS.inc()
+            return cache[dest.id]
+        if metrics.enabled:
+            _CACHE_MISSES.inc()
+        path = build_path(tree, dest) if dest in tree else None
+        cache[dest.id] = path
+        return path
+
+    def next_hop(self, source, dest):
+        path = self.path(source, dest)
+        if path and len(path) > 1:
+            return path[1]
+        return None
+
+    def build_all(self, devices):
+        for device in devices:
+            self.tree(device)
+
+    def clear(self):
+        self.trees.clear()
+        self.paths.clear()
+
+    def _invalidate(self, source_ids):
+        if metrics.enabled:
+            _INVALIDATED.inc(len(source_ids))
+        for source_id in source_ids:
+            del self.trees[source_id]
+            del self.paths[source_id]
+
+    # --- invalidação incremental ---
+
+    def device_added(self, device):
+        # Um dispositivo isolado não altera nenhuma rota existente
+        pass
+
+    def device_removed(self, device):
+        self._invalidate([sid for sid, tree in self.trees.items() if device in tree])
+
+    def link_added(self, d1, d2):
+        # Só as origens que já alcançam uma das pontas podem ganhar caminhos novos
+        self._invalidate([sid for sid, tree in self.trees.items() if d1 in tree or d2 in tree])
+
+    def link_removed(self, d1, d2):
+        # Só as árvores que usam o enlace removido precisam ser recalculadas
+        self._invalidate([sid for sid, tree in self.trees.items()
+                          if tree.get(d1) is d2 or tree.get(d2) is d1])
@@ -0,0 +1,142 @@
+# Execução de simulações sem interface gráfica (não importa tkinter nem PIL).
+#
+# Exemplos:
+#   python -m backend.run redeb --pair a router 1000
+#   python -m backend.run saved_networks/rede.json --scenario cenario.json --format csv
+#   python -m backend.run redeb --pair a router 1000 --metrics metricas.prom
+#
+# O cenário é um JSON com uma lista de pares:
+#   [{"source": "a", "destination": "b", "count": 100, "interval": 0.001}, ...]
+import argparse
+import csv
+import json
+import os
+import sys
+
+from . import metrics
+from .network_manager import NetworkManager
+from .simulation import Simulator
+
+NETWORKS_DIR = "saved_networks"
+CSV_FIELDS = ["source", "destination", "path", "hops", "sent", "delivered", "dropped",
+              "avg_latency", "max_latency"]
+
+
+def resolve_network(name):
+    # Aceita caminho para o arquivo ou o nome salvo em saved_networks/ (sem .json)
+    if os.path.exists(name):
+        return name
+    return os.path.join(NETWORKS_DIR, name if name.endswith(".json") else f"{name}.json")
+
+
+def load_scenario(filename):
+    with open(filename, "r") as f:
+        data = json.load(f)
+    return data["pairs"] if isinstance(data, dict) else data
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m backend.run",
+                                     description="Simula tráfego numa rede salva, sem interface gráfica.")
+    parser.add_argument("network", help="arquivo da rede ou nome em saved_networks/")
+    parser.add_argument("--pair", nargs="+", action="append", default=[], metavar="ARG",
+                        help="ORIGEM DESTINO [QUANTIDADE]; pode ser repetido")
+    parser.add_argument("--scenario", help="arquivo JSON com a lista de pares")
+    parser.add_argument("--count", type=int, default=1, help="pacotes por par (padrão: 1)")
+    parser.add_argument("--interval", type=float, default=0.001, help="intervalo entre pacotes, em segundos")
+    parser.add_argument("--size", type=int, default=1500, help="tamanho do pacote em bytes")
+    parser.add_argument("--latency", type=float, default=0.001, help="latência dos enlaces, em segundos")
+    parser.add_argument("--bandwidth", type=float, default=100e6, help="banda dos enlaces, em bits/s")
+    parser.add_argument("--queue-limit", type=int, default=64, help="tamanho da fila dos roteadores")
+    parser.add_argument("--routing", choices=("table", "cost", "ecmp", "fib"), default="table",
+                        help="menor número de saltos, menor custo, ECMP ou tabelas dos roteadores "
+                             "(padrão: table)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--output", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--metrics", metavar="ARQUIVO",
+                        help="grava as métricas de execução (.prom para Prometheus, senão JSON)")
+    args = parser.parse_args(argv)
+
+    pairs = []
+    for item in args.pair:
+        if len(item) not in (2, 3):
+            parser.error("--pair espera ORIGEM DESTINO [QUANTIDADE]")
+        pairs.append({"source": item[0], "destination": item[1],
+                      "count": int(item[2]) if len(item) == 3 else args.count})
+    if args.scenario:
+        pairs.extend(load_scenario(args.scenario))
+    if not pairs:
+        parser.error("informe ao menos um --pair ou --scenario")
+    args.pairs = pairs
+    return args
+
+
+def simulate(manager, pairs, args):
+    simulator = Simulator(manager, latency=args.latency, bandwidth=args.bandwidth,
+                          queue_limit=args.queue_limit, routing=args.routing)
+    paths = simulator.route_matrix([(pair["source"], pair["destination"]) for pair in pairs])
+    rows = []
+    for pair, path in zip(pairs, paths):
+        count = pair.get("count", args.count)
+        flow = simulator.send_path(path, count,
+                                   start=pair.get("start", 0.0),
+                                   interval=pair.get("interval", args.interval),
+                                   size=pair.get("size", args.size))
+        if flow is None:
+            rows.append({"source": pair["source"], "destination": pair["destination"], "path": None,
+                         "hops": None, "sent": count, "delivered": 0, "dropped": count,
+                         "avg_latency": None, "max_latency": None})
+        else:
+            rows.append(flow)
+    stats = simulator.run()
+    # Os fluxos só têm estatísticas completas depois da simulação
+    rows = [row if isinstance(row, dict) else row.as_dict() for row in rows]
+    return rows, stats
+
+
+def write_json(out, network, rows, stats):
+    json.dump({"network": network, "pairs": rows, "totals": stats.as_dict()}, out, indent=2)
+    out.write("\n")
+
+
+def write_csv(out, rows):
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for row in rows:
+        row = dict(row)
+        row["path"] = ">".join(row["path"]) if row["path"] else ""
+        writer.writerow(row)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+    filename = resolve_network(args.network)
+    manager = NetworkManager()
+    try:
+        report = manager.load_from_file(filename)
+    except (OSError, ValueError) as e:
+        print(f"Falha ao carregar {filename}: {e}", file=sys.stderr)
+        return 1
+    if report.total_skipped:
+        print(f"{filename}: {report.summary()}", file=sys.stderr)
+
+    rows, stats = simulate(manager, args.pairs, args)
+    if args.metrics:
+        metrics.write(args.metrics)
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(out, rows)
+        else:
+            write_json(out, filename, rows, stats)
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
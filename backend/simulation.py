@@ -0,0 +1,307 @@
+import heapq
+import time
+from itertools import count
+
+from . import metrics
+from .packet import Packet
+
+# Tipos de evento na fila de prioridade
+INJECT, DEPART, ARRIVE = 0, 1, 2
+
+NO_ROUTE = "sem_rota"
+QUEUE_FULL = "fila_cheia"
+
+
+_RUN_SECONDS = metrics.histogram("simulation_run_seconds", "Duração de Simulator.run")
+_EVENTS = metrics.counter("simulation_events_total", "Eventos processados pelo simulador")
+
+
+def link_key(name1, name2):
+    return (name1, name2) if name1 <= name2 else (name2, name1)
+
+
+class Link:
+    def __init__(self, latency, bandwidth):
+        self.latency = latency  # segundos
+        self.bandwidth = bandwidth  # bits por segundo
+
+
+class Flow:
+    # Sequência de pacotes entre um par, injetados um a um durante a simulação
+    # (só os pacotes em trânsito ficam em memória).
+    def __init__(self, source, destination, path, remaining, interval, size):
+        self.source = source
+        self.destination = destination
+        self.path = path
+        self.remaining = remaining
+        self.interval = interval
+        self.size = size
+        # estatísticas do fluxo
+        self.sent = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def as_dict(self):
+        return {
+            "source": self.source.name,
+            "destination": self.destination.name,
+            "path": [device.name for device in self.path],
+            "hops": len(self.path) - 1,
+            "sent": self.sent,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "avg_latency": self.total_latency / self.delivered if self.delivered else None,
+            "max_latency": self.max_latency if self.delivered else None,
+        }
+
+
+class SimulationStats:
+    def __init__(self):
+        self.sent = 0
+        self.delivered = 0
+        self.dropped = {}  # motivo -> quantidade
+        self.router_drops = {}  # nome do roteador -> descartes por fila cheia
+        self.max_queue = {}  # nome do dispositivo -> maior fila observada
+        self.total_latency = 0.0
+        self.min_latency = None
+        self.max_latency = 0.0
+        self.total_hops = 0
+        self.events = 0
+        self.end_time = 0.0
+
+    def drop(self, reason, amount=1):
+        self.dropped[reason] = self.dropped.get(reason, 0) + amount
+
+    def merge(self, other):
+        # Soma as estatísticas de outra simulação (ex.: de outro processo)
+        self.sent += other.sent
+        self.delivered += other.delivered
+        for reason, amount in other.dropped.items():
+            self.drop(reason, amount)
+        for name, amount in other.router_drops.items():
+            self.router_drops[name] = self.router_drops.get(name, 0) + amount
+        for name, depth in other.max_queue.items():
+            if depth > self.max_queue.get(name, 0):
+                self.max_queue[name] = depth
+        self.total_latency += other.total_latency
+        if other.min_latency is not None and (self.min_latency is None
+                                              or other.min_latency < self.min_latency):
+            self.min_latency = other.min_latency
+        self.max_latency = max(self.max_latency, other.max_latency)
+        self.total_hops += other.total_hops
+        self.events += other.events
+        self.end_time = max(self.end_time, other.end_time)
+        return self
+
+    @property
+    def total_dropped(self):
+        return sum(self.dropped.values())
+
+    def as_dict(self):
+        delivered = self.delivered
+        return {
+            "sent": self.sent,
+            "delivered": delivered,
+            "dropped": self.total_dropped,
+            "drop_reasons": dict(self.dropped),
+            "router_drops": dict(self.router_drops),
+            "max_queue": dict(self.max_queue),
+            "avg_latency": self.total_latency / delivered if delivered else None,
+            "min_latency": self.min_latency,
+            "max_latency": self.max_latency if delivered else None,
+            "avg_hops": self.total_hops / delivered if delivered else None,
+            "events": self.events,
+            "end_time": self.end_time,
+        }
+
+
+class EventRecorder:
+    # Observador que guarda os eventos amostrados para a interface reproduzir depois
+    def __init__(self, limit=1000):
+        self.limit = limit
+        self.events = []  # (evento, instante, pacote, nó, próximo nó)
+
+    def __call__(self, event, time, packet, node, other):
+        if len(self.events) < self.limit:
+            self.events.append((event, time, packet, node, other))
+
+    def delivered_paths(self):
+        return [packet.path for event, _, packet, _, _ in self.events if event == "deliver"]
+
+
+class Simulator:
+    # Simulação de eventos discretos sobre a topologia do NetworkManager.
+    # Cada enlace tem latência e banda; cada dispositivo tem uma fila de saída
+    # (limitada nos roteadores). Nada depende do relógio real: o tempo avança
+    # de evento em evento, tão rápido quanto a CPU permitir.
+    # routing: "table" (menor número de saltos), "cost" (menor custo),
+    # "ecmp" (menor custo, cada fluxo num dos caminhos de mesmo custo) ou
+    # "fib" (salto a salto, pelo prefixo mais longo na tabela de cada roteador).
+
+    def __init__(self, manager, latency=0.001, bandwidth=100e6, queue_limit=64,
+                 observer=None, sample_every=1, routing="table"):
+        self.manager = manager
+        self.default_link = Link(latency, bandwidth)
+        self.links = {}  # tupla ordenada de nomes -> Link
+        # Enlaces com capacidade definida na topologia usam essa banda
+        for key, attributes in manager.links.items():
+            if attributes.capacity:
+                self.links[key] = Link(latency, attributes.capacity)
+        self.routing = routing
+        self._next_flow_id = 0
+        self.queue_limit = queue_limit
+        # chamado como observer(evento, instante, pacote, nó, próximo nó); eventos:
+        # "send", "enqueue" (entrou na fila de nó rumo ao próximo), "hop" (saiu
+        # de nó pelo enlace), "deliver" e "drop"
+        self.observer = observer
+        self.sample_every = sample_every  # só 1 a cada N pacotes é repassado ao observador
+        self.now = 0.0
+        self.stats = SimulationStats()
+        self._events = []
+        self._seq = count()
+        self._link_free = {}  # (id de quem envia, id de quem recebe) -> instante em que o enlace libera
+        self._queues = {}  # id do dispositivo -> pacotes aguardando ou em transmissão
+        self._next_packet_id = 0
+
+    def set_link(self, name1, name2, latency=None, bandwidth=None):
+        link = Link(self.default_link.latency if latency is None else latency,
+                    self.default_link.bandwidth if bandwidth is None else bandwidth)
+        self.links[link_key(name1, name2)] = link
+        return link
+
+    def bandwidth(self, key):
+        # Banda (bits/s) do enlace com a chave ordenada key
+        return self.links.get(key, self.default_link).bandwidth
+
+    def route(self, source_name, destination_name):
+        flow = self._next_flow_id
+        self._next_flow_id += 1
+        return self.manager.find_path(source_name, destination_name, self.routing, flow)
+
+    def route_matrix(self, pairs):
+        # Caminhos de vários pares de uma vez (um Dijkstra por destino)
+        if self.routing not in ("cost", "ecmp"):
+            return [self.route(source, destination) for source, destination in pairs]
+        first = self._next_flow_id
+        self._next_flow_id += len(pairs)
+        demands = [(source, destination, first + i) for i, (source, destination) in enumerate(pairs)]
+        return self.manager.route_matrix(demands, ecmp=self.routing == "ecmp")
+
+    def send(self, source_name, destination_name, count=1, start=0.0, interval=0.0, size=1500):
+        # Retorna o fluxo criado, ou None se não houver caminho entre o par
+        return self.send_path(self.route(source_name, destination_name), count, start, interval, size)
+
+    def send_path(self, path, count=1, start=0.0, interval=0.0, size=1500):
+        # Como send, mas por um caminho já calculado (ex.: por route_matrix)
+        if not path:
+            self.stats.sent += count
+            self.stats.drop(NO_ROUTE, count)
+            return None
+        flow = Flow(path[0], path[-1], path, count, interval, size)
+        self._schedule(start, INJECT, flow)
+        return flow
+
+    def _schedule(self, time, kind, item):
+        heapq.heappush(self._events, (time, next(self._seq), kind, item))
+
+    def _notify(self, event, packet, node, other=None):
+        if packet.id % self.sample_every == 0:
+            self.observer(event, self.now, packet, node, other)
+
+    def run(self, until=None):
+        events = self._events
+        stats = self.stats
+        observer = self.observer
+        timing = metrics.enabled
+        if timing:
+            started = time.perf_counter()
+            events_before = stats.events
+        while events:
+            if until is not None and events[0][0] > until:
+                break
+            now, _, kind, item = heapq.heappop(events)
+            self.now = now
+            stats.events += 1
+            if kind == INJECT:
+                self._inject(item)
+            elif kind == DEPART:
+                packet = item
+                node = packet.path[packet.current_index]
+                self._queues[node.id] -= 1
+                nxt = packet.next_hop()
+                link = self.links.get(link_key(node.name, nxt.name), self.default_link)
+                self._schedule(now + link.latency, ARRIVE, packet)
+                if observer:
+                    self._notify("hop", packet, node, nxt)
+            else:
+                self._arrive(item)
+        stats.end_time = self.now
+        if timing:
+            _RUN_SECONDS.observe(time.perf_counter() - started)
+            _EVENTS.inc(stats.events - events_before)
+        return stats
+
+    def _inject(self, flow):
+        packet = Packet(flow.source, flow.destination, flow.size)
+        packet.path = flow.path
+        packet.flow = flow
+        packet.id = self._next_packet_id
+        packet.sent_at = self.now
+        self._next_packet_id += 1
+        self.stats.sent += 1
+        flow.sent += 1
+        flow.remaining -= 1
+        if flow.remaining > 0:
+            self._schedule(self.now + flow.interval, INJECT, flow)
+        if self.observer:
+            self._notify("send", packet, flow.source)
+        self._arrive(packet)
+
+    def _arrive(self, packet):
+        stats = self.stats
+        path = packet.path
+        index = packet.current_index
+        node = path[index]
+        if index == len(path) - 1:
+            packet.delivered_at = self.now
+            latency = self.now - packet.sent_at
+            stats.delivered += 1
+            stats.total_latency += latency
+            stats.total_hops += index
+            if stats.min_latency is None or latency < stats.min_latency:
+                stats.min_latency = latency
+            if latency > stats.max_latency:
+                stats.max_latency = latency
+            flow = packet.flow
+            flow.delivered += 1
+            flow.total_latency += latency
+            if latency > flow.max_latency:
+                flow.max_latency = latency
+            if self.observer:
+                self._notify("deliver", packet, node)
+            return
+
+        # Encaminha para o próximo salto pela fila de saída do dispositivo
+        depth = self._queues.get(node.id, 0)
+        if node.device_type == "roteador" and depth >= self.queue_limit:
+            stats.drop(QUEUE_FULL)
+            stats.router_drops[node.name] = stats.router_drops.get(node.name, 0) + 1
+            packet.flow.dropped += 1
+            if self.observer:
+                self._notify("drop", packet, node)
+            return
+        nxt = path[index + 1]
+        link = self.links.get(link_key(node.name, nxt.name), self.default_link)
+        key = (node.id, nxt.id)
+        start = max(self.now, self._link_free.get(key, 0.0))
+        done = start + packet.size * 8 / link.bandwidth
+        self._link_free[key] = done
+        depth += 1
+        self._queues[node.id] = depth
+        if depth > stats.max_queue.get(node.name, 0):
+            stats.max_queue[node.name] = depth
+        self._schedule(done, DEPART, packet)
+        if self.observer:
+            self._notify("enqueue", packet, node, nxt)
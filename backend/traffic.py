@@ -0,0 +1,75 @@
+# Agregação do tráfego de uma simulação em janelas de tempo, para o mapa de
+# calor da interface: bits por enlace, pacotes encaminhados por roteador e a
+# maior fila de cada roteador em cada janela. A memória depende de janelas x
+# enlaces ativos, não do número de pacotes.
+from .simulation import link_key
+
+
+class TrafficMonitor:
+    # Observador do Simulator (use sample_every=1 para contar todos os pacotes)
+    def __init__(self, window=0.001):
+        self.window = window  # duração de cada janela, em segundos de simulação
+        self.links = {}  # janela -> {enlace: bits}
+        self.routers = {}  # janela -> {roteador: pacotes encaminhados}
+        self.queues = {}  # janela -> {roteador: maior fila}
+        self.depth = {}  # roteador -> fila atual
+        self.first = None  # primeira e última janelas com tráfego
+        self.last = None
+
+    def __call__(self, event, time, packet, node, other):
+        if event not in ("hop", "enqueue"):
+            return
+        bucket = int(time / self.window)
+        if self.first is None or bucket < self.first:
+            self.first = bucket
+        if self.last is None or bucket > self.last:
+            self.last = bucket
+        router = node.device_type == "roteador"
+        name = node.name
+        if event == "enqueue":
+            if router:
+                depth = self.depth.get(name, 0) + 1
+                self.depth[name] = depth
+                self._queue(bucket, name, depth)
+            return
+        links = self.links.get(bucket)
+        if links is None:
+            links = self.links[bucket] = {}
+        key = link_key(name, other.name)
+        links[key] = links.get(key, 0) + packet.size * 8
+        if router:
+            routers = self.routers.get(bucket)
+            if routers is None:
+                routers = self.routers[bucket] = {}
+            routers[name] = routers.get(name, 0) + 1
+            depth = self.depth[name] - 1
+            self.depth[name] = depth
+            self._queue(bucket, name, depth)
+
+    def _queue(self, bucket, name, depth):
+        queues = self.queues.get(bucket)
+        if queues is None:
+            queues = self.queues[bucket] = {}
+        if depth > queues.get(name, 0):
+            queues[name] = depth
+
+    @property
+    def windows(self):
+        # Número de janelas entre a primeira e a última com tráfego
+        # (não é __len__: um monitor vazio tem de continuar verdadeiro para o Simulator)
+        return 0 if self.first is None else self.last - self.first + 1
+
+    def frame(self, start, stop):
+        # Junta as janelas [start, stop): (bits por enlace, pacotes por roteador, maior fila)
+        links = {}
+        routers = {}
+        queues = {}
+        for bucket in range(start, stop):
+            for key, bits in self.links.get(bucket, {}).items():
+                links[key] = links.get(key, 0) + bits
+            for name, count in self.routers.get(bucket, {}).items():
+                routers[name] = routers.get(name, 0) + count
+            for name, depth in self.queues.get(bucket, {}).items():
+                if depth > queues.get(name, 0):
+                    queues[name] = depth
+        return links, routers, queues
@@ -0,0 +1,60 @@
+# Benchmark de persistência: JSON x formato binário (.pnet).
+# Para cada escala gera uma rede (cadeia de roteadores com um PC por roteador),
+# salva nos dois formatos e mede tamanho do arquivo e tempo de carga.
+#
+# Uso: python -m benchmarks.bench_binary [dispositivos ...]
+import os
+import sys
+import tempfile
+import time
+
+from backend.binary_format import BinaryTopology
+from backend.network_manager import NetworkManager
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def build(n):
+    manager = NetworkManager()
+    for i in range(n):
+        kind = "roteador" if i % 2 == 0 else "pc"
+        manager.add_device(f"d{i}", (10 << 24) + i, kind, (i % 1000) * 80, (i // 1000) * 80)
+    for i in range(1, n):
+        # PC ligado ao roteador anterior; roteadores em cadeia
+        manager.create_connection(f"d{i}", f"d{i - 1}" if i % 2 else f"d{i - 2}")
+    return manager
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    print(f"{'n':>9} {'json':>10} {'pnet':>10} {'carga json':>11} {'abrir pnet':>11} {'carga pnet':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            manager = build(n)
+            json_file = os.path.join(tmp, f"rede{n}.json")
+            binary_file = os.path.join(tmp, f"rede{n}.pnet")
+            manager.save_to_file(json_file)
+            manager.save_to_file(binary_file)
+            del manager
+
+            json_time, _ = timed(lambda: NetworkManager().load_from_file(json_file))
+
+            def open_only():
+                # Abre via mmap e lê um dispositivo, sem materializar a rede
+                with BinaryTopology(binary_file) as topology:
+                    return topology.device(topology.device_count - 1)
+
+            open_time, _ = timed(open_only)
+            binary_time, _ = timed(lambda: NetworkManager().load_from_file(binary_file))
+            print(f"{n:>9} {os.path.getsize(json_file) / 1e6:>8.1f}MB {os.path.getsize(binary_file) / 1e6:>8.1f}MB"
+                  f" {json_time:>10.2f}s {open_time * 1000:>9.2f}ms {binary_time:>10.2f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
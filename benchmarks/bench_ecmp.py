@@ -0,0 +1,51 @@
+# Benchmark do roteamento por custo: uma matriz de tráfego resolvida par a par
+# (um Dijkstra por consulta) contra route_matrix (um Dijkstra por destino),
+# e a distribuição dos fluxos entre os caminhos de mesmo custo na grade.
+#
+# Uso: python -m benchmarks.bench_ecmp [nós] [pares] [destinos]
+import random
+import sys
+import time
+from collections import Counter
+
+from benchmarks.bench_routing import grid
+
+DEFAULT_NODES = 40_000
+DEFAULT_PAIRS = 1000
+DEFAULT_DESTINATIONS = 10
+
+
+def main(argv):
+    n = int(argv[0]) if argv else DEFAULT_NODES
+    pair_count = int(argv[1]) if len(argv) > 1 else DEFAULT_PAIRS
+    destination_count = int(argv[2]) if len(argv) > 2 else DEFAULT_DESTINATIONS
+    manager, src, dst = grid(n)
+    names = [device.name for device in manager.devices]
+    rng = random.Random(0)
+    destinations = rng.sample(names, destination_count)
+    demands = [(rng.choice(names), rng.choice(destinations), flow) for flow in range(pair_count)]
+
+    start = time.perf_counter()
+    manager.snapshot()
+    print(f"retrato CSR ({len(names)} nós): {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    batched = manager.route_matrix(demands)
+    batched_time = time.perf_counter() - start
+
+    # Par a par só numa amostra; o total é extrapolado
+    sample = demands[:max(1, pair_count // 20)]
+    start = time.perf_counter()
+    single = [manager.find_path(s, d, "ecmp", flow) for s, d, flow in sample]
+    single_time = (time.perf_counter() - start) * pair_count / len(sample)
+    assert single == batched[:len(sample)]
+    print(f"{pair_count} pares, {destination_count} destinos: par a par ~{single_time:.2f}s, "
+          f"route_matrix {batched_time:.2f}s ({single_time / batched_time:.1f}x)")
+
+    paths = Counter(manager.find_path(src, dst, "ecmp", flow) for flow in range(pair_count))
+    print(f"ECMP {src} -> {dst}: {len(paths)} caminhos distintos em {pair_count} fluxos, "
+          f"maior fatia {max(paths.values())}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
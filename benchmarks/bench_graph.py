@@ -0,0 +1,65 @@
+# Benchmark do armazenamento de grafo do NetworkManager.
+# Mede adicionar, conectar, buscar e remover dispositivos em escalas crescentes;
+# o tempo por operação deve ficar aproximadamente constante (escala linear).
+#
+# Uso: python -m benchmarks.bench_graph [tamanho ...]
+import random
+import sys
+import time
+
+from backend.network_manager import NetworkManager
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def ip_for(i):
+    return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def run(n, seed=0):
+    rng = random.Random(seed)
+    manager = NetworkManager()
+    names = [f"d{i}" for i in range(n)]
+    results = {}
+
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        manager.add_device(name, ip_for(i), "roteador" if i % 10 == 0 else "pc", 0, 0)
+    results["add"] = time.perf_counter() - start
+
+    pairs = [(names[i], names[i + 1]) for i in range(n - 1)]
+    pairs += [(rng.choice(names), rng.choice(names)) for _ in range(n)]
+    start = time.perf_counter()
+    for a, b in pairs:
+        manager.create_connection(a, b)
+    results["connect"] = time.perf_counter() - start
+
+    queries = [rng.choice(names) for _ in range(n)]
+    start = time.perf_counter()
+    for name in queries:
+        manager.get_device(name)
+    results["lookup"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for a, b in pairs[: n // 2]:
+        manager.remove_connection(a, b)
+    results["disconnect"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in names:
+        manager.remove_device(name)
+    results["remove"] = time.perf_counter() - start
+    return results
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    print(f"{'n':>8} " + " ".join(f"{op:>14}" for op in ("add", "connect", "lookup", "disconnect", "remove")))
+    for n in sizes:
+        results = run(n)
+        # tempo por operação em microssegundos
+        print(f"{n:>8} " + " ".join(f"{results[op] / n * 1e6:>12.2f}us" for op in results))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,47 @@
+# Benchmark do ParallelRunner: rotas de uma matriz de tráfego numa grade,
+# com 1, 2, 4... processos até o número de CPUs. A topologia é publicada
+# uma vez por execução; o tempo de publicação aparece separado.
+#
+# Uso: python -m benchmarks.bench_parallel [nós] [pares] [destinos]
+import os
+import random
+import sys
+import time
+
+from backend.parallel import ParallelRunner
+from benchmarks.bench_routing import grid
+
+DEFAULT_NODES = 100_000
+DEFAULT_PAIRS = 4000
+DEFAULT_DESTINATIONS = 64
+
+
+def main(argv):
+    n = int(argv[0]) if argv else DEFAULT_NODES
+    pair_count = int(argv[1]) if len(argv) > 1 else DEFAULT_PAIRS
+    destination_count = int(argv[2]) if len(argv) > 2 else DEFAULT_DESTINATIONS
+    manager, _, _ = grid(n)
+    names = [device.name for device in manager.devices]
+    rng = random.Random(0)
+    destinations = rng.sample(names, destination_count)
+    pairs = [(rng.choice(names), rng.choice(destinations)) for _ in range(pair_count)]
+
+    workers = 1
+    baseline = None
+    print(f"{'processos':>9} {'publicação':>11} {'rotas':>9} {'aceleração':>11}")
+    while True:
+        start = time.perf_counter()
+        with ParallelRunner(manager, workers=workers) as runner:
+            published = time.perf_counter()
+            summary = runner.route_pairs(pairs)
+            elapsed = time.perf_counter() - published
+        assert summary.pairs == pair_count
+        baseline = baseline or elapsed
+        print(f"{workers:>9} {(published - start) * 1000:>9.1f}ms {elapsed:>8.2f}s {baseline / elapsed:>10.2f}x")
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
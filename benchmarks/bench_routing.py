@@ -0,0 +1,101 @@
+# Benchmark da busca de caminhos em topologias sintéticas (cadeia, grade e árvore).
+# Compara a BFS antiga (que copia o caminho inteiro a cada expansão) com a BFS
+# por predecessores e a BFS bidirecional de backend.routing.
+#
+# Uso: python -m benchmarks.bench_routing [nós] [limite da BFS antiga]
+import sys
+import time
+from collections import deque
+
+from backend.routing import bfs_path, bidirectional_path
+from backend.network_manager import NetworkManager
+
+DEFAULT_NODES = 100_000
+# Acima disso a BFS antiga é quadrática na cadeia e fica impraticável
+DEFAULT_LEGACY_LIMIT = 20_000
+
+
+def legacy_path(source, dest):
+    # Implementação original de find_path (caminhos inteiros na fila)
+    queue = deque()
+    queue.append([source])
+    visited = set()
+    visited.add(source)
+    while queue:
+        path = queue.popleft()
+        last = path[-1]
+        if last == dest:
+            return path
+        for neighbor in last.connections:
+            if neighbor not in visited:
+                if neighbor.device_type == "roteador" or neighbor == dest:
+                    visited.add(neighbor)
+                    queue.append(path + [neighbor])
+    return None
+
+
+def ip_for(i):
+    # Cada roteador numa /24 diferente
+    return f"10.{(i >> 8) & 255}.{i & 255}.1"
+
+
+def build(n, edges):
+    manager = NetworkManager()
+    for i in range(n):
+        manager.add_device(f"r{i}", ip_for(i), "roteador", 0, 0)
+    for a, b in edges:
+        manager.create_connection(f"r{a}", f"r{b}")
+    return manager
+
+
+def chain(n):
+    return build(n, ((i, i + 1) for i in range(n - 1))), "r0", f"r{n - 1}"
+
+
+def grid(n):
+    side = int(n ** 0.5)
+    edges = []
+    for row in range(side):
+        for col in range(side):
+            i = row * side + col
+            if col + 1 < side:
+                edges.append((i, i + 1))
+            if row + 1 < side:
+                edges.append((i, i + side))
+    return build(side * side, edges), "r0", f"r{side * side - 1}"
+
+
+def tree(n):
+    # Árvore binária: de uma folha à esquerda até a última folha
+    manager = build(n, ((i, (i - 1) // 2) for i in range(1, n)))
+    leftmost = 0
+    while 2 * leftmost + 1 < n:
+        leftmost = 2 * leftmost + 1
+    return manager, f"r{leftmost}", f"r{n - 1}"
+
+
+def timed(func, source, dest):
+    start = time.perf_counter()
+    path = func(source, dest)
+    return time.perf_counter() - start, len(path) if path else 0
+
+
+def main(argv):
+    n = int(argv[0]) if argv else DEFAULT_NODES
+    legacy_limit = int(argv[1]) if len(argv) > 1 else DEFAULT_LEGACY_LIMIT
+    print(f"{'topologia':>10} {'nós':>8} {'saltos':>7} {'antiga':>10} {'bfs':>10} {'bidirecional':>13}")
+    for name, factory in (("cadeia", chain), ("grade", grid), ("árvore", tree)):
+        manager, src, dst = factory(n)
+        source, dest = manager.get_device(src), manager.get_device(dst)
+        nodes = len(manager.devices)
+        legacy = "-"
+        if nodes <= legacy_limit:
+            legacy = f"{timed(legacy_path, source, dest)[0] * 1000:.1f}ms"
+        bfs_time, hops = timed(bfs_path, source, dest)
+        bidir_time, bidir_hops = timed(bidirectional_path, source, dest)
+        assert hops == bidir_hops
+        print(f"{name:>10} {nodes:>8} {hops - 1:>7} {legacy:>10} {bfs_time * 1000:>8.1f}ms {bidir_time * 1000:>11.1f}ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,153 @@
+# Conferência do índice de alcançabilidade contra força bruta.
+# Gera redes aleatórias pequenas (máscaras /16 e /24 misturadas), aplica
+# sequências de edições e, a cada passo, compara can_reach, components,
+# isolated_subnets e articulation_routers com buscas feitas do zero (só
+# roteadores encaminham). Termina com código 1 na primeira divergência.
+#
+# Uso: python -m benchmarks.check_connectivity [redes] [semente]
+import random
+import sys
+
+from backend.addressing import parse_subnet
+from backend.network_manager import NetworkManager
+
+DEFAULT_NETWORKS = 500
+STEPS = 30
+
+
+def transit_reach(source, removed=None):
+    # Dispositivos alcançados a partir de source passando só por roteadores
+    seen = {source}
+    queue = [source]
+    for device in queue:  # a lista cresce durante o laço (busca em largura)
+        if device is not source and device.device_type != "roteador":
+            continue
+        for neighbor in device.connections:
+            if neighbor is not removed and neighbor not in seen:
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return seen
+
+
+def brute_components(devices):
+    routers = [d for d in devices if d.device_type == "roteador"]
+    groups = []
+    seen = set()
+    for router in routers:
+        if router in seen:
+            continue
+        group = {router}
+        queue = [router]
+        for device in queue:
+            for neighbor in device.connections:
+                if neighbor.device_type == "roteador" and neighbor not in group:
+                    group.add(neighbor)
+                    queue.append(neighbor)
+        seen |= group
+        group |= {neighbor for r in list(group) for neighbor in r.connections}
+        groups.append(group)
+    loose = [d for d in devices if all(n.device_type != "roteador" for n in d.connections)
+             and d.device_type != "roteador"]
+    pending = set(loose)
+    for device in loose:
+        if device not in pending:
+            continue
+        pending.discard(device)
+        group = {device}
+        queue = [device]
+        for member in queue:
+            for neighbor in member.connections:
+                if neighbor in pending:
+                    pending.discard(neighbor)
+                    group.add(neighbor)
+                    queue.append(neighbor)
+        groups.append(group)
+    return sorted(sorted(d.name for d in group) for group in groups)
+
+
+def brute_articulation(devices):
+    reach = {d: transit_reach(d) for d in devices}
+    points = []
+    for router in devices:
+        if router.device_type != "roteador":
+            continue
+        others = [d for d in devices if d is not router]
+        for device in others:
+            after = transit_reach(device, removed=router)
+            if any(other in reach[device] and other not in after for other in others):
+                points.append(router.name)
+                break
+    return sorted(points)
+
+
+def brute_isolated(manager):
+    isolated = []
+    for subnet, members in manager.subnets.items():
+        if all(other.subnet == subnet for device in members for other in transit_reach(device)):
+            isolated.append(subnet)
+    return sorted(isolated)
+
+
+def edit(manager, rng, counter):
+    names = list(manager.devices_by_name)
+    choice = rng.random()
+    if choice < 0.3 or len(names) < 3:
+        i = counter[0]
+        counter[0] += 1
+        mask = rng.choice(("255.255.0.0", "255.255.255.0"))
+        ip = f"10.{rng.randrange(3)}.{rng.randrange(3)}.{i % 250 + 1}"
+        device_type = "roteador" if rng.random() < 0.4 else "pc"
+        manager.add_device(f"d{i}", ip, device_type, 0, 0, mask)
+    elif choice < 0.7:
+        manager.create_connection(*rng.sample(names, 2))
+    elif choice < 0.9 and manager.links:
+        manager.remove_connection(*rng.choice(list(manager.connections)))
+    else:
+        manager.remove_device(rng.choice(names))
+
+
+def check(manager):
+    devices = list(manager.devices)
+    problems = []
+    for source in devices:
+        reached = transit_reach(source)
+        for dest in devices:
+            expected = source.in_same_network(dest) or dest in reached
+            if manager.can_reach(source.name, dest.name) != expected:
+                problems.append(f"can_reach({source.name}, {dest.name}) != {expected}")
+            if (manager.find_path(source.name, dest.name, "bfs") is not None) != expected:
+                problems.append(f"find_path({source.name}, {dest.name}) != {expected}")
+    components = sorted(sorted(group) for group in manager.components())
+    if components != brute_components(devices):
+        problems.append(f"components: {components} != {brute_components(devices)}")
+    articulation = manager.articulation_routers()
+    if articulation != brute_articulation(devices):
+        problems.append(f"articulation_routers: {articulation} != {brute_articulation(devices)}")
+    isolated = sorted(parse_subnet(text) for text in manager.isolated_subnets())
+    if isolated != brute_isolated(manager):
+        problems.append(f"isolated_subnets: {isolated} != {brute_isolated(manager)}")
+    return problems
+
+
+def main(argv):
+    networks = int(argv[0]) if argv else DEFAULT_NETWORKS
+    seed = int(argv[1]) if len(argv) > 1 else 0
+    for network in range(networks):
+        rng = random.Random(seed * 1_000_003 + network)
+        manager = NetworkManager()
+        counter = [0]
+        for step in range(STEPS):
+            edit(manager, rng, counter)
+            problems = check(manager)
+            if problems:
+                print(f"rede {network}, passo {step}:")
+                for problem in problems[:10]:
+                    print("  " + problem)
+                print("  enlaces: " + ", ".join(f"{a}-{b}" for a, b in manager.connections))
+                return 1
+    print(f"{networks} redes x {STEPS} edições: ok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,154 @@
+# Conferência das tabelas de encaminhamento (strategy="fib") contra a tabela
+# de rotas. Em redes aleatórias pequenas, com sequências de edições, a cada
+# passo:
+#   - fib acha caminho exatamente quando a tabela de rotas acha, e o caminho
+#     é válido (enlaces existentes, só roteadores no meio, ou a mesma rede);
+#   - com todas as máscaras iguais, os dois caminhos têm o mesmo número de saltos;
+#   - a rota de cada roteador para o endereço de um dispositivo ligado a algum
+#     roteador leva a um prefixo cuja origem está ligada a ele (o mesmo
+#     route() que python -m backend.fib --lookup usa);
+#   - as colunas de distância mantidas incrementalmente são iguais a uma
+#     inundação feita do zero.
+# Inclui casos fixos de máscaras misturadas. Termina com código 1 na primeira
+# divergência.
+#
+# Uso: python -m benchmarks.check_forwarding [redes] [semente]
+import random
+import sys
+
+from backend.network_manager import NetworkManager
+
+DEFAULT_NETWORKS = 300
+STEPS = 30
+MASKS = ("255.255.0.0", "255.255.255.0", "255.255.255.240")
+
+
+def overlapping_gateways():
+    # O PC s tem dois roteadores; 10.0.0.0/16 de R1 contém o endereço de d,
+    # mas d está em 10.0.5.0/24, atrás de R2
+    manager = NetworkManager()
+    manager.add_device("s", "192.168.1.2", "pc", 0, 0, "255.255.255.0")
+    manager.add_device("R1", "10.0.0.1", "roteador", 0, 0, "255.255.0.0")
+    manager.add_device("R2", "172.16.0.1", "roteador", 0, 0, "255.255.255.0")
+    manager.add_device("d", "10.0.5.5", "pc", 0, 0, "255.255.255.0")
+    for a, b in (("s", "R1"), ("s", "R2"), ("R2", "d")):
+        manager.create_connection(a, b)
+    return manager
+
+
+def overlapping_transit():
+    # R1 anuncia 10.0.0.0/16 e fica no caminho de X até d (10.0.5.5/24, atrás
+    # de R3); o prefixo mais longo que chega a d é o /24
+    manager = NetworkManager()
+    manager.add_device("X", "172.16.0.1", "roteador", 0, 0, "255.255.255.0")
+    manager.add_device("R1", "10.0.0.1", "roteador", 0, 0, "255.255.0.0")
+    manager.add_device("R2", "172.16.1.1", "roteador", 0, 0, "255.255.255.0")
+    manager.add_device("R3", "172.16.2.1", "roteador", 0, 0, "255.255.255.0")
+    manager.add_device("d", "10.0.5.5", "pc", 0, 0, "255.255.255.0")
+    manager.add_device("e", "10.0.5.9", "pc", 0, 0, "255.255.255.240")
+    for a, b in (("X", "R1"), ("R1", "R2"), ("R2", "R3"), ("R3", "d"), ("R1", "e")):
+        manager.create_connection(a, b)
+    return manager
+
+
+FIXED = {"overlapping_gateways": overlapping_gateways, "overlapping_transit": overlapping_transit}
+
+
+def valid(manager, path, source, dest):
+    if path[0] != source or path[-1] != dest:
+        return False
+    devices = [manager.get_device(name) for name in path]
+    if len(devices) == 2 and devices[0].in_same_network(devices[1]):
+        return True  # mesma rede: entrega direta, como em find_path
+    if any(b not in a.connections for a, b in zip(devices, devices[1:])):
+        return False
+    return all(device.device_type == "roteador" for device in devices[1:-1])
+
+
+def names(path):
+    return None if path is None else [device.name for device in path]
+
+
+def check(manager, uniform):
+    problems = []
+    for source in manager.devices_by_name:
+        for dest in manager.devices_by_name:
+            if dest == source:
+                continue
+            table = names(manager.find_path(source, dest))
+            fib = names(manager.find_path(source, dest, "fib"))
+            if (table is None) != (fib is None):
+                problems.append(f"{source} -> {dest}: tabela {table}, fib {fib}")
+            elif fib is not None and not valid(manager, fib, source, dest):
+                problems.append(f"{source} -> {dest}: caminho inválido {fib}")
+            elif uniform and fib is not None and len(fib) != len(table):
+                problems.append(f"{source} -> {dest}: tabela {table}, fib {fib}")
+    tables = manager.fib
+    routers = list(tables.slot)
+    for device in manager.devices:
+        if device.device_type != "roteador" and not any(n.device_type == "roteador" for n in device.connections):
+            continue
+        for router in routers:
+            found = tables.route(router, device.ip_int)
+            if found and not any(origin is device or device in origin.connections
+                                 for origin in (tables.routers[i] for i in tables.origins[found[0]])):
+                problems.append(f"{router.name} -> {device.ip}: prefixo {found[0]} não entrega")
+    tables._refresh()
+    for key, column in list(tables.columns.items()):
+        if list(tables._fit(column)) != list(tables._flood(tables.origins[key])):
+            problems.append(f"coluna {key} diferente de uma inundação do zero")
+    return problems
+
+
+def edit(manager, rng, counter, uniform):
+    names = list(manager.devices_by_name)
+    choice = rng.random()
+    if choice < 0.3 or len(names) < 3:
+        i = counter[0]
+        counter[0] += 1
+        mask = MASKS[1] if uniform else rng.choice(MASKS)
+        ip = f"10.0.{rng.randrange(4)}.{i + 1}"
+        device_type = "roteador" if rng.random() < 0.5 else "pc"
+        manager.add_device(f"d{i}", ip, device_type, 0, 0, mask)
+    elif choice < 0.75:
+        manager.create_connection(*rng.sample(names, 2))
+    elif choice < 0.9 and manager.links:
+        manager.remove_connection(*rng.choice(list(manager.connections)))
+    else:
+        manager.remove_device(rng.choice(names))
+
+
+def report(label, problems, manager):
+    print(f"{label}:")
+    for problem in problems[:10]:
+        print("  " + problem)
+    print("  enlaces: " + ", ".join(f"{a}-{b}" for a, b in manager.connections))
+
+
+def main(argv):
+    networks = int(argv[0]) if argv else DEFAULT_NETWORKS
+    seed = int(argv[1]) if len(argv) > 1 else 0
+    for label, build in FIXED.items():
+        manager = build()
+        problems = check(manager, uniform=False)
+        if problems:
+            report(label, problems, manager)
+            return 1
+    for network in range(networks):
+        rng = random.Random(seed * 1_000_003 + network)
+        uniform = network % 2 == 0
+        manager = NetworkManager()
+        manager.fib.max_columns = 8  # força o descarte de colunas
+        counter = [0]
+        for step in range(STEPS):
+            edit(manager, rng, counter, uniform)
+            problems = check(manager, uniform)
+            if problems:
+                report(f"rede {network}, passo {step}", problems, manager)
+                return 1
+    print(f"{len(FIXED)} casos fixos e {networks} redes x {STEPS} edições: ok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
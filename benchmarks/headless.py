@@ -0,0 +1,88 @@
+# Interface sem tela para benchmarks: um canvas que só guarda os itens e conta
+# as chamadas, e uma raiz que acumula os callbacks de after_idle. Permite medir
+# render_view, pan e zoom do NetworkSimulatorUI sem Tk nem display.
+from itertools import count
+
+from frontend.simulator import NetworkSimulatorUI
+
+
+class HeadlessCanvas:
+    def __init__(self, width=900, height=650):
+        self.width = width
+        self.height = height
+        self.items = {}  # id -> coordenadas
+        self.calls = 0
+        self._ids = count(1)
+
+    def _create(self, *coords, **options):
+        self.calls += 1
+        item = next(self._ids)
+        self.items[item] = list(coords)
+        return item
+
+    create_image = create_text = create_line = create_oval = create_rectangle = _create
+
+    def coords(self, item, *coords):
+        self.calls += 1
+        if coords:
+            self.items[item] = list(coords)
+        return self.items[item]
+
+    def itemconfigure(self, item, **options):
+        self.calls += 1
+
+    def delete(self, *items):
+        self.calls += 1
+        for item in items:
+            if item == "all":
+                self.items.clear()
+            else:
+                self.items.pop(item, None)
+
+    def move(self, tag, dx, dy):
+        self.calls += 1
+        for coords in self.items.values():
+            coords[0::2] = [x + dx for x in coords[0::2]]
+            coords[1::2] = [y + dy for y in coords[1::2]]
+
+    def tag_bind(self, *args):
+        pass
+
+    def tag_lower(self, *args):
+        pass
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+
+class HeadlessRoot:
+    def __init__(self):
+        self.idle = []
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def after(self, ms, callback):
+        pass
+
+    def flush(self):
+        # Equivale a deixar o loop do Tk processar as tarefas ociosas
+        while self.idle:
+            self.idle.pop(0)()
+
+
+class HeadlessSprites:
+    def get(self, kind, size):
+        return f"{kind}:{int(size)}"
+
+
+def headless_ui(manager):
+    ui = NetworkSimulatorUI.__new__(NetworkSimulatorUI)
+    ui.root = HeadlessRoot()
+    ui.init_state(manager)
+    ui.canvas = HeadlessCanvas()
+    ui.sprites = HeadlessSprites()
+    return ui
@@ -0,0 +1,268 @@
+# Suíte de benchmarks reprodutível: gera topologias sintéticas (com semente)
+# em várias escalas e mede os caminhos quentes — find_path (inclusive pelas
+# tabelas de encaminhamento dos roteadores), inclusão/remoção
+# de dispositivos, troca de conexões, salvar/carregar, salvamento incremental
+# e renderização sem tela.
+# O resultado sai em JSON para comparar execuções e pegar regressões.
+#
+# Uso:
+#   python -m benchmarks.suite --scales 1000,10000 --output resultados.json
+#   python -m benchmarks.suite --compare resultados.json --tolerance 0.3
+#
+# Com --compare, termina com código 1 se algum benchmark ficar mais lento que
+# a referência além da tolerância (tempo por operação).
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from backend.generators import TOPOLOGIES, generate
+from backend.journal import Journal
+from backend.network_manager import NetworkManager
+
+try:
+    # A renderização sem tela ainda importa tkinter e Pillow
+    from benchmarks.headless import headless_ui
+except ImportError:
+    headless_ui = None
+
+DEFAULT_SCALES = (1000, 10000)
+PAIRS = 200  # pares por benchmark de find_path
+SLOW_PAIRS = 20  # pares para as buscas sem cache (bfs, bidirecional, custo)
+CHURN = 200  # operações por benchmark de inclusão/remoção
+
+
+def routers(manager):
+    return [device.name for device in manager.devices if device.device_type == "roteador"]
+
+
+def sample_pairs(manager, count, rng):
+    names = [device.name for device in manager.devices]
+    return [(rng.choice(names), rng.choice(names)) for _ in range(count)]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+# Cada benchmark recebe o NetworkManager e um random.Random e devolve
+# (operações, segundos), medindo só a parte que interessa.
+
+def bench_find_path_cold(manager, rng):
+    pairs = sample_pairs(manager, PAIRS, rng)
+    manager.routes.clear()
+    return len(pairs), timed(lambda: [manager.find_path(s, d) for s, d in pairs])
+
+
+def bench_find_path_warm(manager, rng):
+    pairs = sample_pairs(manager, PAIRS, rng)
+    for s, d in pairs:
+        manager.find_path(s, d)
+    repeat = 50
+    return len(pairs) * repeat, timed(lambda: [manager.find_path(s, d) for _ in range(repeat) for s, d in pairs])
+
+
+def _find_path_strategy(strategy):
+    def bench(manager, rng):
+        pairs = sample_pairs(manager, SLOW_PAIRS, rng)
+        manager.snapshot()
+        return len(pairs), timed(lambda: [manager.find_path(s, d, strategy) for s, d in pairs])
+    return bench
+
+
+def bench_find_path_fib(manager, rng):
+    # Encaminhamento salto a salto com as colunas de distância já calculadas:
+    # o custo é uma consulta ao trie por roteador do caminho
+    pairs = sample_pairs(manager, PAIRS, rng)
+    for s, d in pairs:
+        manager.find_path(s, d, "fib")
+    repeat = 5
+    return len(pairs) * repeat, timed(lambda: [manager.find_path(s, d, "fib") for _ in range(repeat) for s, d in pairs])
+
+
+def bench_device_churn(manager, rng):
+    # Inclui CHURN dispositivos ligados a roteadores e remove todos de novo
+    targets = [rng.choice(routers(manager)) for _ in range(CHURN)]
+    start = time.perf_counter()
+    for i, target in enumerate(targets):
+        name = f"bench{i}"
+        manager.add_device(name, (192 << 24) + (168 << 16) + i, "pc", 0, 0)
+        manager.create_connection(name, target)
+    for i in range(CHURN):
+        manager.remove_device(f"bench{i}")
+    return 2 * CHURN, time.perf_counter() - start
+
+
+def bench_connection_churn(manager, rng):
+    # Remove e recria enlaces entre roteadores com a tabela de rotas aquecida,
+    # então o custo inclui a invalidação incremental
+    links = [key for key in manager.links if key[0].startswith("r") and key[1].startswith("r")]
+    chosen = rng.sample(links, min(CHURN, len(links)))
+    for s, d in sample_pairs(manager, PAIRS, rng):
+        manager.find_path(s, d)
+    start = time.perf_counter()
+    for name1, name2 in chosen:
+        attributes = manager.link_attributes(name1, name2)
+        manager.remove_connection(name1, name2)
+        manager.create_connection(name1, name2, attributes.cost, attributes.capacity)
+    return 2 * len(chosen), time.perf_counter() - start
+
+
+def _save_load(extension):
+    def bench(manager, rng):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, f"rede{extension}")
+            save = timed(manager.save_to_file, filename)
+            load = timed(NetworkManager().load_from_file, filename)
+        return len(manager.devices), save + load
+    return bench
+
+
+def bench_autosave(manager, rng):
+    # Salvamento incremental: CHURN enlaces criados e desfeitos pelo registro e
+    # gravados no log. O tempo não deve crescer com o tamanho da rede.
+    names = routers(manager)
+    with tempfile.TemporaryDirectory() as directory:
+        journal = Journal(manager)
+        journal.save_as(os.path.join(directory, "rede.json"))
+        for _ in range(CHURN // 2):
+            if journal.create_connection(rng.choice(names), rng.choice(names)):
+                journal.undo()
+        ops = len(journal.pending)
+        return ops, timed(journal.save)
+
+
+def bench_render(manager, rng):
+    # Abre a rede enquadrada, faz 20 quadros de pan e aproxima o zoom até o detalhe
+    ui = headless_ui(manager)
+    start = time.perf_counter()
+    ui.redraw()
+    ui.fit_view()
+    ui.root.flush()
+    ui.on_pan_start(_Event(0, 0))
+    for k in range(1, 21):
+        ui.on_pan(_Event(-10 * k, 0))
+        ui.root.flush()
+    for _ in range(15):
+        ui.zoom_at(450, 325, 1.25)
+        ui.root.flush()
+    return 1 + 20 + 15, time.perf_counter() - start
+
+
+class _Event:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+BENCHMARKS = {
+    "find_path_cold": bench_find_path_cold,
+    "find_path_warm": bench_find_path_warm,
+    "find_path_bfs": _find_path_strategy("bfs"),
+    "find_path_bidirectional": _find_path_strategy("bidirectional"),
+    "find_path_cost": _find_path_strategy("cost"),
+    "find_path_fib": bench_find_path_fib,
+    "device_churn": bench_device_churn,
+    "connection_churn": bench_connection_churn,
+    "save_load_json": _save_load(".json"),
+    "save_load_pnet": _save_load(".pnet"),
+    "autosave": bench_autosave,
+    "render": bench_render,
+}
+
+
+def run(scales, topology="grid", seed=0, repeat=3, only=None, log=sys.stderr):
+    results = []
+    for scale in scales:
+        start = time.perf_counter()
+        manager = generate(topology, scale, seed=seed, pcs=1)
+        build = time.perf_counter() - start
+        results.append(_result("generate", scale, manager, len(manager.devices), build))
+        print(f"[{topology} {scale}] generate: {build:.2f}s", file=log)
+        for name, bench in BENCHMARKS.items():
+            if (only and name not in only) or (name == "render" and headless_ui is None):
+                continue
+            # Melhor de `repeat` execuções, com a mesma semente em todas
+            best = None
+            for _ in range(repeat):
+                ops, seconds = bench(manager, random.Random(seed))
+                if best is None or seconds < best[1]:
+                    best = (ops, seconds)
+            results.append(_result(name, scale, manager, *best))
+            print(f"[{topology} {scale}] {name}: {best[1]:.4f}s / {best[0]} ops", file=log)
+    return results
+
+
+def _result(name, scale, manager, ops, seconds):
+    return {"benchmark": name, "scale": scale, "devices": len(manager.devices),
+            "links": len(manager.links), "ops": ops, "seconds": seconds,
+            "per_op_us": seconds / ops * 1e6 if ops else None}
+
+
+def compare(results, baseline, tolerance):
+    # Lista os benchmarks cujo tempo por operação piorou além da tolerância
+    reference = {(item["benchmark"], item["scale"]): item for item in baseline["results"]}
+    regressions = []
+    for item in results:
+        old = reference.get((item["benchmark"], item["scale"]))
+        if not old or not old["per_op_us"] or item["per_op_us"] is None:
+            continue
+        ratio = item["per_op_us"] / old["per_op_us"]
+        if ratio > 1 + tolerance:
+            regressions.append({"benchmark": item["benchmark"], "scale": item["scale"],
+                                "before_us": old["per_op_us"], "after_us": item["per_op_us"],
+                                "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)),
+                        help="número de roteadores de cada escala, separados por vírgula")
+    parser.add_argument("--topology", choices=list(TOPOLOGIES), default="grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por benchmark (vale a melhor)")
+    parser.add_argument("--only", help="benchmarks a rodar, separados por vírgula")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", metavar="REFERENCIA", help="resultado anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="piora relativa aceita no --compare (padrão: 0.25)")
+    args = parser.parse_args(argv)
+
+    scales = [int(value) for value in args.scales.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+    results = run(scales, args.topology, args.seed, args.repeat, only)
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "topology": args.topology, "seed": args.seed, "repeat": args.repeat,
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+        for item in report["regressions"]:
+            print(f"REGRESSÃO {item['benchmark']} ({item['scale']}): "
+                  f"{item['before_us']:.1f} -> {item['after_us']:.1f} µs/op ({item['ratio']:.2f}x)",
+                  file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        json.dump(report, out, indent=2)
+        out.write("\n")
+    finally:
+        if args.output:
+            out.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import queue
+from collections import deque
+
+from backend import metrics
+
+
+class PacketAnimator:
+    # Anima pacotes no loop principal do Tk com root.after: a cada quadro todos
+    # os pacotes em trânsito avançam um passo. Outras threads só conversam com
+    # o animador pela fila (submit/post); nenhuma chamada ao Tk sai daqui.
+
+    def __init__(self, root, canvas, image, center, frame_ms=20, idle_ms=100,
+                 steps_per_hop=20, spacing=25, max_in_flight=500, max_spawn_per_frame=50):
+        self.root = root
+        self.canvas = canvas
+        self.image = image
+        self.center = center  # função dispositivo -> (x, y) do centro na tela
+        self.frame_ms = frame_ms
+        self.idle_ms = idle_ms
+        self.steps_per_hop = steps_per_hop
+        self.spacing = spacing  # quadros entre pacotes do mesmo lote
+        self.max_in_flight = max_in_flight
+        self.max_spawn_per_frame = max_spawn_per_frame
+        self.inbox = queue.Queue()
+        self.pending = deque()  # (quadro de saída, caminho)
+        self.in_flight = []  # [id no canvas, caminho, salto atual, passo]
+        self.frame = 0
+        self.root.after(self.idle_ms, self._tick)
+
+    def submit(self, paths):
+        # Pode ser chamado de qualquer thread
+        self.inbox.put(("paths", list(paths)))
+
+    def post(self, callback, *args):
+        # Executa callback(*args) na thread do Tk no próximo quadro
+        self.inbox.put(("call", (callback, args)))
+
+    @property
+    def busy(self):
+        return bool(self.pending or self.in_flight)
+
+    def _drain_inbox(self):
+        # A última saída agendada, para o novo lote entrar depois dela
+        release = max(self.frame, self.pending[-1][0] + self.spacing) if self.pending else self.frame
+        while True:
+            try:
+                kind, payload = self.inbox.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "call":
+                callback, args = payload
+                callback(*args)
+                continue
+            for path in payload:
+                if len(path) > 1:
+                    self.pending.append((release, path))
+                    release += self.spacing
+
+    def _spawn(self):
+        spawned = 0
+        while (self.pending and self.pending[0][0] <= self.frame
+               and len(self.in_flight) < self.max_in_flight and spawned < self.max_spawn_per_frame):
+            _, path = self.pending.popleft()
+            x, y = self.center(path[0])
+            item = self.canvas.create_image(x, y, image=self.image)
+            self.in_flight.append([item, path, 0, 0])
+            spawned += 1
+
+    def _advance(self):
+        steps = self.steps_per_hop
+        still_flying = []
+        for sprite in self.in_flight:
+            item, path, hop, step = sprite
+            step += 1
+            if step == steps:
+                hop += 1
+                step = 0
+                if hop == len(path) - 1:
+                    self.canvas.delete(item)
+                    continue
+            # Usa as posições atuais: arrastar um dispositivo durante a animação funciona
+            x1, y1 = self.center(path[hop])
+            x2, y2 = self.center(path[hop + 1])
+            t = step / steps
+            self.canvas.coords(item, x1 + (x2 - x1) * t, y1 + (y2 - y1) * t)
+            sprite[2] = hop
+            sprite[3] = step
+            still_flying.append(sprite)
+        self.in_flight = still_flying
+
+    @metrics.timed("ui_update_seconds", op="animation_frame")
+    def _tick(self):
+        self._drain_inbox()
+        self._spawn()
+        self._advance()
+        self.frame += 1
+        self.root.after(self.frame_ms if self.busy else self.idle_ms, self._tick)
+
+    def clear(self):
+        for sprite in self.in_flight:
+            self.canvas.delete(sprite[0])
+        self.in_flight = []
+        self.pending.clear()
@@ -0,0 +1,173 @@
+import math
+from collections import deque
+
+from backend import metrics
+
+LINK_COLOR = "#2980b9"
+
+
+def _gradient(colors, steps):
+    # steps cores interpoladas entre as cores dadas ("#rrggbb")
+    rgb = [tuple(int(color[i:i + 2], 16) for i in (1, 3, 5)) for color in colors]
+    result = []
+    for k in range(steps):
+        t = k / (steps - 1) * (len(rgb) - 1)
+        i = min(int(t), len(rgb) - 2)
+        f = t - i
+        result.append("#%02x%02x%02x" % tuple(round(a + (b - a) * f) for a, b in zip(rgb[i], rgb[i + 1])))
+    return result
+
+
+# Verde (pouco uso) -> amarelo -> vermelho (enlace saturado)
+HEAT_COLORS = _gradient(["#2ecc71", "#f1c40f", "#e74c3c"], 8)
+
+
+class HeatmapPlayer:
+    # Reproduz um TrafficMonitor como mapa de calor: a cada quadro entram as
+    # próximas janelas da simulação e as somas da janela deslizante são
+    # atualizadas só com o que entrou e saiu. As linhas já desenhadas em
+    # `lines` mudam de cor e espessura conforme a utilização, e os roteadores
+    # com fila ganham um marcador. O custo do quadro depende dos enlaces, não
+    # do número de pacotes.
+
+    def __init__(self, root, canvas, lines, widgets, center, line_width,
+                 frame_ms=50, span=10, max_frames=300):
+        self.root = root
+        self.canvas = canvas
+        self.lines = lines  # enlace -> id da linha (o dicionário da interface)
+        self.widgets = widgets  # nome -> item do dispositivo, para saber o que está visível
+        self.center = center  # função nome -> (x, y) do centro na tela
+        self.line_width = line_width  # função que retorna a espessura normal das linhas
+        self.frame_ms = frame_ms
+        self.span = span  # quadros somados na janela deslizante
+        self.max_frames = max_frames  # duração máxima da reprodução, em quadros
+        self.active = False
+        self.playing = False
+        self.monitor = None
+        self.bandwidth = None  # função enlace -> bits/s da simulação reproduzida
+        self.queue_limit = 1
+        self.step = 1  # janelas do monitor por quadro
+        self.position = 0  # próxima janela a entrar
+        self.window = deque()  # quadros dentro da janela deslizante
+        self.link_bits = {}  # enlace -> bits na janela
+        self.router_packets = {}  # roteador -> pacotes encaminhados na janela
+        self.queues = {}  # roteador -> maior fila no quadro atual
+        self.styled = {}  # id da linha -> nível de calor aplicado
+        self.badges = {}  # roteador -> id do marcador de fila
+
+    def start(self):
+        self.active = True
+
+    def stop(self):
+        # Desliga o modo e devolve as linhas ao estilo normal
+        self.active = False
+        self.playing = False
+        width = self.line_width()
+        for line, level in self.styled.items():
+            if level:
+                self.canvas.itemconfigure(line, fill=LINK_COLOR, width=width)
+        self.styled = {}
+        if self.badges:
+            self.canvas.delete(*self.badges.values())
+            self.badges = {}
+        self.monitor = None
+        self._reset()
+
+    def _reset(self):
+        self.window.clear()
+        self.link_bits = {}
+        self.router_packets = {}
+        self.queues = {}
+
+    def play(self, monitor, bandwidth, queue_limit):
+        # Começa a reproduzir uma simulação (chamado na thread do Tk)
+        if not self.active or not monitor.windows:
+            return
+        self.monitor = monitor
+        self.bandwidth = bandwidth
+        self.queue_limit = queue_limit
+        self.step = math.ceil(monitor.windows / self.max_frames)
+        self.position = monitor.first
+        self._reset()
+        if not self.playing:
+            self.playing = True
+            self.root.after(self.frame_ms, self._tick)
+
+    @metrics.timed("ui_update_seconds", op="heatmap_frame")
+    def _tick(self):
+        if not self.playing:
+            return
+        frame = self.monitor.frame(self.position, self.position + self.step)
+        self.position += self.step
+        self._add(frame, 1)
+        self.window.append(frame)
+        if len(self.window) > self.span:
+            self._add(self.window.popleft(), -1)
+        self.queues = frame[2]
+        self.paint()
+        if self.position <= self.monitor.last:
+            self.root.after(self.frame_ms, self._tick)
+        else:
+            self.playing = False  # o último quadro continua na tela
+
+    def _add(self, frame, sign):
+        links, routers, _ = frame
+        for totals, values in ((self.link_bits, links), (self.router_packets, routers)):
+            for key, value in values.items():
+                value = totals.get(key, 0) + sign * value
+                if value:
+                    totals[key] = value
+                else:
+                    del totals[key]
+
+    def level(self, key, seconds):
+        # 0 (sem tráfego) a len(HEAT_COLORS), pela fração da banda usada
+        bits = self.link_bits.get(key)
+        if not bits:
+            return 0
+        utilization = bits / (self.bandwidth(key) * seconds)
+        return max(1, min(len(HEAT_COLORS), math.ceil(utilization * len(HEAT_COLORS))))
+
+    def paint(self):
+        # Aplica o estado atual às linhas e marcadores visíveis; também é
+        # chamado depois de cada renderização, para as linhas recém-criadas
+        if not self.active or self.monitor is None:
+            return
+        seconds = len(self.window) * self.step * self.monitor.window
+        width = self.line_width()
+        styled = {}
+        for key, line in self.lines.items():
+            level = self.level(key, seconds) if seconds else 0
+            if self.styled.get(line, 0) != level:
+                if level:
+                    self.canvas.itemconfigure(line, fill=HEAT_COLORS[level - 1],
+                                              width=width + level * 4 // len(HEAT_COLORS))
+                else:
+                    self.canvas.itemconfigure(line, fill=LINK_COLOR, width=width)
+            if level:
+                styled[line] = level
+        self.styled = styled
+        self.paint_badges()
+
+    def paint_badges(self):
+        badges = {}
+        for name, depth in self.queues.items():
+            if depth <= 0 or name not in self.widgets:
+                continue
+            x, y = self.center(name)
+            color = "#c0392b" if depth * 4 >= self.queue_limit * 3 else "#d35400"
+            item = self.badges.pop(name, None)
+            if item is None:
+                item = self.canvas.create_text(x, y - 22, text=str(depth), fill=color,
+                                               font=("Segoe UI", 9, "bold"))
+            else:
+                self.canvas.coords(item, x, y - 22)
+                self.canvas.itemconfigure(item, text=str(depth), fill=color)
+            badges[name] = item
+        if self.badges:
+            self.canvas.delete(*self.badges.values())
+        self.badges = badges
+
+    def busiest(self, count=3):
+        # Roteadores que mais encaminharam pacotes na janela atual
+        return sorted(self.router_packets.items(), key=lambda item: -item[1])[:count]
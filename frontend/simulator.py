@@ -1,130 +1,31 @@
-import json
 import os
 import tkinter as tk
 from tkinter import simpledialog, messagebox, ttk
 from PIL import Image, ImageTk
 import ipaddress
+import math
 import threading
-import time
+from backend import metrics
+from backend.journal import Journal
 from backend.network_manager import NetworkManager
+from backend.addressing import DEFAULT_NETMASK, prefix_length
+from backend.layout import ForceLayout, iterations_for, neighborhood
+from backend.simulation import EventRecorder, Simulator
+from backend.traffic import TrafficMonitor
+from frontend.animation import PacketAnimator
+from frontend.heatmap import LINK_COLOR, HeatmapPlayer
+from frontend.spatial import GridIndex
+from frontend.sprites import SpriteCache
+
+DEVICE_COLORS = {"roteador": "#e67e22", "pc": "#2c3e50"}
+NETWORKS_DIR = "saved_networks"
+# Sessão ainda sem nome: as edições vão para o log deste arquivo
+AUTOSAVE_FILE = os.path.join(NETWORKS_DIR, "autosave.json")
 
-# --- MODELOS DE DADOS ---
-
-class Device:
-    def __init__(self, name, ip_str, device_type, x, y):
-        self.name = name
-        self.ip = ipaddress.IPv4Address(ip_str)
-        self.device_type = device_type  # "pc", "roteador", etc
-        self.x = x
-        self.y = y
-        self.connections = []  # lista de dispositivos conectados diretamente
-
-    def add_connection(self, other_device):
-        if other_device not in self.connections:
-            self.connections.append(other_device)
-
-    def remove_connection(self, other_device):
-        if other_device in self.connections:
-            self.connections.remove(other_device)
-
-    def in_same_network(self, other, netmask="255.255.255.0"):
-        network1 = ipaddress.IPv4Network(f"{self.ip}/{netmask}", strict=False)
-        network2 = ipaddress.IPv4Network(f"{other.ip}/{netmask}", strict=False)
-        return network1.network_address == network2.network_address
-
-class Packet:
-    def __init__(self, source, destination):
-        self.source = source
-        self.destination = destination
-        self.path = []
-        self.current_index = 0
-
-    def next_hop(self):
-        if self.current_index < len(self.path) - 1:
-            self.current_index += 1
-            return self.path[self.current_index]
-        return None
-
-class NetworkManager:
-    def __init__(self):
-        self.devices = []
-        self.connections = []  # tuples (device1_name, device2_name)
-
-    def add_device(self, name, ip, device_type, x, y):
-        device_type = device_type.lower()
-        if any(d.name == name for d in self.devices):
-            raise ValueError("Nome já existe")
-        device = Device(name, ip, device_type, x, y)
-        self.devices.append(device)
-        return device
-
-    def remove_device(self, name):
-        device = self.get_device(name)
-        if device:
-            self.devices.remove(device)
-            # Remove conexões relacionadas
-            self.connections = [c for c in self.connections if name not in c]
-            for d in self.devices:
-                d.remove_connection(device)
-
-    def get_device(self, name):
-        for d in self.devices:
-            if d.name == name:
-                return d
-        return None
-
-    def create_connection(self, name1, name2):
-        if name1 == name2:
-            return
-        d1 = self.get_device(name1)
-        d2 = self.get_device(name2)
-        if d1 and d2 and (name1, name2) not in self.connections and (name2, name1) not in self.connections:
-            self.connections.append((name1, name2))
-            d1.add_connection(d2)
-            d2.add_connection(d1)
-
-    def remove_connection(self, name1, name2):
-        if (name1, name2) in self.connections:
-            self.connections.remove((name1, name2))
-        elif (name2, name1) in self.connections:
-            self.connections.remove((name2, name1))
-        d1 = self.get_device(name1)
-        d2 = self.get_device(name2)
-        if d1 and d2:
-            d1.remove_connection(d2)
-            d2.remove_connection(d1)
-
-    def find_path(self, source_name, destination_name):
-        # BFS para achar caminho respeitando conexões e roteadores
-        source = self.get_device(source_name)
-        dest = self.get_device(destination_name)
-        if not source or not dest:
-            return None
-
-        # Se estiverem na mesma rede, caminho direto
-        if source.in_same_network(dest):
-            return [source, dest]
-
-        # Se não, deve passar por roteadores
-        # BFS para achar caminho no grafo de conexões
-        from collections import deque
-        queue = deque()
-        queue.append([source])
-        visited = set()
-        visited.add(source)
-
-        while queue:
-            path = queue.popleft()
-            last = path[-1]
-            if last == dest:
-                return path
-            for neighbor in last.connections:
-                if neighbor not in visited:
-                    # Só passa por roteadores ou destino final
-                    if neighbor.device_type == "roteador" or neighbor == dest:
-                        visited.add(neighbor)
-                        queue.append(path + [neighbor])
-        return None
+
+def ui_timed(op):
+    # Duração de cada atualização do canvas, separada por operação
+    return metrics.timed("ui_update_seconds", "Duração das atualizações da interface", op=op)
 
 # --- INTERFACE GRÁFICA ---
 
@@ -132,24 +33,73 @@ class NetworkSimulatorUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Simulador de Rede")
-        self.manager = NetworkManager()
-        self.selected_device = None
-        self.device_size = 60
-        self.offset = 20
-        self.device_widgets = {}
-        self.connection_lines = {}  # Dicionário para rastrear as linhas de conexão (ordenado tuple de nomes -> id da linha)
-        self.animating_packets = False
-        self.drag_data = {"x": 0, "y": 0, "device": None}
+        self.init_state(NetworkManager())
         self.images = {
-            "pc": ImageTk.PhotoImage(Image.open("assets/pc.png").resize((60, 60))),
-            "roteador": ImageTk.PhotoImage(Image.open("assets/roteador.png").resize((60, 60))),
             "envelope": ImageTk.PhotoImage(Image.open("assets/envelope.png").resize((30, 30))),
         }
+        self.sprites = SpriteCache({"pc": "assets/pc.png", "roteador": "assets/roteador.png"}, default="pc")
 
         # Inicialização do canvas e sidebar movidos para o __init__
-        self.canvas = tk.Canvas(self.root, width=900, height=650, bg="#f9f9f9", scrollregion=(0, 0, 1600, 1200))
+        self.canvas = tk.Canvas(self.root, width=900, height=650, bg="#f9f9f9")
         self.canvas.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda e: self.schedule_render())
+        for button in ("2", "3"):
+            self.canvas.bind(f"<ButtonPress-{button}>", self.on_pan_start)
+            self.canvas.bind(f"<B{button}-Motion>", self.on_pan)
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom_at(e.x, e.y, 1.2 if e.delta > 0 else 1 / 1.2))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom_at(e.x, e.y, 1.2))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom_at(e.x, e.y, 1 / 1.2))
+        self.animator = PacketAnimator(self.root, self.canvas, self.images["envelope"], self.device_center)
+        self.heatmap = HeatmapPlayer(self.root, self.canvas, self.connection_lines, self.device_widgets,
+                                     lambda name: self.device_center(self.manager.get_device(name)),
+                                     self.line_width)
         self.add_sidebar()
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
+        self.recover_session()
+        self.root.after(self.autosave_ms, self.autosave)
+
+    def init_state(self, manager):
+        # Estado da interface que não depende do Tk (também usado nos benchmarks sem tela)
+        self.manager = manager
+        # Registro das edições: salvamento incremental, recuperação e desfazer/refazer
+        self.journal = Journal(manager, indent=2)
+        self.autosave_ms = 5000
+        self.selected_device = None
+        self.device_size = 60
+        self.offset = 20
+        self.device_widgets = {}  # nome -> id da imagem (ou ponto) no canvas
+        self.device_labels = {}  # nome -> id do texto no canvas
+        self.connection_lines = {}  # Dicionário para rastrear as linhas de conexão (ordenado tuple de nomes -> id da linha)
+        self.lod_items = []  # itens agregados (grupos e enlaces resumidos), recriados a cada renderização
+        self.max_animated_packets = 10  # pacotes reproduzidos na tela por envio
+        self.routing = "table"  # estratégia de roteamento dos envios ("fib" = tabelas dos roteadores)
+        self.drag_data = {"x": 0, "y": 0, "device": None, "start": None}
+        self.pan_data = {"x": 0, "y": 0}
+
+        # Visão: coordenadas do mundo no canto superior esquerdo e zoom
+        self.zoom = 1.0
+        self.min_zoom = 0.02
+        self.max_zoom = 4.0
+        self.view_x = 0.0
+        self.view_y = 0.0
+        # Níveis de detalhe
+        self.label_zoom = 0.6  # abaixo disso os nomes não são desenhados
+        self.detail_zoom = 0.35  # abaixo disso dispositivos viram pontos
+        self.max_detail_items = 2000  # dispositivos visíveis com imagem
+        self.max_dot_items = 6000  # acima disso os pontos são agrupados por célula
+        self.max_line_items = 6000  # acima disso as linhas são agregadas
+        self.cluster_cell = 24  # tamanho da célula de agrupamento, em pixels
+        self.render_mode = None
+        self.render_pending = False
+        self.spatial = GridIndex(cell_size=256)
+        self.layout_enabled = False  # depois do primeiro auto-layout, novas conexões relaxam a vizinhança
+        self.layout_running = False
+        self.layout_pending = set()  # dispositivos editados durante um layout, relaxados ao fim dele
+        self.stats_label = None  # painel de métricas sobre o canvas (None quando oculto)
+        self.heatmap = None  # HeatmapPlayer, criado junto com o canvas
+        self.critical_rings = None  # roteador -> anel de destaque (None quando desligado)
+        self.stats_interval_ms = 500
 
     def add_sidebar(self):
         sidebar = tk.Frame(self.root, bg="#2c3e50", width=200)
@@ -163,21 +113,29 @@ class NetworkSimulatorUI:
         tk.Button(sidebar, text="➕ Adicionar", command=self.add_device, **button_style).pack(pady=5)
         tk.Button(sidebar, text="❌ Remover", command=self.remove_device, **button_style).pack(pady=5)
         tk.Button(sidebar, text="🔗 Conectar", command=self.connect_devices, **button_style).pack(pady=5)
+        tk.Button(sidebar, text="↶ Desfazer", command=self.undo, **button_style).pack(pady=5)
+        tk.Button(sidebar, text="↷ Refazer", command=self.redo, **button_style).pack(pady=5)
         tk.Button(sidebar, text="🚀 Enviar Pacotes", command=self.ask_send_packets, **button_style).pack(pady=5)
+        tk.Button(sidebar, text="🌡️ Mapa de calor", command=self.toggle_heatmap, **button_style).pack(pady=5)
         tk.Button(sidebar, text="💾 Salvar", command=self.save_network, **button_style).pack(pady=5)
         tk.Button(sidebar, text="📂 Carregar", command=self.load_network, **button_style).pack(pady=5)
         tk.Button(sidebar, text="🗑️ Excluir arquivo", command=self.delete_network, **button_style).pack(pady=5)
+        tk.Button(sidebar, text="🔍 Ajustar à tela", command=self.fit_view, **button_style).pack(pady=5)
+        tk.Button(sidebar, text="🧭 Auto-layout", command=self.auto_layout, **button_style).pack(pady=5)
+        tk.Button(sidebar, text="🧩 Conectividade", command=self.toggle_connectivity, **button_style).pack(pady=5)
+        tk.Button(sidebar, text="📊 Estatísticas", command=self.toggle_stats, **button_style).pack(pady=5)
 
     def ask_device_info(self):
         popup = tk.Toplevel(self.root)
         popup.title("Adicionar Dispositivo")
-        popup.geometry("350x250")
+        popup.geometry("350x310")
         popup.configure(bg="#f0f2f5")
         popup.resizable(False, False)
         popup.grab_set()
 
         name_var = tk.StringVar()
         ip_var = tk.StringVar()
+        mask_var = tk.StringVar(value=DEFAULT_NETMASK)
         type_var = tk.StringVar(value="PC")
         result = {}
 
@@ -187,9 +145,15 @@ class NetworkSimulatorUI:
             except:
                 messagebox.showerror("Erro", "IP inválido!")
                 return
+            try:
+                prefix_length(mask_var.get())  # valida máscara
+            except ValueError:
+                messagebox.showerror("Erro", "Máscara inválida!")
+                return
             if name_var.get() and ip_var.get() and type_var.get():
                 result["name"] = name_var.get()
                 result["ip"] = ip_var.get()
+                result["netmask"] = mask_var.get()
                 result["type"] = type_var.get().lower()
                 popup.destroy()
             else:
@@ -201,6 +165,9 @@ class NetworkSimulatorUI:
         ttk.Label(popup, text="Endereço IP:", background="#f0f2f5").pack(pady=(0, 5), padx=20, anchor="w")
         ttk.Entry(popup, textvariable=ip_var).pack(pady=(0, 10), padx=20, fill='x')
 
+        ttk.Label(popup, text="Máscara de rede:", background="#f0f2f5").pack(pady=(0, 5), padx=20, anchor="w")
+        ttk.Entry(popup, textvariable=mask_var).pack(pady=(0, 10), padx=20, fill='x')
+
         ttk.Label(popup, text="Tipo de dispositivo:", background="#f0f2f5").pack(pady=(0, 5), padx=20, anchor="w")
         type_options = ["PC", "Roteador"]
         ttk.OptionMenu(popup, type_var, type_options[0], *type_options).pack(pady=(0, 20), padx=20, fill='x')
@@ -213,19 +180,24 @@ class NetworkSimulatorUI:
     def add_device(self):
         data = self.ask_device_info()
         if data:
-            x = self.offset + len(self.manager.devices) * (self.device_size + 20)
-            y = 100
+            if self.layout_enabled:
+                # Com auto-layout, o novo dispositivo aparece no centro da visão
+                width, height = self.viewport_size()
+                x, y = self.to_world(width / 2, height / 2)
+            else:
+                x = self.offset + len(self.manager.devices) * (self.device_size + 20)
+                y = 100
             try:
-                device = self.manager.add_device(data["name"], data["ip"], data["type"], x, y)
-                self.draw_device(device)
+                self.sync_entry(self.journal.add_device(data["name"], data["ip"], data["type"], x, y,
+                                                        data["netmask"]))
             except ValueError as e:
                 messagebox.showerror("Erro", str(e))
 
     def remove_device(self):
         name = simpledialog.askstring("Remover", "Nome do dispositivo a remover:")
-        if name:
-            self.manager.remove_device(name)
-            self.redraw()
+        entry = self.journal.remove_device(name) if name else None
+        if entry:
+            self.sync_entry(entry)
 
     def connect_devices(self):
         # Seleciona dois dispositivos para conectar
@@ -252,8 +224,13 @@ class NetworkSimulatorUI:
             src = src_var.get()
             dst = dst_var.get()
             if src != dst:
-                self.manager.create_connection(src, dst)
-                self.redraw()
+                self.journal.create_connection(src, dst)
+                if src in self.device_widgets or dst in self.device_widgets:
+                    self.draw_connection(src, dst)
+                else:
+                    self.schedule_render()
+                if self.layout_enabled:
+                    self.relax_layout([src, dst])
             popup.destroy()
 
         ttk.Button(popup, text="Conectar", command=confirm).pack(pady=20)
@@ -268,13 +245,14 @@ class NetworkSimulatorUI:
 
         popup = tk.Toplevel(self.root)
         popup.title("Enviar Pacotes")
-        popup.geometry("300x250")
+        popup.geometry("300x280")
         popup.grab_set()
         popup.resizable(False, False)
 
         src_var = tk.StringVar(value=devices_names[0])
         dst_var = tk.StringVar(value=devices_names[1])
         qtd_var = tk.IntVar(value=1)
+        fib_var = tk.BooleanVar(value=self.routing == "fib")
 
         ttk.Label(popup, text="Origem:").pack(pady=5)
         ttk.OptionMenu(popup, src_var, devices_names[0], *devices_names).pack()
@@ -285,12 +263,15 @@ class NetworkSimulatorUI:
         ttk.Label(popup, text="Quantidade de pacotes:").pack(pady=5)
         ttk.Entry(popup, textvariable=qtd_var).pack()
 
+        ttk.Checkbutton(popup, text="Rotear pelas tabelas dos roteadores", variable=fib_var).pack(pady=(10, 0))
+
         def confirm():
             src = src_var.get()
             dst = dst_var.get()
             qtd = qtd_var.get()
+            self.routing = "fib" if fib_var.get() else "table"
             if src and dst and src != dst and qtd > 0:
-                threading.Thread(target=self.send_packets, args=(src, dst, qtd), daemon=True).start()
+                self.send_packets(src, dst, qtd)
             popup.destroy()
 
         ttk.Button(popup, text="Enviar", command=confirm).pack(pady=20)
@@ -298,60 +279,55 @@ class NetworkSimulatorUI:
         popup.wait_window()
 
     def send_packets(self, src_name, dst_name, qtd):
-        for _ in range(qtd):
-            path = self.manager.find_path(src_name, dst_name)
-            if not path:
+        # O caminho é resolvido aqui, na thread do Tk; a simulação roda numa
+        # thread separada e só devolve resultados pela fila do animador
+        interval = 0.001
+        if self.heatmap.active:
+            # Sem envelopes: todo o tráfego é agregado por enlace em janelas de tempo
+            observer = TrafficMonitor(window=max(interval, qtd * interval / self.heatmap.max_frames))
+            simulator = Simulator(self.manager, observer=observer, routing=self.routing)
+        else:
+            observer = EventRecorder()
+            simulator = Simulator(self.manager, observer=observer, routing=self.routing,
+                                  sample_every=max(1, qtd // self.max_animated_packets))
+        if not simulator.send(src_name, dst_name, qtd, interval=interval):
+            if self.routing == "fib" and self.manager.can_reach(src_name, dst_name):
+                # Há ligação, mas nenhuma rota anunciada cobre o endereço do destino
+                messagebox.showerror("Erro", f"Nenhum roteador tem rota para {dst_name}")
+            else:
                 messagebox.showerror("Erro", f"Sem caminho entre {src_name} e {dst_name}")
-                return
-            self.animate_packet(path)
-            time.sleep(0.5)
+            return
+        threading.Thread(target=self.run_simulation, args=(simulator, observer), daemon=True).start()
+
+    def run_simulation(self, simulator, observer):
+        stats = simulator.run()
+        if isinstance(observer, TrafficMonitor):
+            self.animator.post(self.heatmap.play, observer, simulator.bandwidth, simulator.queue_limit)
+        else:
+            self.animator.submit(observer.delivered_paths()[:self.max_animated_packets])
+        if stats.total_dropped:
+            self.animator.post(messagebox.showwarning, "Aviso",
+                               f"{stats.delivered} pacotes entregues, {stats.total_dropped} descartados")
 
     def animate_packet(self, path):
-        img = self.images["envelope"]
-        x, y = path[0].x, path[0].y
-        packet_id = self.canvas.create_image(x + self.device_size // 2, y + self.device_size // 2, image=img)
-        self.root.update()
-
-        for device in path[1:]:
-            dest_x = device.x + self.device_size // 2
-            dest_y = device.y + self.device_size // 2
-            steps = 20
-            for i in range(1, steps + 1):
-                new_x = x + (dest_x - x) * i / steps
-                new_y = y + (dest_y - y) * i / steps
-                self.canvas.coords(packet_id, new_x, new_y)
-                self.root.update()
-                time.sleep(0.05)
-            x, y = dest_x, dest_y
-
-        self.canvas.delete(packet_id)
+        self.animator.submit([path])
 
     def save_network(self):
         filename = simpledialog.askstring("Salvar", "Nome do arquivo:")
         if filename:
             try:
                 # Garante que o diretório existe
-                os.makedirs("saved_networks", exist_ok=True)
-                filepath = os.path.join("saved_networks", f"{filename}.json")
-                
-                # Prepara os dados para serialização
-                network_data = {
-                    "devices": [
-                        {
-                            "name": device.name,
-                            "ip": str(device.ip),  # Converte IPv4Address para string
-                            "type": device.device_type,
-                            "x": device.x,
-                            "y": device.y
-                        } for device in self.manager.devices
-                    ],
-                    "connections": self.manager.connections
-                }
-                
-                # Salva o arquivo
-                with open(filepath, 'w') as f:
-                    json.dump(network_data, f, indent=2)
-                
+                os.makedirs(NETWORKS_DIR, exist_ok=True)
+                filepath = os.path.join(NETWORKS_DIR, f"{filename}.json")
+
+                if filepath == self.journal.filename:
+                    # Mesma rede: só as edições novas vão para o log
+                    self.journal.save()
+                else:
+                    previous = self.journal.save_as(filepath)
+                    if previous == AUTOSAVE_FILE:
+                        self.manager.delete_network_file(previous)
+
                 messagebox.showinfo("Sucesso", f"Rede salva em {filepath}")
                 
             except Exception as e:
@@ -361,31 +337,22 @@ class NetworkSimulatorUI:
         filename = simpledialog.askstring("Carregar", "Nome do arquivo:")
         if filename:
             try:
-                filepath = os.path.join("saved_networks", f"{filename}.json")
-                
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                    
-                    # Limpa a rede atual
-                    self.manager.devices.clear()
-                    self.manager.connections.clear()
-                    
-                    # Recria os dispositivos
-                    for device_data in data['devices']:
-                        self.manager.add_device(
-                            name=device_data['name'],
-                            ip=device_data['ip'],  # Já está como string
-                            device_type=device_data['type'],
-                            x=device_data['x'],
-                            y=device_data['y']
-                        )
-                    
-                    # Recria as conexões
-                    self.manager.connections = data['connections']
-                    
-                    self.redraw()
+                filepath = os.path.join(NETWORKS_DIR, f"{filename}.json")
+
+                # As edições da rede atual ficam no log dela antes da troca
+                previous = self.journal.filename
+                self.journal.save()
+                report = self.journal.open(filepath)
+                if previous == AUTOSAVE_FILE:
+                    self.manager.delete_network_file(previous)
+
+                self.redraw()
+                self.fit_view()
+                if report.total_skipped:
+                    messagebox.showwarning("Rede carregada", report.summary())
+                else:
                     messagebox.showinfo("Sucesso", "Rede carregada!")
-                    
+
             except Exception as e:
                 messagebox.showerror("Erro", f"Falha ao carregar: {str(e)}")
 
@@ -393,87 +360,542 @@ class NetworkSimulatorUI:
         filename = simpledialog.askstring("Excluir", "Nome do arquivo (sem .json):")
         if filename:
             try:
-                os.makedirs("saved_networks", exist_ok=True)
-                filepath = os.path.join("saved_networks", f"{filename}.json")
+                os.makedirs(NETWORKS_DIR, exist_ok=True)
+                filepath = os.path.join(NETWORKS_DIR, f"{filename}.json")
                 
-                if os.path.exists(filepath):
-                    os.remove(filepath)
+                if self.manager.delete_network_file(filepath):
                     messagebox.showinfo("Sucesso", f"Arquivo '{filename}.json' excluído com sucesso!")
                 else:
                     messagebox.showerror("Erro", f"Arquivo '{filename}.json' não encontrado em saved_networks")
             except Exception as e:
                 messagebox.showerror("Erro", f"Falha ao excluir: {str(e)}")
 
+    # --- REGISTRO DE EDIÇÕES (autosave, recuperação, desfazer/refazer) ---
+
+    def recover_session(self):
+        # Edições de uma sessão sem nome que não terminou normalmente
+        os.makedirs(NETWORKS_DIR, exist_ok=True)
+        self.journal.filename = AUTOSAVE_FILE
+        if not self.journal.recoverable():
+            return
+        if messagebox.askyesno("Recuperar", "Há edições não salvas da última sessão. Deseja recuperá-las?"):
+            try:
+                self.journal.open(AUTOSAVE_FILE)
+                self.redraw()
+                self.fit_view()
+                return
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Erro", f"Falha ao recuperar: {str(e)}")
+                self.manager.clear()
+        self.journal.discard()
+        self.manager.delete_network_file(AUTOSAVE_FILE)
+
+    def autosave(self):
+        # Só grava as operações pendentes, então o custo depende das edições
+        try:
+            self.journal.save()
+        except OSError:
+            pass  # tenta de novo no próximo ciclo
+        self.root.after(self.autosave_ms, self.autosave)
+
+    def undo(self):
+        self.sync_entry(self.journal.undo())
+
+    def redo(self):
+        self.sync_entry(self.journal.redo())
+
+    def sync_entry(self, entry):
+        # Atualiza o índice espacial e o canvas depois de uma operação do registro
+        if entry is None:
+            return
+        op = entry["op"]
+        if op == "add_device":
+            device = self.manager.get_device(entry["device"]["name"])
+            self.spatial.insert(device.name, device.x, device.y)
+        elif op == "remove_device":
+            name = entry["device"]["name"]
+            self.spatial.remove(name)
+            for name1, name2, _ in entry["links"]:
+                self.erase_connection(self.manager.link_key(name1, name2))
+            self.erase_device(name)
+        elif op == "disconnect":
+            self.erase_connection(self.manager.link_key(*entry["link"][:2]))
+        elif op == "move":
+            for name in entry["positions"]:
+                device = self.manager.get_device(name)
+                if device:
+                    self.spatial.move(name, device.x, device.y)
+        # Conexões novas e posições alteradas são desenhadas pela renderização
+        self.schedule_render()
+
+    # --- VISÃO (zoom, deslocamento e níveis de detalhe) ---
+
+    def to_screen(self, x, y):
+        return (x - self.view_x) * self.zoom, (y - self.view_y) * self.zoom
+
+    def to_world(self, sx, sy):
+        return sx / self.zoom + self.view_x, sy / self.zoom + self.view_y
+
+    def device_center(self, device):
+        half = self.device_size / 2
+        return self.to_screen(device.x + half, device.y + half)
+
+    def viewport_size(self):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width <= 1:  # janela ainda não mapeada
+            width, height = int(self.canvas["width"]), int(self.canvas["height"])
+        return width, height
+
+    def visible_names(self):
+        width, height = self.viewport_size()
+        x0, y0 = self.to_world(0, 0)
+        x1, y1 = self.to_world(width, height)
+        # A posição do dispositivo é o canto superior esquerdo do ícone
+        return self.spatial.query(x0 - self.device_size, y0 - self.device_size, x1, y1)
+
+    def zoom_at(self, sx, sy, factor):
+        # Zoom mantendo fixo o ponto sob o cursor
+        zoom = min(self.max_zoom, max(self.min_zoom, self.zoom * factor))
+        wx, wy = self.to_world(sx, sy)
+        self.zoom = zoom
+        self.view_x = wx - sx / zoom
+        self.view_y = wy - sy / zoom
+        self.schedule_render()
+
+    def fit_view(self):
+        devices = self.manager.devices
+        if not devices:
+            return
+        xs = [d.x for d in devices]
+        ys = [d.y for d in devices]
+        width, height = self.viewport_size()
+        margin = self.device_size * 2
+        span_x = max(xs) - min(xs) + margin
+        span_y = max(ys) - min(ys) + margin
+        self.zoom = min(1.0, max(self.min_zoom, min(width / span_x, height / span_y)))
+        self.view_x = min(xs) - (width / self.zoom - span_x) / 2 - self.device_size / 2
+        self.view_y = min(ys) - (height / self.zoom - span_y) / 2 - self.device_size / 2
+        self.schedule_render()
+
+    def on_pan_start(self, event):
+        self.pan_data["x"] = event.x
+        self.pan_data["y"] = event.y
+
+    @ui_timed("on_pan")
+    def on_pan(self, event):
+        dx = event.x - self.pan_data["x"]
+        dy = event.y - self.pan_data["y"]
+        self.pan_data["x"] = event.x
+        self.pan_data["y"] = event.y
+        self.view_x -= dx / self.zoom
+        self.view_y -= dy / self.zoom
+        # Desloca o que já está desenhado e completa as bordas depois
+        self.canvas.move("all", dx, dy)
+        self.schedule_render()
+
+    def schedule_render(self):
+        # Agrupa vários eventos (arrasto, roda do mouse) numa renderização só
+        if not self.render_pending:
+            self.render_pending = True
+            self.root.after_idle(self.render_view)
+
+    def choose_render_mode(self, visible):
+        if len(visible) > self.max_dot_items:
+            return "cluster"
+        if self.zoom < self.detail_zoom or len(visible) > self.max_detail_items:
+            return "dot"
+        return "detail"
+
+    def clear_rendered(self):
+        for name in list(self.device_widgets):
+            self.erase_device(name)
+        for key in list(self.connection_lines):
+            self.erase_connection(key)
+        self.clear_lod_items()
+
+    def clear_lod_items(self):
+        if self.lod_items:
+            self.canvas.delete(*self.lod_items)
+            self.lod_items = []
+
+    @ui_timed("render_view")
+    def render_view(self):
+        self.render_pending = False
+        self.draw_visible()
+        if self.heatmap and self.heatmap.active:
+            self.heatmap.paint()
+        if self.critical_rings is not None:
+            self.paint_critical()
+
+    def draw_visible(self):
+        # Desenha só o que está na área visível, aplicando as diferenças em
+        # relação ao que já está no canvas
+        visible = self.visible_names()
+        mode = self.choose_render_mode(visible)
+        if mode != self.render_mode:
+            self.clear_rendered()
+            self.render_mode = mode
+        self.clear_lod_items()
+        if mode == "cluster":
+            self.draw_clusters(visible)
+            return
+
+        get_device = self.manager.get_device
+        for name in [name for name in self.device_widgets if name not in visible]:
+            self.erase_device(name)
+        for name in visible:
+            device = get_device(name)
+            if name in self.device_widgets:
+                self.refresh_device(device)
+            else:
+                self.draw_device(device)
+
+        # Enlaces com pelo menos uma ponta visível
+        visible_links = {}
+        link_key = self.manager.link_key
+        for name in visible:
+            for neighbor in get_device(name).connections:
+                visible_links[link_key(name, neighbor.name)] = None
+        if len(visible_links) > self.max_line_items:
+            for key in list(self.connection_lines):
+                self.erase_connection(key)
+            self.draw_aggregated_links((get_device(a), get_device(b)) for a, b in visible_links)
+            return
+        for key in [key for key in self.connection_lines if key not in visible_links]:
+            self.erase_connection(key)
+        for name1, name2 in visible_links:
+            self.draw_connection(name1, name2)
+
+    @ui_timed("redraw")
     def redraw(self):
-        self.canvas.delete("all")
-        for device in self.manager.devices:
-            self.draw_device(device)
-        for conn in self.manager.connections:
-            self.draw_connection(conn[0], conn[1])
+        # Reindexa as posições a partir do modelo (após carregar uma rede)
+        # e renderiza a área visível
+        self.spatial.rebuild((d.name, d.x, d.y) for d in self.manager.devices)
+        for name in [name for name in self.device_widgets if name not in self.manager.devices_by_name]:
+            self.erase_device(name)
+        for key in [key for key in self.connection_lines if key not in self.manager.links]:
+            self.erase_connection(key)
+        self.render_view()
 
     def draw_device(self, device):
-        img = self.images.get(device.device_type, self.images["pc"])
-        widget = self.canvas.create_image(device.x, device.y, image=img, anchor="nw")
-        self.device_widgets[device.name] = widget
-        self.canvas.tag_bind(widget, "<ButtonPress-1>", lambda e, dev=device: self.on_device_click(e, dev))
-        self.canvas.tag_bind(widget, "<B1-Motion>", lambda e, dev=device: self.on_device_drag(e, dev))
+        name = device.name
+        if self.render_mode == "dot":
+            cx, cy = self.device_center(device)
+            widget = self.canvas.create_oval(cx - 3, cy - 3, cx + 3, cy + 3, outline="",
+                                             fill=DEVICE_COLORS.get(device.device_type, "#2c3e50"))
+        else:
+            img = self.sprites.get(device.device_type, self.device_size * self.zoom)
+            x, y = self.to_screen(device.x, device.y)
+            widget = self.canvas.create_image(x, y, image=img, anchor="nw")
+        self.device_widgets[name] = widget
+        # Os eventos buscam o dispositivo pelo nome: o objeto muda ao recarregar a rede
+        self.canvas.tag_bind(widget, "<ButtonPress-1>", lambda e: self.on_device_click(e, self.manager.get_device(name)))
+        self.canvas.tag_bind(widget, "<B1-Motion>", lambda e: self.on_device_drag(e, self.manager.get_device(name)))
         self.canvas.tag_bind(widget, "<ButtonRelease-1>", lambda e: self.on_device_release(e))
 
-        # Nome do dispositivo (adicionando a tag)
-        text_id = self.canvas.create_text(device.x + self.device_size // 2, device.y + self.device_size + 10,
-                                            text=f"{device.name}\n{device.ip}", font=("Segoe UI", 8), fill="black",
-                                            tags=f"text_{device.name}")
+        # Nome do dispositivo
+        if self.render_mode == "detail" and self.zoom >= self.label_zoom:
+            self.device_labels[name] = self.canvas.create_text(
+                *self.label_position(device), text=f"{device.name}\n{device.ip}", font=("Segoe UI", 8), fill="black")
+
+    def label_position(self, device):
+        x, y = self.to_screen(device.x + self.device_size / 2, device.y + self.device_size)
+        return x, y + 10
+
+    def refresh_device(self, device):
+        # Atualiza um item já desenhado (posição, tamanho da imagem e rótulo)
+        name = device.name
+        if self.render_mode == "detail":
+            img = self.sprites.get(device.device_type, self.device_size * self.zoom)
+            self.canvas.itemconfigure(self.device_widgets[name], image=img)
+            show_label = self.zoom >= self.label_zoom
+            if show_label and name not in self.device_labels:
+                self.device_labels[name] = self.canvas.create_text(
+                    *self.label_position(device), font=("Segoe UI", 8), fill="black")
+            elif not show_label and name in self.device_labels:
+                self.canvas.delete(self.device_labels.pop(name))
+            if show_label:
+                self.canvas.itemconfigure(self.device_labels[name], text=f"{device.name}\n{device.ip}")
+        self.update_device_position_on_canvas(device)
+
+    def erase_device(self, name):
+        self.canvas.delete(self.device_widgets.pop(name, None), self.device_labels.pop(name, None))
+
     def draw_connection(self, name1, name2):
         # Ordenar os nomes para usar como chave no dicionário
-        sorted_names = tuple(sorted((name1, name2)))
+        sorted_names = self.manager.link_key(name1, name2)
 
         d1 = self.manager.get_device(name1)
         d2 = self.manager.get_device(name2)
         if d1 and d2:
-            x1 = d1.x + self.device_size // 2
-            y1 = d1.y + self.device_size // 2
-            x2 = d2.x + self.device_size // 2
-            y2 = d2.y + self.device_size // 2
+            x1, y1 = self.device_center(d1)
+            x2, y2 = self.device_center(d2)
 
             if sorted_names in self.connection_lines:
                 # A linha já existe, apenas atualize as coordenadas
                 line_id = self.connection_lines[sorted_names]
                 self.canvas.coords(line_id, x1, y1, x2, y2)
             else:
-                # A linha não existe, crie uma nova
-                line = self.canvas.create_line(x1, y1, x2, y2, fill="#2980b9", width=2)
+                # A linha não existe, crie uma nova (abaixo dos dispositivos)
+                line = self.canvas.create_line(x1, y1, x2, y2, fill=LINK_COLOR, width=self.line_width())
+                self.canvas.tag_lower(line)
                 self.connection_lines[sorted_names] = line
 
+    def line_width(self):
+        return 2 if self.render_mode == "detail" else 1
+
+    def erase_connection(self, key):
+        line = self.connection_lines.pop(key, None)
+        if line:
+            self.canvas.delete(line)
+
+    def screen_cell(self, device):
+        cx, cy = self.device_center(device)
+        return int(cx // self.cluster_cell), int(cy // self.cluster_cell)
+
+    def cell_center(self, cell):
+        return (cell[0] + 0.5) * self.cluster_cell, (cell[1] + 0.5) * self.cluster_cell
+
+    def draw_aggregated_links(self, pairs):
+        # Uma linha por par de células, mais grossa quanto mais enlaces resume
+        counts = {}
+        for d1, d2 in pairs:
+            a = self.screen_cell(d1)
+            b = self.screen_cell(d2)
+            if a != b:
+                key = (a, b) if a < b else (b, a)
+                counts[key] = counts.get(key, 0) + 1
+        for (a, b), count in counts.items():
+            line = self.canvas.create_line(*self.cell_center(a), *self.cell_center(b), fill=LINK_COLOR,
+                                           width=min(6, 1 + int(math.log2(count))))
+            self.canvas.tag_lower(line)
+            self.lod_items.append(line)
+
+    def draw_clusters(self, visible):
+        # Visão muito afastada: um círculo por célula com o total de dispositivos
+        get_device = self.manager.get_device
+        counts = {}
+        routers = {}
+        pairs = []
+        for name in visible:
+            device = get_device(name)
+            cell = self.screen_cell(device)
+            counts[cell] = counts.get(cell, 0) + 1
+            if device.device_type == "roteador":
+                routers[cell] = routers.get(cell, 0) + 1
+            for neighbor in device.connections:
+                if neighbor.name not in visible or name < neighbor.name:
+                    pairs.append((device, neighbor))
+        self.draw_aggregated_links(pairs)
+        for cell, count in counts.items():
+            cx, cy = self.cell_center(cell)
+            radius = min(self.cluster_cell / 2, 2 + math.log2(count) * 1.5)
+            color = DEVICE_COLORS["roteador"] if routers.get(cell, 0) * 2 >= count else DEVICE_COLORS["pc"]
+            self.lod_items.append(self.canvas.create_oval(cx - radius, cy - radius, cx + radius, cy + radius,
+                                                          fill=color, outline=""))
+
     def on_device_click(self, event, device):
         self.drag_data["device"] = device
+        self.drag_data["start"] = (device.x, device.y)
         self.drag_data["x"] = event.x
         self.drag_data["y"] = event.y
 
+    @ui_timed("on_device_drag")
     def on_device_drag(self, event, device):
-        dx = event.x - self.drag_data["x"]
-        dy = event.y - self.drag_data["y"]
+        # O deslocamento na tela é convertido para coordenadas do mundo
+        dx = (event.x - self.drag_data["x"]) / self.zoom
+        dy = (event.y - self.drag_data["y"]) / self.zoom
         device.x += dx
         device.y += dy
         self.drag_data["x"] = event.x
         self.drag_data["y"] = event.y
+        self.spatial.move(device.name, device.x, device.y)
         self.update_device_position_on_canvas(device)
-        self.redraw_connections()
+        self.redraw_connections(device)
 
     def update_device_position_on_canvas(self, device):
         widget_id = self.device_widgets.get(device.name)
         if widget_id:
-            self.canvas.coords(widget_id, device.x, device.y)
+            if self.render_mode == "dot":
+                cx, cy = self.device_center(device)
+                self.canvas.coords(widget_id, cx - 3, cy - 3, cx + 3, cy + 3)
+            else:
+                self.canvas.coords(widget_id, *self.to_screen(device.x, device.y))
             # Atualizar a posição do texto do nome do dispositivo
-            text_items = self.canvas.find_withtag(f"text_{device.name}")
-            if text_items:
-                self.canvas.coords(text_items[0], device.x + self.device_size // 2, device.y + self.device_size + 10)
-
-    def redraw_connections(self):
-        for name1, name2 in self.manager.connections:
-            self.draw_connection(name1, name2)
+            label = self.device_labels.get(device.name)
+            if label:
+                self.canvas.coords(label, *self.label_position(device))
+
+    @ui_timed("redraw_connections")
+    def redraw_connections(self, device=None):
+        # Com um dispositivo, atualiza só as linhas ligadas a ele
+        if device is None:
+            for name1, name2 in list(self.connection_lines):
+                self.draw_connection(name1, name2)
+            return
+        for neighbor in device.connections:
+            self.draw_connection(device.name, neighbor.name)
 
     def on_device_release(self, event):
-        self.drag_data = {"x": 0, "y": 0, "device": None}
+        # O arrasto inteiro vira uma única operação no registro
+        device = self.drag_data["device"]
+        if device is not None and self.manager.get_device(device.name) is device:
+            self.journal.moved({device.name: self.drag_data["start"]})
+            if self.critical_rings:
+                self.schedule_render()
+        self.drag_data = {"x": 0, "y": 0, "device": None, "start": None}
+
+    # --- MAPA DE CALOR ---
+
+    def toggle_heatmap(self):
+        # Ligado, os envios mostram a utilização dos enlaces em vez de envelopes
+        if self.heatmap.active:
+            self.heatmap.stop()
+        else:
+            self.animator.clear()
+            self.heatmap.start()
+
+    # --- CONECTIVIDADE ---
+
+    def toggle_connectivity(self):
+        # Destaca os roteadores críticos e resume componentes e sub-redes isoladas
+        if self.critical_rings is not None:
+            if self.critical_rings:
+                self.canvas.delete(*self.critical_rings.values())
+            self.critical_rings = None
+            return
+        self.critical_rings = {}
+        self.paint_critical()
+        components = self.manager.components()
+        critical = self.manager.articulation_routers()
+        isolated = self.manager.isolated_subnets()
+        text = (f"{len(components)} componentes conectados\n"
+                f"{len(critical)} roteadores críticos (destacados em vermelho)")
+        if isolated:
+            text += "\nSub-redes isoladas: " + ", ".join(isolated[:10]) + (" ..." if len(isolated) > 10 else "")
+        messagebox.showinfo("Conectividade", text)
+
+    def paint_critical(self):
+        # Anel em volta dos roteadores críticos que estão desenhados
+        critical = self.manager.reach.articulation_routers()
+        radius = self.device_size * self.zoom / 2 + 4 if self.render_mode == "detail" else 6
+        rings = {}
+        for name in self.device_widgets:
+            device = self.manager.get_device(name)
+            if device not in critical:
+                continue
+            cx, cy = self.device_center(device)
+            box = (cx - radius, cy - radius, cx + radius, cy + radius)
+            ring = self.critical_rings.pop(name, None)
+            if ring is None:
+                ring = self.canvas.create_oval(*box, outline="#e74c3c", width=2)
+            else:
+                self.canvas.coords(ring, *box)
+            rings[name] = ring
+        if self.critical_rings:
+            self.canvas.delete(*self.critical_rings.values())
+        self.critical_rings = rings
+
+    # --- ESTATÍSTICAS ---
+
+    def toggle_stats(self):
+        # As métricas só são coletadas enquanto o painel está aberto
+        if self.stats_label is None:
+            metrics.enable()
+            self.stats_label = tk.Label(self.canvas, justify=tk.LEFT, font=("Consolas", 9),
+                                        bg="white", fg="#2c3e50", relief=tk.SOLID, bd=1, padx=6, pady=4)
+            self.stats_label.place(x=10, y=10)
+            self.update_stats()
+        else:
+            metrics.disable()
+            self.stats_label.destroy()
+            self.stats_label = None
+
+    def update_stats(self):
+        if self.stats_label is None:
+            return
+        self.stats_label.configure(text=self.stats_text())
+        self.root.after(self.stats_interval_ms, self.update_stats)
+
+    def stats_text(self):
+        items = len(self.device_widgets) + len(self.device_labels) + len(self.connection_lines) + len(self.lod_items)
+        lines = [f"{len(self.manager.devices)} dispositivos, {len(self.manager.links)} enlaces",
+                 f"{items} itens no canvas, modo {self.render_mode}, zoom {self.zoom:.2f}"]
+        if self.heatmap and self.heatmap.active and self.heatmap.router_packets:
+            lines.append("roteadores mais carregados: " + ", ".join(
+                f"{name} ({count})" for name, count in self.heatmap.busiest()))
+        # list(): outras threads (simulação, layout) podem registrar métricas novas
+        for (name, labels), metric in list(metrics.REGISTRY.metrics.items()):
+            title = name + (f"[{','.join(value for _, value in labels)}]" if labels else "")
+            if metric.kind == "counter":
+                if metric.value:
+                    lines.append(f"{title}: {metric.value}")
+            elif metric.count and name.endswith("_seconds"):
+                lines.append(f"{title}: {metric.count}x, média {metric.mean * 1000:.2f} ms, "
+                             f"máx {metric.max * 1000:.2f} ms")
+            elif metric.count:
+                lines.append(f"{title}: {metric.count}x, média {metric.mean:.0f}, máx {metric.max:.0f}")
+        return "\n".join(lines)
+
+    # --- AUTO-LAYOUT ---
+
+    def auto_layout(self):
+        # O retrato da topologia é tirado aqui; o cálculo roda em outra thread
+        if self.layout_running or not self.manager.devices:
+            return
+        try:
+            layout = ForceLayout.from_manager(self.manager, ideal_length=self.device_size * 2)
+        except RuntimeError as e:
+            messagebox.showerror("Erro", str(e))
+            return
+        self.layout_running = True
+        threading.Thread(target=self.run_layout, args=(layout, None), daemon=True).start()
+
+    def relax_layout(self, names):
+        # Só a vizinhança dos dispositivos alterados se move. Durante outro
+        # layout, a edição fica na fila e é relaxada quando ele terminar.
+        if self.layout_running:
+            self.layout_pending.update(names)
+            return
+        layout = ForceLayout.from_manager(self.manager, ideal_length=self.device_size * 2)
+        movable = neighborhood(self.manager, names)
+        self.layout_running = True
+        threading.Thread(target=self.run_layout, args=(layout, movable), daemon=True).start()
+
+    def run_layout(self, layout, movable):
+        if movable is None:
+            layout.scatter()
+            layout.run(iterations_for(len(layout.names)))
+            layout.normalize()
+        else:
+            layout.relax(movable)
+        self.animator.post(self.finish_layout, layout, movable)
+
+    def finish_layout(self, layout, movable):
+        self.layout_running = False
+        self.layout_enabled = True
+        # Posições anteriores, para o layout poder ser desfeito
+        previous = {}
+        for name in layout.names if movable is None else movable:
+            device = self.manager.get_device(name)
+            if device:
+                previous[name] = (device.x, device.y)
+        layout.apply(self.manager, movable)
+        self.journal.moved(previous)
+        if movable is None:
+            self.redraw()
+            self.fit_view()
+        else:
+            for name in movable:
+                device = self.manager.get_device(name)
+                if device:
+                    self.spatial.move(name, device.x, device.y)
+            self.schedule_render()
+        if self.layout_pending:
+            names = self.layout_pending
+            self.layout_pending = set()
+            self.relax_layout(names)
 
 # --- MAIN ---
 
@@ -0,0 +1,65 @@
+class GridIndex:
+    # Índice espacial em grade uniforme: cada célula guarda as chaves dos
+    # pontos que caem nela. Consultas por retângulo só olham as células
+    # que o retângulo cobre.
+
+    def __init__(self, cell_size=256):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> conjunto de chaves
+        self.positions = {}  # chave -> (cx, cy)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, key, x, y):
+        cell = self._cell(x, y)
+        self.positions[key] = cell
+        self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        cell = self.positions.pop(key, None)
+        if cell is not None:
+            members = self.cells[cell]
+            members.discard(key)
+            if not members:
+                del self.cells[cell]
+
+    def move(self, key, x, y):
+        cell = self._cell(x, y)
+        if self.positions.get(key) != cell:
+            self.remove(key)
+            self.positions[key] = cell
+            self.cells.setdefault(cell, set()).add(key)
+
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+
+    def rebuild(self, points):
+        # points: iterável de (chave, x, y)
+        self.clear()
+        for key, x, y in points:
+            self.insert(key, x, y)
+
+    def query(self, x0, y0, x1, y1):
+        # Chaves nas células que tocam o retângulo (pode incluir pontos
+        # um pouco fora dele, nunca deixa de fora os que estão dentro)
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        result = set()
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            # Retângulo maior que a área ocupada: percorre só as células não vazias
+            for (cx, cy), members in self.cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    result.update(members)
+            return result
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                members = cells.get((cx, cy))
+                if members:
+                    result.update(members)
+        return result
@@ -0,0 +1,33 @@
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+
+class SpriteCache:
+    # Imagens dos dispositivos redimensionadas por nível de zoom.
+    # Os tamanhos são arredondados para múltiplos de `step` pixels e só as
+    # `max_entries` imagens usadas mais recentemente ficam em memória.
+
+    def __init__(self, paths, default, max_entries=24, step=4):
+        self.sources = {kind: Image.open(path) for kind, path in paths.items()}
+        self.default = default
+        self.max_entries = max_entries
+        self.step = step
+        self.cache = OrderedDict()  # (tipo, tamanho) -> PhotoImage
+
+    def size_for(self, size):
+        return max(self.step, int(round(size / self.step)) * self.step)
+
+    def get(self, kind, size):
+        if kind not in self.sources:
+            kind = self.default
+        key = (kind, self.size_for(size))
+        image = self.cache.get(key)
+        if image is not None:
+            self.cache.move_to_end(key)
+            return image
+        image = ImageTk.PhotoImage(self.sources[kind].resize((key[1], key[1])))
+        self.cache[key] = image
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return image